@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Andamento da Execução
+Ritmo (grupos/hora nos últimos grupos, sem contar pulados), taxas de sucesso
+e erro, tempo de assinatura x preenchimento do formulário e previsão de
+término de processar_todos_os_grupos. A cada ANDAMENTO_INTERVALO imprime uma
+linha de status e grava ANDAMENTO_ARQUIVO (JSON), que outras ferramentas podem
+ler sem abrir o SQLite.
+
+Uso:
+    python andamento.py            # mostra o último status gravado
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+# Etapas de tempos_etapas somadas em cada parcela do tempo
+ETAPAS_ASSINATURA = ('espera_assinador', 'assinatura', 'confirmacao')
+ETAPAS_FORMULARIO = ('dados_iniciais', 'continuar', 'modal_dependente', 'modal_plano', 'modal_info_dependente')
+
+
+def _duracao(segundos):
+    """Formata segundos como '2h05' ou '7min'"""
+    minutos = int(segundos // 60)
+    if minutos >= 60:
+        return f"{minutos // 60}h{minutos % 60:02d}"
+    return f"{minutos}min"
+
+
+class Andamento:
+    """
+    Acompanha os resultados dos grupos de uma execução.
+
+    Attributes:
+        total (int): Grupos a processar no início
+        obter_restantes (callable): Grupos restantes (ex: pendentes da fila);
+            sem ele, total menos os já registrados
+        tempos (RegistradorTempos): Totais por etapa para assinatura x formulário
+        arquivo (str): Arquivo JSON de status (None para não gravar)
+        intervalo (float): Segundos entre as linhas de status
+    """
+
+    def __init__(self, total, obter_restantes=None, tempos=None, arquivo=None, intervalo=60, janela=20):
+        self.total = total
+        self.obter_restantes = obter_restantes
+        self.tempos = tempos
+        self.arquivo = arquivo
+        self.intervalo = intervalo
+        self.inicio = time.time()
+        self.ultima_emissao = self.inicio
+        self.marcas = deque([self.inicio], maxlen=max(1, janela) + 1)  # Fim dos últimos grupos contados no ritmo
+        self.contagem = {'sucesso': 0, 'erro': 0, 'pulado': 0, 'ja_processado': 0}
+        self.totais_etapas_inicio = dict(tempos.totais) if tempos else {}
+
+    def registrar(self, resultado):
+        """Registra o resultado de um grupo e emite o status se o intervalo passou"""
+        resultado = resultado if resultado in self.contagem else 'erro'
+        self.contagem[resultado] += 1
+
+        agora = time.time()
+        if resultado in ('sucesso', 'erro'):
+            self.marcas.append(agora)
+
+        if agora - self.ultima_emissao >= self.intervalo:
+            self.emitir()
+
+    def grupos_por_hora(self):
+        """Ritmo nos últimos grupos enviados (sucesso ou erro), sem pulados"""
+        if len(self.marcas) < 2 or self.marcas[-1] <= self.marcas[0]:
+            return 0.0
+        return (len(self.marcas) - 1) / (self.marcas[-1] - self.marcas[0]) * 3600
+
+    def _tempo_etapas(self, etapas):
+        if not self.tempos:
+            return None
+        return round(sum(self.tempos.totais.get(etapa, 0.0) - self.totais_etapas_inicio.get(etapa, 0.0)
+                         for etapa in etapas), 1)
+
+    def situacao(self, final=False):
+        """Retorna o status atual (o mesmo conteúdo gravado no arquivo)"""
+        agora = time.time()
+        processados = sum(self.contagem.values())
+        enviados = self.contagem['sucesso'] + self.contagem['erro']
+        restantes = self.obter_restantes() if self.obter_restantes else max(self.total - processados, 0)
+        ritmo = self.grupos_por_hora()
+
+        if not restantes:
+            segundos_restantes = 0
+        elif ritmo:
+            segundos_restantes = restantes / ritmo * 3600
+        else:
+            segundos_restantes = None  # Ainda sem grupos enviados para medir o ritmo
+        previsao = datetime.now() + timedelta(seconds=segundos_restantes) if segundos_restantes is not None else None
+
+        return {
+            'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+            'inicio': datetime.fromtimestamp(self.inicio).isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'finalizado': final,
+            'total': self.total,
+            'processados': processados,
+            'restantes': restantes,
+            'sucessos': self.contagem['sucesso'],
+            'erros': self.contagem['erro'],
+            'pulados': self.contagem['pulado'],
+            'ja_processados': self.contagem['ja_processado'],
+            'taxa_sucesso': self.contagem['sucesso'] / enviados if enviados else None,
+            'taxa_erro': self.contagem['erro'] / enviados if enviados else None,
+            'grupos_por_hora': round(ritmo, 1),
+            'segundos_decorridos': round(agora - self.inicio, 1),
+            'segundos_assinatura': self._tempo_etapas(ETAPAS_ASSINATURA),
+            'segundos_formulario': self._tempo_etapas(ETAPAS_FORMULARIO),
+            'segundos_restantes': round(segundos_restantes) if segundos_restantes is not None else None,
+            'previsao_termino': previsao.isoformat(timespec='seconds') if previsao else None,
+        }
+
+    def emitir(self, final=False):
+        """Imprime a linha de status e grava o arquivo"""
+        self.ultima_emissao = time.time()
+        dados = self.situacao(final)
+        print(linha_status(dados))
+        self.gravar(dados)
+        return dados
+
+    def gravar(self, dados):
+        """Grava o status de forma atômica (arquivo temporário + rename)"""
+        if not self.arquivo:
+            return
+        try:
+            temporario = f"{self.arquivo}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.arquivo)
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar andamento: {e}")
+
+
+def linha_status(dados):
+    """Linha única de status a partir do dicionário de Andamento.situacao()"""
+    partes = []
+    total = dados['processados'] + dados['restantes']
+    percentual = dados['processados'] / total * 100 if total else 100
+    partes.append(f"{'🏁' if dados['finalizado'] else '📈'} {dados['processados']}/{total} ({percentual:.0f}%)")
+    partes.append(f"{dados['grupos_por_hora']:.0f} grupos/h")
+
+    if dados['taxa_sucesso'] is not None:
+        partes.append(f"✅ {dados['taxa_sucesso']:.0%} ❌ {dados['taxa_erro']:.0%}")
+    if dados['pulados'] or dados['ja_processados']:
+        partes.append(f"⏭️ {dados['pulados'] + dados['ja_processados']}")
+
+    decorrido = dados['segundos_decorridos']
+    if decorrido and dados['segundos_assinatura'] is not None:
+        partes.append(f"assinatura {dados['segundos_assinatura'] / decorrido:.0%} / "
+                      f"formulário {dados['segundos_formulario'] / decorrido:.0%}")
+
+    if not dados['finalizado']:
+        if dados['previsao_termino']:
+            termino = datetime.fromisoformat(dados['previsao_termino'])
+            partes.append(f"ETA {termino:%d/%m %H:%M} ({_duracao(dados['segundos_restantes'])})")
+        else:
+            partes.append("ETA --")
+    else:
+        partes.append(f"em {_duracao(decorrido)}")
+
+    return ' | '.join(partes)
+
+
+def main():
+    """Mostra o último status gravado em ANDAMENTO_ARQUIVO"""
+    from config import ANDAMENTO_ARQUIVO
+
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else ANDAMENTO_ARQUIVO
+    if not os.path.exists(arquivo):
+        print(f"ℹ️ Nenhum andamento gravado em {arquivo}")
+        return 1
+
+    with open(arquivo, encoding='utf-8') as entrada:
+        dados = json.load(entrada)
+    print(f"🕒 Atualizado em {dados['atualizado_em']} (PID {dados['pid']})")
+    print(linha_status(dados))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
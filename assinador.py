@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente do Serviço Local do Assinador (EXPERIMENTAL - somente com o stub)
+Conversa com um serviço local de assinatura (HTTP/JSON em localhost) para
+selecionar o certificado e confirmar a assinatura solicitada pelo portal, sem
+depender de foco de janela, teclado ou mouse.
+
+O contrato abaixo é HIPOTÉTICO: foi definido para este projeto e só é
+atendido por assinador_stub.py e portal_simulado.py. O Assinador Serpro real
+fala WebSocket (portas 65056/65156) com a página do portal e não permite que
+um terceiro liste ou confirme as solicitações de outra origem; contra ele o
+cliente falha e a automação cai nos Métodos A/B.
+
+Protocolo (ver assinador_stub.py):
+    GET  /status                           -> {"versao": str, "pronto": bool}
+    GET  /certificados                     -> [{"alias": str, "titular": str, "validade": str}]
+    GET  /solicitacoes                     -> [{"id": str, "origem": str, "tipo": str}]
+    POST /solicitacoes/<id>/assinar        {"certificado": alias} -> {"status": "assinado"}
+    POST /solicitacoes/<id>/cancelar       -> {"status": "cancelado"}
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+class ErroAssinador(Exception):
+    """Falha de comunicação com o serviço local do assinador"""
+
+
+class ClienteAssinador:
+    """
+    Cliente do serviço local do assinador.
+
+    Attributes:
+        url (str): Endereço base do serviço (ex: 'http://127.0.0.1:65056')
+        timeout (float): Timeout de cada requisição (segundos)
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _requisitar(self, caminho, dados=None):
+        """Envia uma requisição JSON (POST quando há dados) e retorna a resposta"""
+        corpo = None if dados is None else json.dumps(dados).encode('utf-8')
+        requisicao = urllib.request.Request(
+            self.url + caminho,
+            data=corpo,
+            method='GET' if dados is None else 'POST',
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+                return json.loads(resposta.read().decode('utf-8') or 'null')
+        except urllib.error.HTTPError as e:
+            raise ErroAssinador(f"Assinador respondeu {e.code} em {caminho}") from e
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise ErroAssinador(f"Serviço do assinador indisponível em {self.url}: {e}") from e
+
+    def disponivel(self):
+        """Verifica se o serviço local do assinador está respondendo"""
+        try:
+            return bool(self._requisitar('/status').get('pronto'))
+        except ErroAssinador:
+            return False
+
+    def certificados(self):
+        """Lista os certificados disponíveis no assinador"""
+        return self._requisitar('/certificados')
+
+    def solicitacoes(self):
+        """Lista as solicitações de assinatura pendentes (enviadas pelo portal)"""
+        return self._requisitar('/solicitacoes')
+
+    def escolher_certificado(self, certificado=None):
+        """
+        Seleciona o alias do certificado a usar.
+
+        Args:
+            certificado (str): Trecho do alias ou do titular (None = primeiro)
+
+        Returns:
+            str: Alias do certificado
+
+        Raises:
+            ErroAssinador: Se nenhum certificado corresponder
+        """
+        disponiveis = self.certificados()
+        for cert in disponiveis:
+            if certificado is None or certificado.lower() in (cert['alias'] + ' ' + cert.get('titular', '')).lower():
+                return cert['alias']
+        raise ErroAssinador(f"Certificado não encontrado no assinador: {certificado or '(nenhum)'}")
+
+    def assinar_pendente(self, certificado=None, tempo_maximo=10, intervalo=0.25):
+        """
+        Aguarda a solicitação de assinatura do portal e a confirma com o
+        certificado selecionado.
+
+        Args:
+            certificado (str): Trecho do alias ou do titular (None = primeiro)
+            tempo_maximo (float): Tempo máximo aguardando a solicitação (segundos)
+            intervalo (float): Intervalo entre consultas (segundos)
+
+        Returns:
+            bool: True se a solicitação foi assinada, False se nenhuma apareceu
+
+        Raises:
+            ErroAssinador: Em falhas de comunicação ou recusa do assinador
+        """
+        alias = self.escolher_certificado(certificado)
+
+        inicio = time.time()
+        while time.time() - inicio < tempo_maximo:
+            pendentes = self.solicitacoes()
+            if pendentes:
+                solicitacao = pendentes[-1]  # Mais recente
+                resposta = self._requisitar(
+                    f"/solicitacoes/{solicitacao['id']}/assinar", {'certificado': alias}
+                )
+                if resposta.get('status') != 'assinado':
+                    raise ErroAssinador(f"Assinatura recusada: {resposta.get('mensagem', resposta)}")
+                return True
+            time.sleep(intervalo)
+
+        return False
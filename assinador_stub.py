@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stub do Serviço Local do Assinador
+Implementação offline do protocolo hipotético de assinador.py (não é o
+protocolo do Assinador Serpro), para testar o backend experimental de
+assinatura por protocolo sem o assinador real nem o portal.
+
+Uso:
+    python assinador_stub.py                  # escuta em ASSINADOR_SERVICO_URL
+    python assinador_stub.py --porta 65056 --sempre-pendente
+
+Solicitações podem ser criadas com POST /solicitacoes (simulando o portal) ou,
+com --sempre-pendente, uma nova solicitação é criada a cada consulta vazia.
+"""
+
+import argparse
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+CERTIFICADOS = [
+    {'alias': 'certificado-teste', 'titular': 'EMPRESA TESTE LTDA', 'validade': '2099-12-31'},
+]
+
+
+class EstadoStub:
+    """Solicitações pendentes e histórico de assinaturas do stub"""
+
+    def __init__(self, sempre_pendente=False):
+        self.sempre_pendente = sempre_pendente
+        self.trava = threading.Lock()
+        self.contador = itertools.count(1)
+        self.pendentes = {}
+        self.assinadas = []
+
+    def criar_solicitacao(self, origem='portal', tipo='xml'):
+        with self.trava:
+            id_solicitacao = str(next(self.contador))
+            self.pendentes[id_solicitacao] = {'id': id_solicitacao, 'origem': origem, 'tipo': tipo}
+            return self.pendentes[id_solicitacao]
+
+
+class ManipuladorStub(BaseHTTPRequestHandler):
+    """Atende as rotas do protocolo do assinador"""
+
+    estado = None
+
+    def _responder(self, codigo, dados):
+        corpo = json.dumps(dados).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(tamanho) or b'{}')
+
+    def do_GET(self):
+        caminho = urlparse(self.path).path
+        if caminho == '/status':
+            self._responder(200, {'versao': 'stub', 'pronto': True})
+        elif caminho == '/certificados':
+            self._responder(200, CERTIFICADOS)
+        elif caminho == '/solicitacoes':
+            if not self.estado.pendentes and self.estado.sempre_pendente:
+                self.estado.criar_solicitacao()
+            with self.estado.trava:
+                self._responder(200, list(self.estado.pendentes.values()))
+        else:
+            self._responder(404, {'mensagem': 'rota desconhecida'})
+
+    def do_POST(self):
+        partes = urlparse(self.path).path.strip('/').split('/')
+
+        if partes == ['solicitacoes']:
+            dados = self._ler_json()
+            self._responder(201, self.estado.criar_solicitacao(dados.get('origem', 'portal'), dados.get('tipo', 'xml')))
+            return
+
+        if len(partes) == 3 and partes[0] == 'solicitacoes' and partes[2] in ('assinar', 'cancelar'):
+            with self.estado.trava:
+                solicitacao = self.estado.pendentes.pop(partes[1], None)
+            if solicitacao is None:
+                self._responder(404, {'mensagem': 'solicitação não encontrada'})
+                return
+
+            if partes[2] == 'cancelar':
+                self._responder(200, {'status': 'cancelado'})
+                return
+
+            alias = self._ler_json().get('certificado')
+            if alias not in [cert['alias'] for cert in CERTIFICADOS]:
+                self._responder(200, {'status': 'recusado', 'mensagem': f'certificado inválido: {alias}'})
+                return
+
+            self.estado.assinadas.append({**solicitacao, 'certificado': alias})
+            print(f"✍️ Solicitação {solicitacao['id']} assinada com '{alias}'")
+            self._responder(200, {'status': 'assinado'})
+            return
+
+        self._responder(404, {'mensagem': 'rota desconhecida'})
+
+    def log_message(self, formato, *args):
+        pass  # Silenciar o log padrão por requisição
+
+
+def criar_servidor(porta, sempre_pendente=False, host='127.0.0.1'):
+    """Cria o servidor do stub (use serve_forever() para iniciar)"""
+    manipulador = type('Manipulador', (ManipuladorStub,), {'estado': EstadoStub(sempre_pendente)})
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Stub offline do serviço local do assinador")
+    parser.add_argument('--porta', type=int, help="Porta (padrão: a de ASSINADOR_SERVICO_URL)")
+    parser.add_argument('--sempre-pendente', action='store_true',
+                        help="Cria uma solicitação automaticamente quando não houver nenhuma")
+    args = parser.parse_args()
+
+    porta = args.porta
+    if porta is None:
+        from config import ASSINADOR_SERVICO_URL
+        porta = urlparse(ASSINADOR_SERVICO_URL).port
+
+    servidor = criar_servidor(porta, args.sempre_pendente)
+    print(f"🔐 Stub do assinador escutando em http://127.0.0.1:{porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Stub encerrado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Assinatura XML-DSig dos Lotes do R-4010
+Aplica a assinatura enveloped (RSA-SHA256, C14N inclusivo) exigida pela REINF
+em cada evento dos lotes gerados por lotes_r4010.py, usando um certificado A1
+(PKCS#12). A chave é carregada uma vez por processo e os eventos são assinados
+em paralelo, sem passar pelo assinador gráfico.
+
+Uso:
+    python assinatura_xml.py                                # lotes 'gerado' do período
+    python assinatura_xml.py lotes_xml/01-2025/lote_*.xml
+    python assinatura_xml.py --gerar-certificado-teste teste.pfx
+    python assinatura_xml.py --benchmark 5000 --certificado teste.pfx --senha teste
+"""
+
+import argparse
+import base64
+import getpass
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.serialization import pkcs12
+from cryptography.x509.oid import NameOID
+from lxml import etree
+
+NS_DSIG = 'http://www.w3.org/2000/09/xmldsig#'
+ALG_C14N = 'http://www.w3.org/TR/2001/REC-xml-c14n-20010315'
+ALG_ENVELOPED = 'http://www.w3.org/2000/09/xmldsig#enveloped-signature'
+ALG_RSA_SHA256 = 'http://www.w3.org/2001/04/xmldsig-more#rsa-sha256'
+ALG_SHA256 = 'http://www.w3.org/2001/04/xmlenc#sha256'
+
+# Chave e certificado do processo atual (carregados uma vez por _inicializar_processo)
+_chave = None
+_certificado_b64 = None
+
+
+def carregar_certificado(caminho_pfx, senha):
+    """
+    Carrega a chave privada e o certificado de um arquivo PKCS#12 (A1).
+
+    Returns:
+        tuple: (chave privada, certificado X.509)
+    """
+    with open(caminho_pfx, 'rb') as f:
+        chave, certificado, _ = pkcs12.load_key_and_certificates(
+            f.read(), senha.encode('utf-8') if senha else None
+        )
+    if chave is None or certificado is None:
+        raise ValueError(f"{caminho_pfx} não contém chave privada e certificado")
+    return chave, certificado
+
+
+def _inicializar_processo(caminho_pfx, senha):
+    """Carrega o certificado uma única vez em cada processo do pool"""
+    global _chave, _certificado_b64
+    _chave, certificado = carregar_certificado(caminho_pfx, senha)
+    _certificado_b64 = base64.b64encode(certificado.public_bytes(serialization.Encoding.DER)).decode('ascii')
+
+
+def _canonicalizar(elemento):
+    """
+    C14N inclusivo do elemento como documento próprio.
+
+    etree.tostring(elemento, method='c14n') sobre uma subárvore cujo ancestral
+    declara outro namespace padrão (<Reinf>) emite xmlns="" nos descendentes
+    de <SignedInfo> (ex: <Transforms>), bytes diferentes da forma canônica que
+    a REINF calcula. Serializar e reanalisar o elemento mantém as declarações
+    de namespace em escopo e elimina o xmlns="" espúrio.
+    """
+    return etree.tostring(etree.fromstring(etree.tostring(elemento)), method='c14n')
+
+
+def _sub_dsig(pai, tag, texto=None, **atributos):
+    elemento = etree.SubElement(pai, f"{{{NS_DSIG}}}{tag}", **atributos)
+    if texto is not None:
+        elemento.text = texto
+    return elemento
+
+
+def assinar_evento(xml_evento):
+    """
+    Assina um evento (raiz <Reinf> com um único elemento de evento com atributo 'id').
+
+    A assinatura é inserida como último filho de <Reinf>, referenciando o id
+    do evento. Requer que o processo tenha sido inicializado com o certificado.
+
+    Args:
+        xml_evento (str): XML do evento sem assinatura
+
+    Returns:
+        str: XML do evento assinado
+    """
+    raiz = etree.fromstring(xml_evento.encode('utf-8'))
+    evento = raiz[0]
+    id_evento = evento.get('id')
+
+    digest = hashlib.sha256(_canonicalizar(evento)).digest()
+
+    # SignedInfo é montado e canonicalizado isolado; no documento ele herda o
+    # mesmo namespace padrão (xmldsig) de <Signature>, então a forma canônica é igual
+    signed_info = etree.Element(f"{{{NS_DSIG}}}SignedInfo", nsmap={None: NS_DSIG})
+    _sub_dsig(signed_info, 'CanonicalizationMethod', Algorithm=ALG_C14N)
+    _sub_dsig(signed_info, 'SignatureMethod', Algorithm=ALG_RSA_SHA256)
+    referencia = _sub_dsig(signed_info, 'Reference', URI=f"#{id_evento}")
+    transformacoes = _sub_dsig(referencia, 'Transforms')
+    _sub_dsig(transformacoes, 'Transform', Algorithm=ALG_ENVELOPED)
+    _sub_dsig(transformacoes, 'Transform', Algorithm=ALG_C14N)
+    _sub_dsig(referencia, 'DigestMethod', Algorithm=ALG_SHA256)
+    _sub_dsig(referencia, 'DigestValue', base64.b64encode(digest).decode('ascii'))
+
+    valor = _chave.sign(_canonicalizar(signed_info), padding.PKCS1v15(), hashes.SHA256())
+
+    assinatura = etree.SubElement(raiz, f"{{{NS_DSIG}}}Signature", nsmap={None: NS_DSIG})
+    assinatura.append(signed_info)
+    _sub_dsig(assinatura, 'SignatureValue', base64.b64encode(valor).decode('ascii'))
+    x509_data = _sub_dsig(_sub_dsig(assinatura, 'KeyInfo'), 'X509Data')
+    _sub_dsig(x509_data, 'X509Certificate', _certificado_b64)
+
+    return etree.tostring(raiz, encoding='unicode')
+
+
+def verificar_evento(xml_evento):
+    """
+    Confere digest e assinatura de um evento assinado com o certificado embutido.
+
+    Returns:
+        bool: True se a assinatura é válida
+    """
+    raiz = etree.fromstring(xml_evento.encode('utf-8'))
+    assinatura = raiz.find(f"{{{NS_DSIG}}}Signature")
+    if assinatura is None:
+        return False
+
+    signed_info = assinatura.find(f"{{{NS_DSIG}}}SignedInfo")
+    digest_esperado = signed_info.findtext(f".//{{{NS_DSIG}}}DigestValue")
+    digest = base64.b64encode(hashlib.sha256(_canonicalizar(raiz[0])).digest()).decode('ascii')
+    if digest != digest_esperado:
+        return False
+
+    certificado = x509.load_der_x509_certificate(
+        base64.b64decode(assinatura.findtext(f".//{{{NS_DSIG}}}X509Certificate"))
+    )
+    try:
+        certificado.public_key().verify(
+            base64.b64decode(assinatura.findtext(f"{{{NS_DSIG}}}SignatureValue")),
+            _canonicalizar(signed_info),
+            padding.PKCS1v15(),
+            hashes.SHA256(),
+        )
+    except Exception:
+        return False
+    return True
+
+
+def assinar_eventos(eventos, caminho_pfx, senha, processos=None):
+    """
+    Assina uma lista de eventos em um pool de processos.
+
+    Args:
+        eventos (list): XMLs dos eventos sem assinatura
+        caminho_pfx (str): Certificado A1 (PKCS#12)
+        senha (str): Senha do certificado
+        processos (int): Processos do pool (None = núcleos da máquina)
+
+    Returns:
+        tuple: (XMLs assinados na mesma ordem, assinaturas por segundo)
+    """
+    inicio = time.perf_counter()
+    processos = processos or os.cpu_count() or 1
+
+    if processos == 1 or len(eventos) < 2:
+        _inicializar_processo(caminho_pfx, senha)
+        assinados = [assinar_evento(xml) for xml in eventos]
+    else:
+        with multiprocessing.Pool(processos, _inicializar_processo, (caminho_pfx, senha)) as pool:
+            assinados = pool.map(assinar_evento, eventos, chunksize=max(1, len(eventos) // (processos * 4)))
+
+    duracao = time.perf_counter() - inicio
+    return assinados, (len(eventos) / duracao if duracao > 0 else 0.0)
+
+
+def assinar_lotes(arquivos, caminho_pfx, senha, processos=None, banco_dados=None):
+    """
+    Assina todos os eventos dos arquivos de lote e regrava os arquivos.
+
+    Eventos que já possuem assinatura são mantidos. Com banco_dados, os lotes
+    e seus eventos passam para o status 'assinado' (tabelas de lotes_r4010.py).
+
+    Returns:
+        tuple: (eventos assinados, assinaturas por segundo)
+    """
+    documentos = []
+    pendentes = []
+    for arquivo in arquivos:
+        arvore = etree.parse(arquivo)
+        documentos.append((arquivo, arvore))
+        for evento in arvore.getroot().iter('{*}evento'):
+            reinf = evento[0]
+            if reinf.find(f"{{{NS_DSIG}}}Signature") is None:
+                pendentes.append((evento, etree.tostring(reinf, encoding='unicode')))
+
+    assinados, taxa = assinar_eventos([xml for _, xml in pendentes], caminho_pfx, senha, processos)
+
+    for (evento, _), xml_assinado in zip(pendentes, assinados):
+        evento.replace(evento[0], etree.fromstring(xml_assinado.encode('utf-8')))
+
+    for arquivo, arvore in documentos:
+        arvore.write(arquivo, encoding='UTF-8', xml_declaration=True)
+        print(f"✍️ {arquivo} assinado")
+
+    if banco_dados:
+        conn = sqlite3.connect(banco_dados)
+        try:
+            conn.executemany("UPDATE lotes_xml SET status = 'assinado' WHERE arquivo = ?",
+                             [(arquivo,) for arquivo in arquivos])
+            conn.executemany("UPDATE eventos_xml SET status = 'assinado' WHERE arquivo_lote = ? AND status = 'gerado'",
+                             [(arquivo,) for arquivo in arquivos])
+            conn.commit()
+        finally:
+            conn.close()
+
+    return len(assinados), taxa
+
+
+def gerar_certificado_teste(caminho_pfx, senha='teste', dias=365):
+    """Gera um certificado A1 autoassinado (somente para testes e benchmark)"""
+    chave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    nome = x509.Name([
+        x509.NameAttribute(NameOID.COUNTRY_NAME, 'BR'),
+        x509.NameAttribute(NameOID.COMMON_NAME, 'EMPRESA TESTE LTDA:00000000000191'),
+    ])
+    agora = datetime.now(timezone.utc)
+    certificado = (
+        x509.CertificateBuilder()
+        .subject_name(nome)
+        .issuer_name(nome)
+        .public_key(chave.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(agora)
+        .not_valid_after(agora + timedelta(days=dias))
+        .sign(chave, hashes.SHA256())
+    )
+    with open(caminho_pfx, 'wb') as f:
+        f.write(pkcs12.serialize_key_and_certificates(
+            b'teste', chave, certificado, None,
+            serialization.BestAvailableEncryption(senha.encode('utf-8')),
+        ))
+
+
+def _eventos_benchmark(quantidade):
+    """Eventos sintéticos no formato gerado por lotes_r4010.py"""
+    modelo = (
+        '<Reinf xmlns="http://www.reinf.esocial.gov.br/schemas/evt4010PagtoBeneficiarioPF/v2_01_02">'
+        '<evtRetPF id="ID1000000000001912025010100000{0:05d}"><ideEvento><indRetif>1</indRetif>'
+        '<perApur>2025-01</perApur><tpAmb>2</tpAmb><procEmi>1</procEmi><verProc>benchmark</verProc></ideEvento>'
+        '<ideContri><tpInsc>1</tpInsc><nrInsc>00000000</nrInsc></ideContri><ideEstab><tpInscEstab>1</tpInscEstab>'
+        '<nrInscEstab>00000000000191</nrInscEstab><ideBenef><cpfBenef>{0:011d}</cpfBenef><nmBenef>BENEFICIARIO {0}</nmBenef>'
+        '<ideOpSaude><nrInsc>00000000000191</nrInsc><vlrSaude>123,45</vlrSaude></ideOpSaude></ideBenef></ideEstab>'
+        '</evtRetPF></Reinf>'
+    )
+    return [modelo.format(i) for i in range(1, quantidade + 1)]
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Assina com XML-DSig os eventos dos lotes R-4010")
+    parser.add_argument('lotes', nargs='*', help="Arquivos de lote (padrão: lotes 'gerado' do período no banco)")
+    parser.add_argument('--certificado', help="Certificado A1 .pfx/.p12 (padrão: CERTIFICADO_A1 do config)")
+    parser.add_argument('--senha', help="Senha do certificado (padrão: CERTIFICADO_A1_SENHA do config)")
+    parser.add_argument('--processos', type=int, help="Processos do pool (padrão: núcleos da máquina)")
+    parser.add_argument('--benchmark', type=int, metavar='N', help="Assina N eventos sintéticos e mede a taxa")
+    parser.add_argument('--gerar-certificado-teste', metavar='ARQUIVO',
+                        help="Gera um certificado autoassinado (senha 'teste') e sai")
+    args = parser.parse_args()
+
+    if args.gerar_certificado_teste:
+        gerar_certificado_teste(args.gerar_certificado_teste)
+        print(f"🔑 Certificado de teste gerado em {args.gerar_certificado_teste} (senha 'teste')")
+        return 0
+
+    from config import CERTIFICADO_A1, CERTIFICADO_A1_SENHA, ASSINATURA_XML_PROCESSOS
+
+    caminho_pfx = args.certificado or CERTIFICADO_A1
+    if not caminho_pfx:
+        print("❌ Informe o certificado A1 (--certificado ou CERTIFICADO_A1 no config.py)")
+        return 1
+    senha = args.senha if args.senha is not None else CERTIFICADO_A1_SENHA
+    if senha is None:
+        senha = getpass.getpass("🔑 Senha do certificado: ")
+    processos = args.processos or ASSINATURA_XML_PROCESSOS
+
+    if args.benchmark:
+        eventos = _eventos_benchmark(args.benchmark)
+        assinados, taxa = assinar_eventos(eventos, caminho_pfx, senha, processos)
+        valido = verificar_evento(assinados[0]) and verificar_evento(assinados[-1])
+        print(f"⚡ {len(assinados)} eventos assinados: {taxa:.0f} assinaturas/s "
+              f"({'✅ assinatura verificada' if valido else '❌ assinatura inválida'})")
+        return 0 if valido else 1
+
+    from config import BANCO_DADOS, PERIODO_APURACAO
+
+    arquivos = args.lotes
+    if not arquivos:
+        conn = sqlite3.connect(BANCO_DADOS)
+        try:
+            arquivos = [linha[0] for linha in conn.execute(
+                "SELECT arquivo FROM lotes_xml WHERE periodo_apuracao = ? AND status = 'gerado' ORDER BY arquivo",
+                (PERIODO_APURACAO,)
+            )]
+        except sqlite3.OperationalError:
+            arquivos = []
+        finally:
+            conn.close()
+
+    if not arquivos:
+        print("ℹ️ Nenhum lote pendente de assinatura")
+        return 0
+
+    total, taxa = assinar_lotes(arquivos, caminho_pfx, senha, processos, BANCO_DADOS)
+    print(f"\n✅ {total} eventos assinados em {len(arquivos)} lote(s): {taxa:.0f} assinaturas/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
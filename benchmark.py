@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos Caminhos sem Navegador
+Mede, com planilhas sintéticas de 1k, 10k e 100k grupos, as partes da
+automação que não dependem do Chrome: leitura e agrupamento da planilha,
+mapeamento de dependências, tratamento de valores, helpers de checkpoint
+(escritas e consultas no SQLite) e as duas gerar_planilha_visualizacao
+(main.py e manage.py).
+
+Os resultados vão para um JSON; o comando comparar aponta regressões em
+relação a uma base salva (BENCHMARK_BASE).
+
+Uso:
+    python benchmark.py executar                          # BENCHMARK_TAMANHOS, salva benchmark_<data>.json
+    python benchmark.py executar --tamanhos 1000 --caso mapear_dependencia --salvar-base
+    python benchmark.py comparar benchmark_20250101_120000.json
+    python benchmark.py gerar-planilha --grupos 5000 --arquivo sintetica.xlsx
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import leitura_planilha
+import main as automacao_efd
+import manage
+from config import (
+    BENCHMARK_BASE,
+    BENCHMARK_CHAMADAS_BANCO,
+    BENCHMARK_DISTRIBUICAO_DEPENDENTES,
+    BENCHMARK_FORMATOS_VALOR,
+    BENCHMARK_GRAFIAS_DEPENDENCIA,
+    BENCHMARK_LIMITE_CASO,
+    BENCHMARK_REPETICOES,
+    BENCHMARK_TAMANHOS,
+    BENCHMARK_TOLERANCIA_REGRESSAO,
+)
+
+# Aba da planilha sintética
+PLANILHA_SINTETICA = 'BENCHMARK'
+
+
+def _formatar_valor_sintetico(valor, formato):
+    """Escreve o valor em um dos formatos encontrados nas planilhas reais"""
+    if formato == 'numero':
+        return valor
+    brasileiro = f"{valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    if formato == 'virgula':
+        return f"{valor:.2f}".replace('.', ',')
+    if formato == 'milhar':
+        return brasileiro
+    if formato == 'moeda':
+        return f"R$ {brasileiro}"
+    if formato == 'espacos':
+        return f"  {valor:.2f} "
+    if formato == 'vazio':
+        return ''
+    raise ValueError(f"formato de valor desconhecido: {formato}")
+
+
+def gerar_planilha_sintetica(quantidade, semente=0, distribuicao=None, grafias=None, formatos=None,
+                             chance_zerado_titular=0.03, chance_zerado_dependente=0.05):
+    """
+    Gera as linhas de uma planilha no formato da planilha real (NOME,
+    DEPENDENCIA, CPF, TOTAL), com um TITULAR seguido dos dependentes.
+
+    Args:
+        quantidade (int): Quantidade de grupos (titulares)
+        semente (int): Semente do gerador
+        distribuicao (dict): Quantidade de dependentes -> peso (padrão: BENCHMARK_DISTRIBUICAO_DEPENDENTES)
+        grafias (dict): Grafia da dependência -> peso (padrão: BENCHMARK_GRAFIAS_DEPENDENCIA)
+        formatos (dict): Formato do valor -> peso (padrão: BENCHMARK_FORMATOS_VALOR)
+        chance_zerado_titular (float): Probabilidade de valor zerado no titular
+        chance_zerado_dependente (float): Probabilidade de valor zerado no dependente
+
+    Returns:
+        pandas.DataFrame: Linhas da planilha
+    """
+    distribuicao = distribuicao or BENCHMARK_DISTRIBUICAO_DEPENDENTES
+    grafias = grafias or BENCHMARK_GRAFIAS_DEPENDENCIA
+    formatos = formatos or BENCHMARK_FORMATOS_VALOR
+
+    aleatorio = random.Random(semente)
+    quantidades, pesos_quantidades = [int(chave) for chave in distribuicao], list(distribuicao.values())
+    nomes_grafias, pesos_grafias = list(grafias), list(grafias.values())
+    nomes_formatos, pesos_formatos = list(formatos), list(formatos.values())
+
+    linhas = []
+    sequencia = 0
+
+    def pessoa(nome, dependencia, chance_zerado):
+        nonlocal sequencia
+        sequencia += 1
+        cpf = f"{sequencia:011d}"
+        valor = 0 if aleatorio.random() < chance_zerado else round(aleatorio.uniform(50, 2500), 2)
+        formato = aleatorio.choices(nomes_formatos, weights=pesos_formatos)[0]
+        linhas.append({
+            'NOME': nome,
+            'DEPENDENCIA': dependencia,
+            'CPF': f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
+            'TOTAL': _formatar_valor_sintetico(valor, formato),
+        })
+
+    for i in range(quantidade):
+        pessoa(f"TITULAR {i + 1}", 'TITULAR', chance_zerado_titular)
+        for j in range(aleatorio.choices(quantidades, weights=pesos_quantidades)[0]):
+            pessoa(f"DEPENDENTE {i + 1}.{j + 1}",
+                   aleatorio.choices(nomes_grafias, weights=pesos_grafias)[0], chance_zerado_dependente)
+
+    return pd.DataFrame(linhas)
+
+
+def salvar_planilha_sintetica(dados, arquivo, planilha=PLANILHA_SINTETICA):
+    """Salva as linhas em Excel com o cabeçalho na segunda linha, como a planilha real"""
+    with pd.ExcelWriter(arquivo, engine='openpyxl') as writer:
+        dados.to_excel(writer, sheet_name=planilha, index=False, startrow=1)
+
+
+class AutomacaoSemNavegador(automacao_efd.AutomacaoEFD):
+    """AutomacaoEFD sem Chrome, só com banco e helpers"""
+
+    def configurar_chrome(self):
+        pass
+
+
+def _popular_banco(grupos):
+    """Preenche o banco de checkpoints como se todos os grupos já tivessem sido processados"""
+    progresso, dependentes, planos, infos, recibos = [], [], [], [], []
+    for grupo in grupos:
+        titular = grupo[0]
+        cpf, nome = titular['CPF'], titular['NOME']
+        progresso += [
+            (cpf, nome, 'inicio_grupo', 'iniciado', None),
+            (cpf, nome, 'primeira_etapa', 'sucesso', None),
+            (cpf, nome, 'envio', 'sucesso', None),
+            (cpf, nome, 'grupo_completo', 'sucesso', 'benchmark'),
+        ]
+        planos.append((cpf, '00000000000191', str(titular['TOTAL']), 'sucesso'))
+        recibos.append((cpf, automacao_efd.PERIODO_APURACAO, nome, '1.0000.00000-0'))
+        for dependente in grupo[1:]:
+            dependentes.append((cpf, dependente['CPF'], leitura_planilha.mapear_dependencia(dependente['DEPENDENCIA']),
+                                None, 'sucesso'))
+            infos.append((cpf, dependente['CPF'], str(dependente['TOTAL']), 'sucesso'))
+
+    conn = sqlite3.connect(automacao_efd.BANCO_DADOS)
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO progresso_efd (cpf_titular, nome_titular, etapa_atual, status, observacoes)
+        VALUES (?, ?, ?, ?, ?)
+    ''', progresso)
+    cursor.executemany('''
+        INSERT INTO dependentes_processados (cpf_titular, cpf_dependente, relacao, descricao_agregado, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', dependentes)
+    cursor.executemany('''
+        INSERT INTO planos_processados (cpf_titular, cnpj_operadora, valor_titular, status) VALUES (?, ?, ?, ?)
+    ''', planos)
+    cursor.executemany('''
+        INSERT INTO info_dependentes_processados (cpf_titular, cpf_dependente, valor_dependente, status)
+        VALUES (?, ?, ?, ?)
+    ''', infos)
+    cursor.executemany('''
+        INSERT OR REPLACE INTO recibos (cpf_titular, periodo_apuracao, nome_titular, numero_recibo)
+        VALUES (?, ?, ?, ?)
+    ''', recibos)
+    conn.commit()
+    conn.close()
+
+
+def _casos_banco(automacao, grupos, chamadas, aleatorio):
+    """
+    Helpers de checkpoint (escrita e consulta), cada um com a lista de
+    argumentos das chamadas medidas sobre o banco já populado.
+    """
+    amostra = aleatorio.sample(grupos, min(chamadas, len(grupos)))
+    titulares = [(grupo[0]['CPF'], grupo[0]['NOME']) for grupo in amostra]
+    pares_dependentes = [(grupo[0]['CPF'], grupo[-1]['CPF']) for grupo in amostra]
+    resultado_envio = {'recibo': '1.0000.00000-0', 'protocolo': '0000000001', 'data_hora': None,
+                       'texto': 'MS7001 - Evento recebido com sucesso'}
+
+    return {
+        # Escritas
+        'salvar_checkpoint': (automacao.salvar_checkpoint,
+                              [(cpf, nome, 'benchmark', 'sucesso', {'indice': i}) for i, (cpf, nome) in enumerate(titulares)]),
+        'salvar_recibo': (automacao.salvar_recibo, [(cpf, nome, resultado_envio) for cpf, nome in titulares]),
+        'salvar_dependente_processado': (automacao.salvar_dependente_processado,
+                                         [(cpf, dep, '3', None, 'sucesso') for cpf, dep in pares_dependentes]),
+        'salvar_plano_processado': (automacao.salvar_plano_processado,
+                                    [(cpf, '00000000000191', '100,00', 'sucesso') for cpf, _ in titulares]),
+        'salvar_info_dependente_processado': (automacao.salvar_info_dependente_processado,
+                                              [(cpf, dep, '50,00', 'sucesso') for cpf, dep in pares_dependentes]),
+        'salvar_checkpoint_indice': (automacao.salvar_checkpoint_indice, [(i,) for i in range(len(titulares))]),
+        # Consultas
+        'verificar_grupo_completamente_processado': (automacao.verificar_grupo_completamente_processado,
+                                                     [(cpf,) for cpf, _ in titulares]),
+        'verificar_ultimo_status_pulado': (automacao.verificar_ultimo_status_pulado, [(cpf,) for cpf, _ in titulares]),
+        'verificar_progresso': (automacao.verificar_progresso, [(cpf,) for cpf, _ in titulares]),
+        'verificar_dependente_processado': (automacao.verificar_dependente_processado, pares_dependentes),
+        'verificar_plano_processado': (automacao.verificar_plano_processado,
+                                       [(cpf, '00000000000191') for cpf, _ in titulares]),
+        'verificar_info_dependente_processado': (automacao.verificar_info_dependente_processado, pares_dependentes),
+        'carregar_checkpoint_indice': (automacao.carregar_checkpoint_indice, [()] * len(titulares)),
+    }
+
+
+def _medir(funcao, argumentos, repeticoes=1):
+    """Menor tempo total (segundos) entre as repetições de funcao(*args) para cada args"""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for args in argumentos:
+            funcao(*args)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+
+def _resultado(segundos, chamadas):
+    return {'segundos': segundos, 'chamadas': chamadas, 'us_por_chamada': segundos / max(chamadas, 1) * 1e6}
+
+
+def _estimativa(historico, tamanho):
+    """
+    Estima a duração de um caso de chamada única no tamanho pedido a partir
+    dos tamanhos menores já medidos (expoente de crescimento dos dois últimos).
+    """
+    if not historico:
+        return None
+    if len(historico) == 1:
+        (n1, t1), expoente = historico[-1], 1.0
+    else:
+        (n0, t0), (n1, t1) = historico[-2], historico[-1]
+        expoente = max(1.0, math.log(t1 / t0) / math.log(n1 / n0)) if t0 > 0 and t1 > 0 else 1.0
+    return t1 * (tamanho / n1) ** expoente
+
+
+def executar_tamanho(quantidade, args, casos, diretorio, historico):
+    """
+    Mede todos os casos selecionados para uma quantidade de grupos.
+
+    Returns:
+        dict: Caso -> resultado (segundos, chamadas, us_por_chamada) ou {'pulado': motivo}
+    """
+    resultados = {}
+    aleatorio = random.Random(args.semente)
+
+    print(f"\n📊 {quantidade:,} grupos: gerando planilha sintética...")
+    dados = gerar_planilha_sintetica(quantidade, args.semente)
+    arquivo = os.path.join(diretorio, f"sintetica_{quantidade}.xlsx")
+    salvar_planilha_sintetica(dados, arquivo)
+
+    banco = os.path.join(diretorio, f"benchmark_{quantidade}.db")
+    automacao_efd.BANCO_DADOS = banco
+
+    with open(os.devnull, 'w', encoding='utf-8') as nulo:
+        with contextlib.redirect_stdout(nulo):
+            automacao = AutomacaoSemNavegador()
+            automacao.verificar_dados_manual = False
+
+        def registrar(nome, resultado):
+            resultados[nome] = resultado
+            if 'pulado' in resultado:
+                print(f"   ⏭️ {nome}: {resultado['pulado']}")
+            else:
+                print(f"   ⏱️ {nome}: {resultado['segundos']:.3f}s ({resultado['us_por_chamada']:,.1f} µs/chamada)")
+
+        def chamada_unica(nome, funcao):
+            """Casos de chamada única: pulados se a estimativa passar de BENCHMARK_LIMITE_CASO"""
+            estimativa = _estimativa(historico.get(nome, []), quantidade)
+            if estimativa is not None and estimativa > args.limite:
+                registrar(nome, {'pulado': f"estimativa {estimativa:,.0f}s acima do limite de {args.limite:g}s"})
+                return
+            with contextlib.redirect_stdout(nulo):
+                segundos = _medir(funcao, [()])
+            historico.setdefault(nome, []).append((quantidade, segundos))
+            registrar(nome, _resultado(segundos, 1))
+
+        # Leitura e agrupamento da planilha (sem o cache de grupos)
+        if 'processar_dataframe_por_grupos' in casos:
+            def processar():
+                automacao._cache_grupos.clear()
+                grupos_lidos = automacao.processar_dataframe_por_grupos(arquivo, PLANILHA_SINTETICA)
+                if len(grupos_lidos) != quantidade:
+                    raise RuntimeError(f"{len(grupos_lidos)} grupos lidos de {quantidade}")
+            chamada_unica('processar_dataframe_por_grupos', processar)
+
+        grupos = leitura_planilha.agrupar_por_titular(dados)
+        dependencias = [(dependente['DEPENDENCIA'],) for grupo in grupos for dependente in grupo[1:]]
+        valores = [(valor,) for valor in dados['TOTAL']]
+
+        # Funções por linha da planilha
+        for nome, funcao, argumentos in (
+            ('mapear_dependencia', automacao.mapear_dependencia, dependencias),
+            ('formatar_valor', automacao.formatar_valor, valores),
+            ('valor_eh_zero_ou_nulo', automacao.valor_eh_zero_ou_nulo, valores),
+        ):
+            if nome in casos:
+                with contextlib.redirect_stdout(nulo):
+                    segundos = _medir(funcao, argumentos, args.repeticoes)
+                registrar(nome, _resultado(segundos, len(argumentos)))
+
+        # Helpers de checkpoint sobre um banco com todos os grupos
+        with contextlib.redirect_stdout(nulo):
+            _popular_banco(grupos)
+        for nome, (funcao, argumentos) in _casos_banco(automacao, grupos, args.chamadas_banco, aleatorio).items():
+            if nome in casos:
+                with contextlib.redirect_stdout(nulo):
+                    segundos = _medir(funcao, argumentos)
+                registrar(nome, _resultado(segundos, len(argumentos)))
+
+        # Planilhas de visualização (gravadas no diretório temporário)
+        gerenciador = manage.GerenciadorCheckpoint()
+        gerenciador.banco_dados = banco
+        diretorio_original = os.getcwd()
+        os.chdir(diretorio)
+        try:
+            if 'gerar_planilha_visualizacao_main' in casos:
+                chamada_unica('gerar_planilha_visualizacao_main', automacao.gerar_planilha_visualizacao)
+            if 'gerar_planilha_visualizacao_manage' in casos:
+                chamada_unica('gerar_planilha_visualizacao_manage', gerenciador.gerar_planilha_visualizacao)
+            for arquivo_gerado in glob.glob('visualizacao_checkpoint_*.xlsx'):
+                os.remove(arquivo_gerado)
+        finally:
+            os.chdir(diretorio_original)
+
+    return resultados
+
+
+# Casos na ordem em que são medidos
+CASOS = [
+    'processar_dataframe_por_grupos',
+    'mapear_dependencia',
+    'formatar_valor',
+    'valor_eh_zero_ou_nulo',
+    'salvar_checkpoint',
+    'salvar_recibo',
+    'salvar_dependente_processado',
+    'salvar_plano_processado',
+    'salvar_info_dependente_processado',
+    'salvar_checkpoint_indice',
+    'verificar_grupo_completamente_processado',
+    'verificar_ultimo_status_pulado',
+    'verificar_progresso',
+    'verificar_dependente_processado',
+    'verificar_plano_processado',
+    'verificar_info_dependente_processado',
+    'carregar_checkpoint_indice',
+    'gerar_planilha_visualizacao_main',
+    'gerar_planilha_visualizacao_manage',
+]
+
+
+def comando_executar(args):
+    casos = args.caso or CASOS
+    desconhecidos = [caso for caso in casos if caso not in CASOS]
+    if desconhecidos:
+        print(f"❌ Casos desconhecidos: {', '.join(desconhecidos)}")
+        return 1
+
+    print("\n" + "="*60)
+    print("⏱️ BENCHMARK DOS CAMINHOS SEM NAVEGADOR")
+    print("="*60)
+    print(f"📏 Tamanhos: {', '.join(f'{n:,}' for n in args.tamanhos)} | Casos: {len(casos)}")
+
+    resultado = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': args.semente,
+        'repeticoes': args.repeticoes,
+        'chamadas_banco': args.chamadas_banco,
+        'tamanhos': {},
+    }
+
+    banco_original = automacao_efd.BANCO_DADOS
+    diretorio = tempfile.mkdtemp(prefix='benchmark_efd_')
+    historico = {}
+    try:
+        for quantidade in sorted(args.tamanhos):
+            resultado['tamanhos'][str(quantidade)] = executar_tamanho(quantidade, args, casos, diretorio, historico)
+    finally:
+        automacao_efd.BANCO_DADOS = banco_original
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    saida = args.saida or f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados salvos em {saida}")
+
+    if args.salvar_base:
+        shutil.copyfile(saida, args.base)
+        print(f"📌 Base atualizada: {args.base}")
+    return 0
+
+
+def comparar_resultados(atual, base, tolerancia):
+    """
+    Compara o tempo por chamada de cada caso e tamanho presentes nos dois resultados.
+
+    Returns:
+        list: (tamanho, caso, us_base, us_atual, variação, regressão)
+    """
+    comparacoes = []
+    for tamanho, casos_atuais in atual['tamanhos'].items():
+        casos_base = base['tamanhos'].get(tamanho, {})
+        for caso in CASOS:
+            medida_atual, medida_base = casos_atuais.get(caso), casos_base.get(caso)
+            if not medida_atual or not medida_base or 'pulado' in medida_atual or 'pulado' in medida_base:
+                continue
+            us_atual, us_base = medida_atual['us_por_chamada'], medida_base['us_por_chamada']
+            variacao = us_atual / us_base - 1 if us_base else 0.0
+            comparacoes.append((tamanho, caso, us_base, us_atual, variacao, variacao > tolerancia))
+    return comparacoes
+
+
+def comando_comparar(args):
+    if not os.path.exists(args.base):
+        print(f"❌ Base não encontrada: {args.base} (use executar --salvar-base)")
+        return 1
+
+    candidatos = [arquivo for arquivo in glob.glob('benchmark_*.json')
+                  if os.path.abspath(arquivo) != os.path.abspath(args.base)]
+    atual_arquivo = args.resultado or max(candidatos, key=os.path.getmtime, default=None)
+    if not atual_arquivo:
+        print("❌ Nenhum resultado para comparar")
+        return 1
+
+    with open(atual_arquivo, encoding='utf-8') as arquivo:
+        atual = json.load(arquivo)
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+
+    comparacoes = comparar_resultados(atual, base, args.tolerancia)
+    if not comparacoes:
+        print("⚠️ Nenhum caso em comum entre o resultado e a base")
+        return 1
+
+    print(f"\n📊 {atual_arquivo} x {args.base} (tolerância {args.tolerancia:.0%})")
+    print(f"{'Grupos':>8}  {'Caso':<42}{'base µs':>12}{'atual µs':>12}{'variação':>10}")
+    regressoes = 0
+    for tamanho, caso, us_base, us_atual, variacao, regressao in comparacoes:
+        marca = "  ⚠️ REGRESSÃO" if regressao else ""
+        regressoes += regressao
+        print(f"{int(tamanho):>8,}  {caso:<42}{us_base:>12,.1f}{us_atual:>12,.1f}{variacao:>+10.0%}{marca}")
+
+    if regressoes:
+        print(f"\n❌ {regressoes} regressão(ões) acima de {args.tolerancia:.0%}")
+        return 1
+    print("\n✅ Nenhuma regressão")
+    return 0
+
+
+def comando_gerar_planilha(args):
+    dados = gerar_planilha_sintetica(args.grupos, args.semente)
+    salvar_planilha_sintetica(dados, args.arquivo, args.planilha)
+    print(f"✅ {args.grupos:,} grupos ({len(dados):,} linhas) salvos em {args.arquivo} (aba {args.planilha})")
+    return 0
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos da automação que não usam o navegador")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    executar = subparsers.add_parser('executar', help="Mede os casos e salva o resultado em JSON")
+    executar.add_argument('--tamanhos', type=int, nargs='+', default=BENCHMARK_TAMANHOS,
+                          help="Quantidades de grupos (padrão: BENCHMARK_TAMANHOS)")
+    executar.add_argument('--caso', action='append', help=f"Caso a medir (padrão: todos): {', '.join(CASOS)}")
+    executar.add_argument('--repeticoes', type=int, default=BENCHMARK_REPETICOES,
+                          help="Repetições das funções por linha (vale o menor tempo)")
+    executar.add_argument('--chamadas-banco', type=int, default=BENCHMARK_CHAMADAS_BANCO,
+                          help="Chamadas medidas de cada helper de checkpoint")
+    executar.add_argument('--limite', type=float, default=BENCHMARK_LIMITE_CASO,
+                          help="Pula casos de chamada única com estimativa acima deste tempo (s)")
+    executar.add_argument('--semente', type=int, default=0, help="Semente da planilha sintética")
+    executar.add_argument('--saida', help="Arquivo JSON do resultado (padrão: benchmark_<data>.json)")
+    executar.add_argument('--salvar-base', action='store_true', help="Também grava o resultado como base")
+    executar.add_argument('--base', default=BENCHMARK_BASE, help="Arquivo da base (padrão: BENCHMARK_BASE)")
+    executar.set_defaults(funcao=comando_executar)
+
+    comparar = subparsers.add_parser('comparar', help="Compara um resultado com a base e aponta regressões")
+    comparar.add_argument('resultado', nargs='?', help="Resultado JSON (padrão: o benchmark_*.json mais recente)")
+    comparar.add_argument('--base', default=BENCHMARK_BASE, help="Arquivo da base (padrão: BENCHMARK_BASE)")
+    comparar.add_argument('--tolerancia', type=float, default=BENCHMARK_TOLERANCIA_REGRESSAO,
+                          help="Aumento relativo aceito no tempo por chamada (ex: 0.25 = 25%%)")
+    comparar.set_defaults(funcao=comando_comparar)
+
+    gerar = subparsers.add_parser('gerar-planilha', help="Só gera uma planilha sintética")
+    gerar.add_argument('--grupos', type=int, required=True, help="Quantidade de grupos")
+    gerar.add_argument('--arquivo', required=True, help="Arquivo .xlsx de saída")
+    gerar.add_argument('--planilha', default=PLANILHA_SINTETICA, help="Nome da aba")
+    gerar.add_argument('--semente', type=int, default=0, help="Semente do gerador")
+    gerar.set_defaults(funcao=comando_gerar_planilha)
+
+    args = parser.parse_args()
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
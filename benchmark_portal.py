@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da Automação contra o Portal Simulado
+Executa o AutomacaoEFD com o Chrome real contra o portal REINF simulado
+(portal_simulado.py) uma vez por perfil de configuração (BENCHMARK_PERFIS) e
+compara os grupos por hora de cada perfil.
+
+Cada perfil roda com um portal novo em porta livre, um banco de checkpoints
+próprio e assinatura pelo protocolo do assinador atendido pelo próprio portal.
+As variáveis do perfil sobrescrevem as do config.py só durante a execução.
+
+Uso:
+    python benchmark_portal.py                          # todos os perfis, BENCHMARK_GRUPOS grupos
+    python benchmark_portal.py --grupos 50 --perfil atual --perfil esperas_reduzidas
+    python benchmark_portal.py --perfis perfis.json --headless --json resultado.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import main as automacao_efd
+from config import (
+    BENCHMARK_GRUPOS,
+    BENCHMARK_PERFIS,
+    PORTAL_SIMULADO_ERROS,
+    PORTAL_SIMULADO_LATENCIAS,
+)
+from portal_simulado import criar_portal, iniciar_em_segundo_plano, ler_pares
+from simulacao import gerar_grupos_sinteticos
+
+# Tempo máximo para o formulário do portal simulado aparecer (segundos)
+TEMPO_MAXIMO_FORMULARIO = 30
+
+
+class AutomacaoBenchmark(automacao_efd.AutomacaoEFD):
+    """AutomacaoEFD sem navegação manual: aguarda o formulário do portal simulado"""
+
+    def aguardar_login(self):
+        limite = time.monotonic() + TEMPO_MAXIMO_FORMULARIO
+        while not self._formulario_visivel():
+            if time.monotonic() > limite:
+                raise TimeoutError("formulário do portal simulado não apareceu")
+            time.sleep(0.2)
+
+
+def configuracao_base(url_portal, banco, headless):
+    """Variáveis do config.py sobrescritas em todos os perfis"""
+    argumentos = list(automacao_efd.CHROME_ARGS)
+    if headless:
+        argumentos.append('--headless=new')
+
+    return {
+        'URL_BASE': url_portal + '/',
+        'BANCO_DADOS': banco,
+        'ASSINATURA_BACKEND': 'protocolo',
+        'ASSINADOR_SERVICO_URL': url_portal,
+        'ASSINADOR_CERTIFICADO': None,
+        'CHROME_MODO_ANEXAR': False,
+        'CHROME_PROFILE_DIR': 'chrome_benchmark',
+        'CHROME_ARGS': argumentos,
+        'FILA_TRABALHO_ATIVA': False,
+    }
+
+
+@contextlib.contextmanager
+def configuracao_sobrescrita(valores):
+    """Sobrescreve globais do main.py (vindos do config.py) e restaura ao final"""
+    desconhecidas = [nome for nome in valores if not hasattr(automacao_efd, nome)]
+    if desconhecidas:
+        raise KeyError(f"variáveis desconhecidas no perfil: {', '.join(desconhecidas)}")
+
+    originais = {nome: getattr(automacao_efd, nome) for nome in valores}
+    try:
+        for nome, valor in valores.items():
+            setattr(automacao_efd, nome, valor)
+        yield
+    finally:
+        for nome, valor in originais.items():
+            setattr(automacao_efd, nome, valor)
+
+
+def executar_perfil(nome, sobrescritas, grupos, args, latencias, erros):
+    """
+    Executa todos os grupos com um perfil e mede o ritmo.
+
+    Returns:
+        dict: Perfil, duração, grupos por hora e contagem de resultados
+    """
+    banco = os.path.abspath(f"benchmark_{nome}.db")
+    if os.path.exists(banco):
+        os.remove(banco)
+
+    servidor = criar_portal(0, latencias, erros, args.semente)
+    url_portal = iniciar_em_segundo_plano(servidor)
+
+    saida = open(os.devnull, 'w', encoding='utf-8') if args.silencioso else sys.stdout
+    automacao = None
+    try:
+        with configuracao_sobrescrita({**configuracao_base(url_portal, banco, args.headless), **sobrescritas}), \
+             contextlib.redirect_stdout(saida):
+            automacao = AutomacaoBenchmark()
+            automacao.verificar_dados_manual = False
+            automacao.preparar_sessao(configurar_coordenadas=False)
+
+            inicio = time.perf_counter()
+            resumo = automacao.processar_todos_os_grupos(grupos) or {}
+            duracao = time.perf_counter() - inicio
+    finally:
+        if automacao is not None:
+            with contextlib.redirect_stdout(saida):
+                automacao.fechar()
+        if saida is not sys.stdout:
+            saida.close()
+        servidor.shutdown()
+        servidor.server_close()
+
+    return {
+        'perfil': nome,
+        'grupos': len(grupos),
+        'duracao': duracao,
+        'grupos_por_hora': len(grupos) / duracao * 3600 if duracao else 0,
+        'segundos_por_grupo': duracao / max(len(grupos), 1),
+        'sucessos': resumo.get('sucessos', 0),
+        'pulados': resumo.get('pulados', 0),
+        'erros': resumo.get('erros', 0),
+    }
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Compara perfis de configuração contra o portal REINF simulado")
+    parser.add_argument('--grupos', type=int, default=BENCHMARK_GRUPOS,
+                        help="Grupos sintéticos por perfil (padrão: BENCHMARK_GRUPOS)")
+    parser.add_argument('--perfil', action='append', help="Perfil a executar (padrão: todos)")
+    parser.add_argument('--perfis', help="Arquivo JSON com os perfis (no lugar de BENCHMARK_PERFIS)")
+    parser.add_argument('--latencia', action='append', metavar='NOME=S',
+                        help="Latência do portal simulado (ver portal_simulado.py --help)")
+    parser.add_argument('--erro', action='append', metavar='NOME=P', help="Probabilidade de recusa do portal")
+    parser.add_argument('--semente', type=int, default=42, help="Semente dos grupos e do sorteio de erros")
+    parser.add_argument('--headless', action='store_true', help="Executa o Chrome sem janela")
+    parser.add_argument('--json', help="Salva os resultados neste arquivo")
+    parser.add_argument('--silencioso', action='store_true', help="Oculta o log da automação (mostra só o resultado)")
+    args = parser.parse_args()
+
+    perfis = BENCHMARK_PERFIS
+    if args.perfis:
+        with open(args.perfis, encoding='utf-8') as arquivo:
+            perfis = json.load(arquivo)
+
+    nomes = args.perfil or list(perfis)
+    desconhecidos = [nome for nome in nomes if nome not in perfis]
+    if desconhecidos:
+        print(f"❌ Perfis desconhecidos: {', '.join(desconhecidos)}")
+        return 1
+
+    latencias = ler_pares(args.latencia, PORTAL_SIMULADO_LATENCIAS, '--latencia')
+    erros = ler_pares(args.erro, PORTAL_SIMULADO_ERROS, '--erro')
+    grupos = gerar_grupos_sinteticos(args.grupos, args.semente)
+
+    print("\n" + "="*60)
+    print("🏁 BENCHMARK CONTRA O PORTAL SIMULADO")
+    print("="*60)
+    print(f"📊 {len(grupos)} grupos por perfil | Perfis: {', '.join(nomes)}")
+
+    resultados = []
+    for nome in nomes:
+        print(f"\n▶️ Perfil '{nome}'...")
+        try:
+            resultado = executar_perfil(nome, perfis[nome], grupos, args, latencias, erros)
+        except Exception as e:
+            print(f"❌ Perfil '{nome}' falhou: {e}")
+            continue
+        resultados.append(resultado)
+        print(f"✅ {resultado['grupos_por_hora']:,.0f} grupos/hora ({resultado['duracao']:.1f}s)")
+
+    if not resultados:
+        return 1
+
+    print(f"\n{'='*60}")
+    print("📊 RESULTADO POR PERFIL")
+    print(f"{'='*60}")
+    print(f"{'Perfil':<22}{'grupos/h':>10}{'s/grupo':>10}{'sucesso':>10}")
+    for resultado in resultados:
+        taxa = resultado['sucessos'] / max(resultado['grupos'], 1) * 100
+        print(f"{resultado['perfil']:<22}{resultado['grupos_por_hora']:>10,.0f}"
+              f"{resultado['segundos_por_grupo']:>10.2f}{taxa:>9.0f}%")
+    print(f"{'='*60}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump({'latencias': latencias, 'erros': erros, 'resultados': resultados},
+                      arquivo, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados salvos em {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente do Daemon EFD-REINF
+Envia jobs para a automação em modo daemon (python main.py --daemon)
+e acompanha o progresso em tempo real
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+# Importar configurações
+from config import SOCKET_DAEMON
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Cliente do daemon da automação EFD-REINF")
+    parser.add_argument('--arquivo', help="Arquivo Excel (padrão: ARQUIVO_EXCEL do config)")
+    parser.add_argument('--planilha', help="Aba do Excel (padrão: PLANILHA do config)")
+    parser.add_argument('--periodo', help="Período de apuração MM/AAAA (precisa ser o PERIODO_APURACAO do daemon)")
+    parser.add_argument('--cpf', action='append', dest='cpfs', default=[],
+                        help="CPF do titular a processar (pode repetir); sem CPFs processa a planilha toda")
+    parser.add_argument('--parar', action='store_true', help="Encerra o daemon")
+    args = parser.parse_args()
+
+    if args.parar:
+        job = {'comando': 'parar'}
+    else:
+        job = {
+            'arquivo': args.arquivo,
+            'planilha': args.planilha,
+            'periodo': args.periodo,
+            'cpfs': args.cpfs,
+        }
+
+    try:
+        conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexao.connect(SOCKET_DAEMON)
+    except OSError as e:
+        print(f"❌ Daemon não encontrado em {SOCKET_DAEMON}: {e}")
+        print("💡 Inicie com: python main.py --daemon")
+        return 1
+
+    with conexao:
+        conexao.sendall((json.dumps(job) + '\n').encode('utf-8'))
+
+        for linha in conexao.makefile('r', encoding='utf-8'):
+            mensagem = json.loads(linha)
+
+            if mensagem['tipo'] == 'log':
+                print(mensagem['mensagem'])
+                continue
+
+            # Mensagem final do job
+            if mensagem.get('erro'):
+                print(f"\n❌ Job falhou: {mensagem['erro']}")
+                return 1
+            if args.parar:
+                print("✅ Daemon encerrado")
+            else:
+                print(f"\n✅ Job concluído: {mensagem.get('resumo')}")
+            return 0
+
+    print("❌ Conexão encerrada pelo daemon antes do fim do job")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,90 @@ PLANILHA = ''
 # Arquivo do banco de dados para checkpoints
 BANCO_DADOS = ''
 
+# Socket Unix usado pelo modo daemon (python main.py --daemon) e pelo cliente.py
+SOCKET_DAEMON = 'efd_daemon.sock'
+
+# ============================================================
+# TEMPOS DAS ETAPAS (tabela tempos_etapas - ver manage.py)
+# ============================================================
+
+# Registrar a duração de cada etapa do grupo (dados iniciais, modais, envio, assinatura...)
+TEMPOS_ETAPAS_ATIVO = True
+
+# Quantidade de etapas acumuladas em memória antes de gravar no banco (uma transação por lote)
+TEMPOS_ETAPAS_LOTE = 50
+
+# ============================================================
+# TEMPO POR CATEGORIA (tabela tempos_categorias - ver manage.py)
+# ============================================================
+
+# Separar o tempo de cada grupo em pausas (time.sleep), espera do portal, comandos
+# WebDriver, SQLite e prompts, com a contagem de comandos e um resumo ao final
+CONTABILIDADE_TEMPO_ATIVA = True
+
+# Quantidade de grupos acumulados em memória antes de gravar no banco
+CONTABILIDADE_TEMPO_LOTE = 50
+
+# ============================================================
+# ANDAMENTO DA EXECUÇÃO (python andamento.py mostra o último status)
+# ============================================================
+
+# Intervalo entre as linhas de status (ritmo, taxas, previsão de término) em segundos
+ANDAMENTO_INTERVALO = 60
+
+# Quantidade de grupos recentes usada no cálculo de grupos por hora (pulados não contam)
+ANDAMENTO_JANELA = 20
+
+# Arquivo JSON com o último status, lido sem abrir o SQLite (None para não gravar)
+ANDAMENTO_ARQUIVO = 'andamento_efd.json'
+
+# ============================================================
+# LEASES DE GRUPOS (python main.py --lease)
+# ============================================================
+
+# Validade de um lease sem renovação (segundos) - após isso outro worker pode assumir o grupo
+LEASE_DURACAO = 300
+
+# Intervalo de renovação do lease enquanto o grupo é processado (segundos)
+LEASE_RENOVACAO = 60
+
+# Máximo de tentativas para um grupo que falhou antes de não ser mais reivindicado
+LEASE_MAX_TENTATIVAS = 3
+
+# ============================================================
+# FILA DE TRABALHO (retentativas com backoff)
+# ============================================================
+
+# Processar pela fila persistente (tabela fila_grupos) em vez do loop linear pelo
+# checkpoint de índice. Grupos com erro transitório voltam para a fila com backoff.
+# Use python main.py --linear para o comportamento antigo.
+FILA_TRABALHO_ATIVA = True
+
+# Ordem da fila: 'novos_primeiro' (retentativas no final), 'retentativas_primeiro' ou 'planilha'
+FILA_ORDEM = 'novos_primeiro'
+
+# Máximo de tentativas de um grupo antes de sair da fila como falha
+FILA_MAX_TENTATIVAS = 3
+
+# Espera antes da retentativa: FILA_BACKOFF_BASE * 2^(tentativa-1), até FILA_BACKOFF_MAXIMO (segundos)
+FILA_BACKOFF_BASE = 60
+FILA_BACKOFF_MAXIMO = 1800
+
+# Erros permanentes (não são tentados de novo): etapas do checkpoint de erro e trechos
+# das observações. CPF já lançado já vira 'pulado' e nunca volta para a fila.
+FILA_ETAPAS_PERMANENTES = []
+FILA_TEXTOS_PERMANENTES = ['inválido', 'invalido', 'campo obrigatório', 'Inclusão não permitida']
+
+# Etapas de erro reprocessadas por python main.py --retry-failed (último checkpoint do titular)
+ETAPAS_REPROCESSAVEIS = [
+    'grupo_erro',
+    'erro_sem_confirmacao',
+    'erro_assinatura',
+    'erro_envio',
+    'erro_processamento',
+    'erro_alerta_portal',
+]
+
 # ============================================================
 # DADOS DA EMPRESA
 # ============================================================
@@ -35,6 +119,38 @@ CNPJ_EMPRESA = "00.000.000/0000-00"
 # CNPJ padrão da operadora de saúde (formato 00.000.000/0000-00)
 CNPJ_OPERADORA_PADRAO = "00.000.000/0000-00"
 
+# ============================================================
+# LOTES XML DO R-4010 (python lotes_r4010.py)
+# ============================================================
+
+# Namespaces do leiaute do evento R-4010 e do lote assíncrono (conferir com a versão vigente)
+XML_R4010_NAMESPACE = 'http://www.reinf.esocial.gov.br/schemas/evt4010PagtoBeneficiarioPF/v2_01_02'
+XML_LOTE_NAMESPACE = 'http://www.reinf.esocial.gov.br/schemas/envioLoteEventosAssincrono/v1_00_00'
+
+# Caminho do XSD oficial do R-4010 para validação (None = não validar; requer lxml)
+XML_XSD_R4010 = None
+
+# Ambiente do evento: 1 = Produção, 2 = Produção restrita
+XML_TIPO_AMBIENTE = 2
+
+# Versão do processo emissor informada em verProc
+XML_VERSAO_PROCESSO = 'rpa-efd-1.0'
+
+# Eventos por lote (máximo aceito pelo webservice: 50)
+LOTE_XML_TAMANHO = 50
+
+# Diretório onde os lotes são gravados (um subdiretório por período)
+LOTE_XML_DIRETORIO = 'lotes_xml'
+
+# Certificado A1 (.pfx/.p12) usado por assinatura_xml.py para assinar os lotes
+CERTIFICADO_A1 = ''
+
+# Senha do certificado A1 (None = perguntar ao executar)
+CERTIFICADO_A1_SENHA = None
+
+# Processos usados na assinatura dos lotes (None = núcleos da máquina)
+ASSINATURA_XML_PROCESSOS = None
+
 # ============================================================
 # CONFIGURAÇÕES DE TEMPO E ESPERA
 # ============================================================
@@ -48,6 +164,16 @@ TIMEOUT_WEBDRIVER = 10
 # Timeout para aguardar alerta de sucesso da assinatura (segundos)
 TIMEOUT_ALERTA_SUCESSO = 60
 
+# Intervalo entre verificações do resultado do envio (segundos)
+ALERTA_INTERVALO_VERIFICACAO = 0.25
+
+# Códigos de mensagens de erro do portal após o envio (use códigos específicos:
+# trechos genéricos como 'erro' também casam com avisos que não recusam o envio)
+ALERTA_CODIGOS_ERRO = ['MS0', 'EM0']
+
+# Trechos de mensagens que indicam assinatura cancelada ou recusada
+ALERTA_TEXTOS_CANCELAMENTO = ['assinatura cancelada', 'cancelado pelo usuário', 'assinador não', 'certificado não']
+
 # Timeout para localizar próximo CPF (segundos)
 TIMEOUT_PROXIMO_CPF = 15
 
@@ -79,8 +205,6 @@ CHROME_ARGS = [
     '--no-sandbox',
     '--disable-extensions',
     '--disable-plugins',
-    '--disable-images',
-    '--disable-javascript',
     '--disable-plugins-discovery',
     '--disable-background-networking',
     '--disable-background-timer-throttling',
@@ -88,6 +212,82 @@ CHROME_ARGS = [
     '--disable-renderer-backgrounding'
 ]
 
+# Modo anexar: conecta a um Chrome já aberto (mesmo perfil, via --remote-debugging-port)
+# e reaproveita a aba do eCAC já logada. Se não houver Chrome na porta, ele é aberto
+# de forma independente do Python, sobrevivendo a reinícios da automação.
+CHROME_MODO_ANEXAR = False
+
+# Porta de depuração remota usada pelo modo anexar
+CHROME_PORTA_DEPURACAO = 9222
+
+# Reaplicar o stealth a cada anexação (False = só se a página expuser navigator.webdriver;
+# navigator.webdriver falso não garante os demais ajustes do stealth)
+CHROME_ANEXAR_REAPLICAR_STEALTH = True
+
+# Caminho do executável do Chrome (None = detectar automaticamente)
+CHROME_EXECUTAVEL = None
+
+# Tempo máximo aguardando o Chrome abrir a porta de depuração (segundos)
+TIMEOUT_PORTA_DEPURACAO = 15
+
+# Xvfb (python main.py --xvfb): cada instância/worker abre o Chrome em um display
+# virtual próprio, usado também pelo PyAutoGUI e xdotool. Somente Linux.
+XVFB_ATIVO = False
+
+# Resolução do display virtual (largura x altura x profundidade de cor)
+XVFB_RESOLUCAO = '1920x1080x24'
+
+# Executável do Xvfb
+XVFB_EXECUTAVEL = 'Xvfb'
+
+# Comando que abre o assinador no display virtual (ex: ['java', '-jar', '/opt/serpro/assinador.jar']).
+# As teclas/capturas do PyAutoGUI vão para o display do assinador; com --workers ele roda em
+# um display próprio compartilhado pelos workers. None = abrir manualmente com DISPLAY=:N
+XVFB_ASSINADOR_COMANDO = None
+
+# Modo pipeline (python main.py --pipeline): uma segunda aba da mesma sessão preenche
+# o próximo titular enquanto o atual é assinado e confirmado; as abas trocam de papel
+# a cada grupo. Requer navegar até o formulário também na segunda aba.
+PIPELINE_DUAS_ABAS = False
+
+# ============================================================
+# POLÍTICA DE RECURSOS (bloqueio via CDP)
+# ============================================================
+
+# Bloquear recursos desnecessários (fontes, analytics) via CDP
+# Substitui '--disable-images'/'--disable-javascript', que o Chrome ignora
+# ou que quebram o aplicativo REINF
+BLOQUEIO_RECURSOS_ATIVO = True
+
+# Padrões de URL bloqueados (formato '*://host/caminho', '*' = qualquer trecho)
+# Imagens ficam fora da lista: o login do eCAC e o captcha dependem delas. Para
+# bloqueá-las, use o host do formulário REINF (ex: '*://<host do REINF>/*.png').
+# O bloqueio vale para a aba; iframes de outra origem (processo próprio) não são cobertos
+BLOQUEIO_RECURSOS_NEGAR = [
+    '*://*/*.woff',
+    '*://*/*.woff2',
+    '*://*/*.ttf',
+    '*://*/*.otf',
+    '*://*.google-analytics.com/*',
+    '*://*.googletagmanager.com/*',
+    '*://*.doubleclick.net/*',
+    '*://*.hotjar.com/*',
+    '*://barra.sistema.gov.br/*',
+    '*://vlibras.gov.br/*',
+]
+
+# Exceções: padrões que nunca são bloqueados, mesmo se casarem com a lista acima
+# (requer Chrome com suporte a exceções no CDP; caso contrário são ignoradas)
+BLOQUEIO_RECURSOS_PERMITIR = [
+    '*://*/*captcha*',
+]
+
+# Medir requisições bloqueadas e bytes baixados por grupo (usa log de performance)
+BLOQUEIO_RECURSOS_RELATORIO = True
+
+# Tamanho médio estimado de um recurso bloqueado, para estimar economia (bytes)
+BLOQUEIO_BYTES_MEDIO_ESTIMADO = 25000
+
 # ============================================================
 # CONFIGURAÇÕES DO PYAUTOGUI
 # ============================================================
@@ -108,6 +308,61 @@ METODO_ASSINATURA_PADRAO = 2
 # Coordenadas do mouse para Método B (x, y) - None se não configurado
 COORDENADAS_MOUSE_METODO_B = None
 
+# Backend de assinatura: 'pyautogui' (Métodos A/B) ou 'protocolo'.
+# 'protocolo' é EXPERIMENTAL e só funciona com assinador_stub.py/portal_simulado.py: o
+# contrato HTTP de assinador.py é hipotético e o Assinador Serpro real não o atende
+# (em produção ele falha e os Métodos A/B são usados)
+ASSINATURA_BACKEND = 'pyautogui'
+
+# Endereço do serviço do backend 'protocolo' (stub - ver assinador.py / assinador_stub.py)
+ASSINADOR_SERVICO_URL = 'http://127.0.0.1:65056'
+
+# Timeout de cada requisição ao serviço local (segundos)
+ASSINADOR_SERVICO_TIMEOUT = 5
+
+# Certificado a usar: trecho do alias ou do titular (None = primeiro disponível)
+ASSINADOR_CERTIFICADO = None
+
+# Detectar a janela do assinador em vez de sempre aguardar TEMPO_ESPERA_ASSINADOR
+# (o tempo fixo passa a ser apenas o máximo). No Linux requer o xdotool instalado.
+ASSINADOR_DETECCAO_ATIVA = True
+
+# Trechos do título da janela do assinador
+ASSINADOR_TITULOS_JANELA = ['Assinador Serpro', 'Assinador']
+
+# Região da tela onde o assinador abre (x, y, largura, altura) - alternativa quando
+# a janela não pode ser localizada pelo título. None = não usar
+ASSINADOR_REGIAO_TELA = None
+
+# Fração mínima de pixels alterados na região para considerar o assinador aberto
+ASSINADOR_LIMIAR_MUDANCA = 0.2
+
+# Intervalo entre verificações da janela do assinador (segundos)
+ASSINADOR_INTERVALO_VERIFICACAO = 0.25
+
+# Pausa após detectar o assinador, antes de enviar as teclas (segundos)
+ASSINADOR_TEMPO_ESTABILIZACAO = 0.5
+
+# Método A no Linux: como enviar as teclas quando a janela do assinador foi detectada
+# 'janela' = direto para a janela do assinador (xdotool, não depende do foco)
+# 'foco'   = ativa a janela do assinador e envia as teclas (use se o assinador ignorar 'janela')
+# 'global' = teclas globais do PyAutoGUI (comportamento anterior)
+ASSINADOR_TECLAS_MODO = 'janela'
+
+# Método B: imagem do botão de confirmação do assinador, localizada na tela por
+# template matching (capturada pela opção 4 da configuração de coordenadas).
+# Se não for encontrada, são usadas as COORDENADAS_MOUSE_METODO_B
+ASSINADOR_TEMPLATE_BOTAO = 'botao_assinador.png'
+
+# Tamanho do recorte salvo ao capturar a imagem do botão (largura, altura)
+ASSINADOR_TEMPLATE_TAMANHO = (120, 40)
+
+# Semelhança mínima (0 a 1) para considerar o botão encontrado
+ASSINADOR_TEMPLATE_LIMIAR = 0.8
+
+# Margem ao redor da última posição do botão antes de procurar na tela inteira (pixels)
+ASSINADOR_TEMPLATE_MARGEM = 40
+
 # ============================================================
 # CONFIGURAÇÕES DE VERIFICAÇÃO
 # ============================================================
@@ -115,6 +370,20 @@ COORDENADAS_MOUSE_METODO_B = None
 # Opção padrão para verificação manual de dados (True/False)
 VERIFICACAO_MANUAL_PADRAO = True
 
+# Pré-verificação (python main.py --pre-verificar): antes de processar, lê a consulta
+# de eventos R-4010 do período no portal e marca como 'pulado' os titulares que já
+# possuem evento ativo (ver eventos_ativos.py)
+PRE_VERIFICAR_EVENTOS_ATIVOS = False
+
+# Botão/link de próxima página da consulta de eventos
+CONSULTA_EVENTOS_PROXIMA_XPATH = (
+    "//button[contains(@aria-label, 'róxima') or normalize-space(.)='›' or contains(., 'Próxima')]"
+    " | //a[contains(@aria-label, 'róxima') or normalize-space(.)='›' or contains(., 'Próxima')]"
+)
+
+# Limite de páginas lidas na consulta
+CONSULTA_EVENTOS_MAX_PAGINAS = 500
+
 # ============================================================
 # TEMPOS DE ESPERA ESPECÍFICOS (valores hardcoded removidos)
 # ============================================================
@@ -166,3 +435,142 @@ TEMPO_SCRIPT_VERIFICACAO = 2
 TESTE_METODO_A_INTERVALO = 0.3
 TESTE_METODO_B_INTERVALO_CLICK = 0.5
 TESTE_METODO_B_INTERVALO_FINAL = 0.5
+
+# ============================================================
+# MODO SIMULAÇÃO (python simulacao.py - sem navegador)
+# ============================================================
+
+# Quantidade padrão de grupos sintéticos
+SIMULACAO_GRUPOS = 1000
+
+# Banco de checkpoints da simulação (apagado a cada execução, nunca o BANCO_DADOS)
+SIMULACAO_BANCO_DADOS = 'simulacao_efd.db'
+
+# Semente dos grupos sintéticos e do sorteio de erros
+SIMULACAO_SEMENTE = 42
+
+# Multiplicador dos time.sleep e timeouts de espera do main.py (0 = sem esperas, 1 = tempos reais)
+SIMULACAO_ESCALA_ESPERAS = 0
+
+# Latências simuladas do portal (segundos): cada comando WebDriver e cada ação do formulário
+SIMULACAO_LATENCIAS = {
+    'comando': 0,
+    'continuar': 0,
+    'modal': 0,
+    'salvar_modal': 0,
+    'envio': 0,
+    'assinatura': 0,
+    'proximo_cpf': 0,
+}
+
+# Probabilidade de cada erro injetado (0 a 1)
+SIMULACAO_ERROS = {
+    'evento_ativo': 0.02,  # "Inclusão não permitida ... evento ativo" -> grupo pulado
+    'modal_nao_abre': 0,  # Modal de dependente/plano não abre (espera expira)
+    'assinatura_cancelada': 0,
+    'erro_portal': 0.01,  # Alerta de erro após a assinatura
+    'sem_confirmacao': 0.01,  # Nenhum alerta após a assinatura
+}
+
+# ============================================================
+# PORTAL SIMULADO E BENCHMARK (python portal_simulado.py / benchmark_portal.py)
+# ============================================================
+
+# Porta do portal REINF simulado (também atende o protocolo do assinador)
+PORTAL_SIMULADO_PORTA = 8765
+
+# Latências do servidor simulado (segundos)
+PORTAL_SIMULADO_LATENCIAS = {
+    'pagina': 0,
+    'continuar': 0.3,
+    'modal': 0.1,  # Atraso para o modal aparecer na tela
+    'salvar_modal': 0.1,
+    'enviar': 0.3,
+    'confirmacao': 1,  # Da assinatura até o alerta MS7001
+    'novo_pagamento': 0.2,
+}
+
+# Probabilidade de cada recusa do portal simulado (0 a 1)
+PORTAL_SIMULADO_ERROS = {
+    'evento_ativo': 0,  # Além dos CPFs já enviados no mesmo período
+    'erro_portal': 0,  # Alerta de erro após a assinatura
+}
+
+# Perfis comparados pelo benchmark_portal.py: variáveis do config.py sobrescritas em cada um
+BENCHMARK_PERFIS = {
+    'atual': {},
+    'esperas_reduzidas': {
+        'TEMPO_ANTES_ENVIO': 0.3,
+        'TEMPO_APOS_ENVIO': 0.5,
+        'TEMPO_APOS_PROXIMO_CPF': 0.3,
+        'TEMPO_ENTRE_GRUPOS': 0.1,
+        'TEMPO_MODO_AUTOMATICO': 0.2,
+    },
+    'digitacao_rapida': {
+        'INTERVALO_DIGITACAO_MIN': 0,
+        'INTERVALO_DIGITACAO_MAX': 0.005,
+    },
+    'pipeline': {
+        'PIPELINE_DUAS_ABAS': True,
+    },
+}
+
+# Quantidade padrão de grupos sintéticos por perfil no benchmark
+BENCHMARK_GRUPOS = 20
+
+# ============================================================
+# BENCHMARK LOCAL (python benchmark.py - caminhos sem navegador)
+# ============================================================
+
+# Quantidades de grupos medidas
+BENCHMARK_TAMANHOS = [1000, 10000, 100000]
+
+# Repetições das funções por linha (mapear_dependencia, formatar_valor...): vale o menor tempo
+BENCHMARK_REPETICOES = 3
+
+# Chamadas medidas de cada helper de checkpoint, sobre um banco com todos os grupos
+BENCHMARK_CHAMADAS_BANCO = 200
+
+# Casos de chamada única (leitura da planilha, planilhas de visualização) estimados acima
+# deste tempo no próximo tamanho são pulados (segundos)
+BENCHMARK_LIMITE_CASO = 300
+
+# Arquivo da base usada pelo comando comparar
+BENCHMARK_BASE = 'benchmark_base.json'
+
+# Aumento relativo no tempo por chamada considerado regressão (0.25 = 25%)
+BENCHMARK_TOLERANCIA_REGRESSAO = 0.25
+
+# Planilha sintética: quantidade de dependentes por titular -> peso
+BENCHMARK_DISTRIBUICAO_DEPENDENTES = {0: 35, 1: 30, 2: 20, 3: 10, 4: 5}
+
+# Planilha sintética: grafias da coluna DEPENDENCIA -> peso (inclui caixa, acentos,
+# espaços, mapeamento parcial e uma grafia não mapeada)
+BENCHMARK_GRAFIAS_DEPENDENCIA = {
+    'FILHO': 20,
+    'Filha': 15,
+    'ESPOSA': 15,
+    'Cônjuge': 5,
+    ' filho(a) ': 5,
+    'Mãe': 5,
+    'COMPANHEIRA': 5,
+    'ENTEADO': 5,
+    'Neta': 5,
+    'AVÓ MATERNA': 3,
+    'ex-esposa': 3,
+    'Sogra': 3,
+    'FILHO UNIVERSITARIO': 5,  # Mapeamento parcial
+    'PADRASTO': 1,  # Não mapeada: vira 99 após varrer o mapeamento
+}
+
+# Planilha sintética: formato da coluna TOTAL -> peso
+# (numero = 1234.56, virgula = '1234,56', milhar = '1.234,56', moeda = 'R$ 1.234,56',
+# espacos = '  1234.56 ', vazio = '')
+BENCHMARK_FORMATOS_VALOR = {
+    'numero': 50,
+    'virgula': 20,
+    'milhar': 10,
+    'moeda': 10,
+    'espacos': 5,
+    'vazio': 5,
+}
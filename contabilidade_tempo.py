@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contabilidade do Tempo por Categoria
+Separa o tempo de parede de cada grupo em pausas do config (time.sleep de
+main.py, por função chamadora), espera por elementos do portal
+(WebDriverWait), comandos WebDriver (command executor do driver, também
+contados), SQLite e prompts (input). O que sobra é 'outros' (Python,
+pyautogui, subprocessos...).
+
+Os ganchos substituem globais de main.py (como simulacao.py faz com time e
+WebDriverWait) e acumulam por thread, de forma que cada worker do modo pool
+tem a sua conta. Cada grupo vai de um resultado registrado ao seguinte
+(inclui a pausa entre grupos) e é gravado na tabela tempos_categorias.
+
+Uso:
+    contabilidade_tempo.instalar(sys.modules[__name__])
+    self.contabilidade = ContabilidadeTempo(BANCO_DADOS)
+    contabilidade_tempo.instrumentar_driver(self.driver)
+    ...
+    self.contabilidade.fechar_grupo(cpf, resultado)
+    self.contabilidade.imprimir_resumo()
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from tempos_etapas import ID_EXECUCAO
+
+# Categorias medidas (tempo exclusivo: um comando dentro de uma espera não conta na espera)
+CATEGORIAS = ('pausa', 'espera_portal', 'webdriver', 'banco', 'humano')
+
+SQL_CRIAR_TABELA = '''
+    CREATE TABLE IF NOT EXISTS tempos_categorias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        execucao TEXT NOT NULL,
+        cpf_titular TEXT,
+        resultado TEXT,
+        inicio REAL NOT NULL,
+        duracao REAL NOT NULL,
+        pausa REAL NOT NULL,
+        espera_portal REAL NOT NULL,
+        webdriver REAL NOT NULL,
+        banco REAL NOT NULL,
+        humano REAL NOT NULL,
+        outros REAL NOT NULL,
+        comandos_webdriver INTEGER NOT NULL,
+        pausas_funcoes TEXT
+    )
+'''
+
+_local = threading.local()
+
+
+class _Conta:
+    """Tempo acumulado pela thread desde o fim do último grupo"""
+
+    def __init__(self):
+        self.inicio_relogio = time.time()
+        self.inicio = time.perf_counter()
+        self.categorias = dict.fromkeys(CATEGORIAS, 0.0)
+        self.pausas = defaultdict(float)  # Função de main.py -> segundos em time.sleep
+        self.comandos = 0
+        self.pilha = []  # Tempo das medições aninhadas em cada medição aberta
+
+
+def _conta():
+    conta = getattr(_local, 'conta', None)
+    if conta is None:
+        conta = _local.conta = _Conta()
+    return conta
+
+
+def medir(categoria, funcao, *args, **kwargs):
+    """Executa funcao somando seu tempo (menos o das medições aninhadas) à categoria"""
+    conta = _conta()
+    conta.pilha.append(0.0)
+    inicio = time.perf_counter()
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        duracao = time.perf_counter() - inicio
+        conta.categorias[categoria] += duracao - conta.pilha.pop()
+        if conta.pilha:
+            conta.pilha[-1] += duracao
+
+
+# ============================================================
+# GANCHOS (globais de main.py e command executor do driver)
+# ============================================================
+
+class _RelogioContabilizado:
+    """Substitui o módulo time em main.py: time.sleep conta como 'pausa'"""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+
+    def sleep(self, segundos):
+        funcao = sys._getframe(1).f_code.co_name
+        inicio = time.perf_counter()
+        medir('pausa', self.relogio.sleep, segundos)
+        _conta().pausas[funcao] += time.perf_counter() - inicio
+
+    def __getattr__(self, nome):
+        return getattr(self.relogio, nome)
+
+
+class _CursorContabilizado(sqlite3.Cursor):
+    def execute(self, *args):
+        return medir('banco', super().execute, *args)
+
+    def executemany(self, *args):
+        return medir('banco', super().executemany, *args)
+
+    def fetchone(self):
+        return medir('banco', super().fetchone)
+
+    def fetchall(self):
+        return medir('banco', super().fetchall)
+
+
+class _ConexaoContabilizada(sqlite3.Connection):
+    def cursor(self, factory=_CursorContabilizado):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def commit(self):
+        return medir('banco', super().commit)
+
+    def close(self):
+        return medir('banco', super().close)
+
+
+class _Sqlite3Contabilizado:
+    """Substitui o módulo sqlite3 em main.py: conexão, consultas e commits contam como 'banco'"""
+
+    def __init__(self, modulo):
+        self.modulo = modulo
+
+    def connect(self, *args, **kwargs):
+        kwargs.setdefault('factory', _ConexaoContabilizada)
+        return medir('banco', self.modulo.connect, *args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self.modulo, nome)
+
+
+def _espera_contabilizada(classe):
+    """WebDriverWait cujo until/until_not conta como 'espera_portal'"""
+
+    class EsperaContabilizada(classe):
+        contabilizada = True
+
+        def until(self, *args, **kwargs):
+            return medir('espera_portal', super().until, *args, **kwargs)
+
+        def until_not(self, *args, **kwargs):
+            return medir('espera_portal', super().until_not, *args, **kwargs)
+
+    return EsperaContabilizada
+
+
+def _input_contabilizado(entrada):
+    def contabilizado(*args):
+        return medir('humano', entrada, *args)
+
+    contabilizado.contabilizado = True
+    return contabilizado
+
+
+def instalar(modulo):
+    """
+    Troca time, sqlite3, WebDriverWait e input do módulo (main.py) pelas
+    versões contabilizadas. Pode ser chamada mais de uma vez; envolve o que
+    estiver no módulo no momento (ex: o relógio escalado da simulação).
+    """
+    if not isinstance(modulo.time, _RelogioContabilizado):
+        modulo.time = _RelogioContabilizado(modulo.time)
+    if not isinstance(modulo.sqlite3, _Sqlite3Contabilizado):
+        modulo.sqlite3 = _Sqlite3Contabilizado(modulo.sqlite3)
+    if not getattr(modulo.WebDriverWait, 'contabilizada', False):
+        modulo.WebDriverWait = _espera_contabilizada(modulo.WebDriverWait)
+
+    entrada = getattr(modulo, 'input', input)
+    if not getattr(entrada, 'contabilizado', False):
+        modulo.input = _input_contabilizado(entrada)
+
+
+def instrumentar_driver(driver):
+    """Envolve o command executor do driver: cada comando conta como 'webdriver'"""
+    executor = getattr(driver, 'command_executor', None)
+    if executor is None or getattr(executor, 'contabilizado', False):
+        return
+
+    original = executor.execute
+
+    def execute(comando, params=None):
+        _conta().comandos += 1
+        return medir('webdriver', original, comando, params)
+
+    executor.execute = execute
+    executor.contabilizado = True
+
+
+# ============================================================
+# CONTA POR GRUPO
+# ============================================================
+
+class ContabilidadeTempo:
+    """
+    Fecha a conta da thread a cada grupo, grava em lote na tabela
+    tempos_categorias e acumula os totais da execução para o resumo final.
+
+    Attributes:
+        banco (str): Banco de checkpoints
+        tamanho_lote (int): Quantidade de grupos por gravação
+        grupos (int): Grupos fechados nesta instância
+        totais (dict): Segundos por categoria (inclui 'outros')
+        pausas (dict): Segundos de time.sleep por função de main.py
+    """
+
+    def __init__(self, banco, tamanho_lote=50, ativo=True):
+        self.banco = banco
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.ativo = ativo
+        self.pendentes = []
+        self.trava = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Zera os totais e a conta da thread atual (início de um processamento)"""
+        with self.trava:
+            self.grupos = 0
+            self.duracao = 0.0
+            self.comandos = 0
+            self.comandos_maximo = 0
+            self.totais = dict.fromkeys(CATEGORIAS + ('outros',), 0.0)
+            self.pausas = defaultdict(float)
+        _local.conta = _Conta()
+
+    def fechar_grupo(self, cpf_titular, resultado):
+        """Registra o tempo da thread desde o grupo anterior como o deste grupo"""
+        if not self.ativo:
+            return
+
+        conta = _conta()
+        _local.conta = _Conta()
+        duracao = time.perf_counter() - conta.inicio
+        outros = max(duracao - sum(conta.categorias.values()), 0.0)
+
+        with self.trava:
+            self.grupos += 1
+            self.duracao += duracao
+            self.comandos += conta.comandos
+            self.comandos_maximo = max(self.comandos_maximo, conta.comandos)
+            for categoria, segundos in conta.categorias.items():
+                self.totais[categoria] += segundos
+            self.totais['outros'] += outros
+            for funcao, segundos in conta.pausas.items():
+                self.pausas[funcao] += segundos
+
+            self.pendentes.append((
+                ID_EXECUCAO, cpf_titular, resultado, conta.inicio_relogio, duracao,
+                *(conta.categorias[categoria] for categoria in CATEGORIAS), outros,
+                conta.comandos, json.dumps(conta.pausas) if conta.pausas else None,
+            ))
+            cheio = len(self.pendentes) >= self.tamanho_lote
+        if cheio:
+            self.gravar()
+
+    def gravar(self):
+        """Grava os grupos pendentes em uma única transação"""
+        with self.trava:
+            lote, self.pendentes = self.pendentes, []
+        if not lote:
+            return
+
+        try:
+            conn = sqlite3.connect(self.banco)
+            conn.execute(SQL_CRIAR_TABELA)
+            conn.executemany(f'''
+                INSERT INTO tempos_categorias (execucao, cpf_titular, resultado, inicio, duracao,
+                    {', '.join(CATEGORIAS)}, outros, comandos_webdriver, pausas_funcoes)
+                VALUES ({', '.join('?' * (len(CATEGORIAS) + 8))})
+            ''', lote)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar tempos por categoria: {e}")
+
+    def imprimir_resumo(self, maximo_funcoes=5):
+        """Imprime o tempo por categoria, comandos por grupo e o ritmo sem as pausas"""
+        if not self.ativo or not self.grupos or self.duracao <= 0:
+            return
+
+        print(f"\n⏱️ Tempo por categoria ({self.grupos} grupos, {self.duracao / self.grupos:.2f} s/grupo):")
+        for categoria, segundos in sorted(self.totais.items(), key=lambda item: -item[1]):
+            print(f"   {categoria:14} | {segundos:9.1f}s | {segundos / self.duracao:4.0%} | "
+                  f"{segundos / self.grupos:7.2f} s/grupo")
+        print(f"🖱️ Comandos WebDriver: {self.comandos / self.grupos:.1f} por grupo (máx {self.comandos_maximo})")
+
+        if self.pausas:
+            funcoes = sorted(self.pausas.items(), key=lambda item: -item[1])[:maximo_funcoes]
+            print("💤 Pausas por função: " + ', '.join(f"{funcao} {segundos:.1f}s" for funcao, segundos in funcoes))
+
+        sem_pausas = self.duracao - self.totais['pausa']
+        if sem_pausas > 0:
+            print(f"📈 Ritmo: {self.grupos / self.duracao * 3600:,.0f} grupos/h "
+                  f"(sem as pausas do config: ~{self.grupos / sem_pausas * 3600:,.0f} grupos/h)")
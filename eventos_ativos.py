@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pré-verificação de Eventos R-4010 Ativos
+Lê o HTML da tela de consulta de eventos do portal e importa os titulares que
+já possuem evento ativo no período como 'pulado', para que a automação nunca
+abra o formulário para eles.
+
+Usado pela automação (python main.py --pre-verificar) e também de forma
+offline, a partir de páginas da consulta salvas em disco:
+    python eventos_ativos.py consulta_p1.html consulta_p2.html
+    python eventos_ativos.py consulta_*.html --importar
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+from html.parser import HTMLParser
+
+# Situações que indicam que o evento não está mais ativo
+SITUACOES_INATIVAS = ('excluído', 'excluido', 'inativo', 'cancelado', 'retificado')
+
+PADRAO_CPF = re.compile(r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b')
+PADRAO_EVENTO = re.compile(r'\bR-?(\d{4})\b', re.IGNORECASE)
+
+
+class ParserLinhasTabela(HTMLParser):
+    """Extrai o texto das células de cada linha (<tr>) de todas as tabelas"""
+
+    def __init__(self):
+        super().__init__()
+        self.linhas = []
+        self._linha = None
+        self._celula = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._linha = []
+        elif tag in ('td', 'th') and self._linha is not None:
+            self._celula = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._celula is not None:
+            self._linha.append(' '.join(''.join(self._celula).split()))
+            self._celula = None
+        elif tag == 'tr' and self._linha is not None:
+            if self._linha:
+                self.linhas.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._celula is not None:
+            self._celula.append(data)
+
+
+def normalizar_cpf(valor):
+    """Remove pontuação do CPF (ex: '000.000.000-00' -> '00000000000')"""
+    return re.sub(r'\D', '', str(valor))
+
+
+def extrair_cpfs_eventos_ativos(html):
+    """
+    Extrai os CPFs com evento R-4010 ativo de uma página da consulta de eventos.
+
+    Uma linha é considerada quando contém um CPF, não cita outro evento além
+    do R-4010 e não está em uma das SITUACOES_INATIVAS.
+
+    Args:
+        html (str): HTML da página da consulta
+
+    Returns:
+        set: CPFs normalizados (somente dígitos)
+    """
+    parser = ParserLinhasTabela()
+    parser.feed(html)
+
+    cpfs = set()
+    for linha in parser.linhas:
+        texto = ' | '.join(linha)
+        minusculo = texto.lower()
+
+        if any(situacao in minusculo for situacao in SITUACOES_INATIVAS):
+            continue
+
+        eventos = set(PADRAO_EVENTO.findall(texto))
+        if eventos and eventos != {'4010'}:
+            continue
+
+        encontrado = PADRAO_CPF.search(texto)
+        if encontrado:
+            cpfs.add(normalizar_cpf(encontrado.group(0)))
+
+    return cpfs
+
+
+def ler_paginas_consulta(obter_html, avancar, max_paginas):
+    """
+    Percorre as páginas da consulta extraindo os CPFs com evento ativo.
+
+    Um erro no meio da leitura encerra o percurso mantendo os CPFs das
+    páginas já lidas.
+
+    Args:
+        obter_html (callable): Retorna o HTML da página atual
+        avancar (callable): Recebe o HTML atual e vai para a próxima página;
+            retorna False na última
+        max_paginas (int): Limite de páginas lidas
+
+    Returns:
+        tuple: (set de CPFs normalizados, quantidade de páginas lidas)
+    """
+    cpfs = set()
+    paginas = 0
+    try:
+        while paginas < max_paginas:
+            html = obter_html()
+            encontrados = extrair_cpfs_eventos_ativos(html)
+            cpfs |= encontrados
+            paginas += 1
+            print(f"📄 Página {paginas}: {len(encontrados)} CPFs com evento ativo")
+
+            if not avancar(html):
+                break
+    except Exception as e:
+        print(f"⚠️ Erro ao ler a consulta na página {paginas + 1}: {e}")
+
+    return cpfs, paginas
+
+
+def importar_cpfs_pulados(titulares, banco_dados):
+    """
+    Registra como 'pulado' os titulares com evento ativo no portal.
+
+    Titulares cujo último checkpoint já é 'sucesso' ou 'pulado' não são
+    alterados. Tudo é gravado em uma única transação.
+
+    Args:
+        titulares (dict): CPF normalizado -> (CPF como na planilha, nome)
+        banco_dados (str): Arquivo do banco SQLite
+
+    Returns:
+        int: Quantidade de titulares importados
+    """
+    conn = sqlite3.connect(banco_dados)
+    try:
+        cursor = conn.cursor()
+        importados = 0
+
+        for cpf_titular, nome_titular in titulares.values():
+            cursor.execute('''
+                SELECT status FROM progresso_efd
+                WHERE cpf_titular = ?
+                ORDER BY timestamp DESC, id DESC
+                LIMIT 1
+            ''', (cpf_titular,))
+            ultimo = cursor.fetchone()
+            if ultimo and ultimo[0] in ('sucesso', 'pulado'):
+                continue
+
+            cursor.execute('''
+                INSERT INTO progresso_efd
+                (cpf_titular, nome_titular, etapa_atual, status, observacoes)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (cpf_titular, nome_titular, 'evento_ativo_portal', 'pulado',
+                  'Evento R-4010 ativo na consulta do portal - importado na pré-verificação'))
+            importados += 1
+
+        conn.commit()
+        return importados
+    finally:
+        conn.close()
+
+
+def titulares_da_planilha(arquivo_excel, planilha):
+    """Lê os titulares da planilha: CPF normalizado -> (CPF, nome)"""
+    import pandas as pd
+
+    dados = pd.read_excel(arquivo_excel, sheet_name=planilha, skiprows=1)
+    dados = dados[dados['CPF'].notna() & dados['DEPENDENCIA'].notna()]
+
+    titulares = {}
+    for _, linha in dados.iterrows():
+        if str(linha['DEPENDENCIA']).strip().upper() == 'TITULAR':
+            titulares[normalizar_cpf(linha['CPF'])] = (linha['CPF'], linha['NOME'])
+    return titulares
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Lê páginas salvas da consulta de eventos R-4010")
+    parser.add_argument('paginas', nargs='+', help="Arquivos HTML da consulta (uma página cada)")
+    parser.add_argument('--importar', action='store_true',
+                        help="Importa os titulares da planilha do config como 'pulado' no banco")
+    args = parser.parse_args()
+
+    cpfs = set()
+    for caminho in args.paginas:
+        with open(caminho, encoding='utf-8') as arquivo:
+            encontrados = extrair_cpfs_eventos_ativos(arquivo.read())
+        print(f"📄 {caminho}: {len(encontrados)} CPFs com evento ativo")
+        cpfs |= encontrados
+
+    print(f"📊 Total: {len(cpfs)} CPFs com evento R-4010 ativo")
+
+    if not args.importar:
+        for cpf in sorted(cpfs):
+            print(cpf)
+        return 0
+
+    from config import ARQUIVO_EXCEL, PLANILHA, BANCO_DADOS
+
+    titulares = titulares_da_planilha(ARQUIVO_EXCEL, PLANILHA)
+    selecionados = {cpf: titulares[cpf] for cpf in cpfs if cpf in titulares}
+    print(f"👤 {len(selecionados)} são titulares na planilha ({len(cpfs) - len(selecionados)} não encontrados)")
+
+    importados = importar_cpfs_pulados(selecionados, BANCO_DADOS)
+    print(f"✅ {importados} titulares importados como 'pulado'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura da Planilha EFD-REINF
+Funções compartilhadas entre a automação do formulário (main.py) e a geração
+de lotes XML (lotes_r4010.py): agrupamento por titular, mapeamento de
+dependências e tratamento de valores. Não depende do navegador.
+"""
+
+import re
+
+import pandas as pd
+
+# Mapeamento de dependências do Excel para valores do formulário
+# Baseado nas opções do formulário EFD-REINF da Receita Federal
+MAPEAMENTO_DEPENDENCIAS = {
+    'TITULAR': None,  # Titular não é dependente
+    
+    # Código 1 - Cônjuge
+    'ESPOSA': '1',
+    'ESPOSO': '1',
+    'CONJUGE': '1',
+    'CÔNJUGE': '1',
+    'CONJUGUE': '1',
+    
+    # Código 2 - Companheiro(a) com filho ou união estável
+    'COMPANHEIRO(A)': '2',
+    'COMPANHEIRO': '2',
+    'COMPANHEIRA': '2',
+    'UNIAO ESTAVEL': '2',
+    'UNIÃO ESTÁVEL': '2',
+    
+    # Código 3 - Filho(a) ou enteado(a)
+    'FILHO': '3',
+    'FILHA': '3',
+    'ENTEADO': '3',
+    'ENTEADA': '3',
+    'FILHO(A)': '3',
+    'ENTEADO(A)': '3',
+    
+    # Código 6 - Irmão(ã), neto(a) ou bisneto(a) sem arrimo dos pais
+    'IRMAO': '6',
+    'IRMÃO': '6',
+    'IRMA': '6',
+    'IRMÃ': '6',
+    'IRMAO(A)': '6',
+    'IRMÃO(Ã)': '6',
+    'NETO': '6',
+    'NETA': '6',
+    'NETO(A)': '6',
+    'BISNETO': '6',
+    'BISNETA': '6',
+    'BISNETO(A)': '6',
+    
+    # Código 9 - Pais, avós e bisavós
+    'PAI': '9',
+    'MAE': '9',
+    'MÃE': '9',
+    'MAMAE': '9',
+    'MAMÃE': '9',
+    'AVO': '9',
+    'AVÔ': '9',
+    'AVO PATERNO': '9',
+    'AVÔ PATERNO': '9',
+    'AVO MATERNO': '9',
+    'AVÔ MATERNO': '9',
+    'AVO PATERNA': '9',
+    'AVÓ PATERNA': '9',
+    'AVO MATERNA': '9',
+    'AVÓ MATERNA': '9',
+    'BISAVO': '9',
+    'BISAVÔ': '9',
+    'BISAVO PATERNO': '9',
+    'BISAVÔ PATERNO': '9',
+    'BISAVO MATERNO': '9',
+    'BISAVÔ MATERNO': '9',
+    'BISAVO PATERNA': '9',
+    'BISAVÓ PATERNA': '9',
+    'BISAVO MATERNA': '9',
+    'BISAVÓ MATERNA': '9',
+    
+    # Código 10 - Menor pobre do qual detenha a guarda judicial
+    'MENOR POBRE': '10',
+    'GUARDA JUDICIAL': '10',
+    
+    # Código 11 - Pessoa absolutamente incapaz, da qual seja tutor ou curador
+    'TUTOR': '11',
+    'TUTORA': '11',
+    'CURADOR': '11',
+    'CURADORA': '11',
+    'TUTELADO': '11',
+    'TUTELADA': '11',
+    'CURATELADO': '11',
+    'CURATELADA': '11',
+    'PESSOA INCAPAZ': '11',
+    
+    # Código 12 - Ex-cônjuge
+    'EX ESPOSA': '12',
+    'EX ESPOSO': '12',
+    'EX CONJUGE': '12',
+    'EX CÔNJUGE': '12',
+    'EX CONJUGUE': '12',
+    'EX-ESPOSA': '12',
+    'EX-ESPOSO': '12',
+    'EX-CONJUGE': '12',
+    'EX-CÔNJUGE': '12',
+    'EX-CONJUGUE': '12',
+    
+    # Código 99 - Agregado/Outros
+    'AGREGADO': '99',
+    'OUTRA DEPENDENCIA': '99',
+    'OUTRA DEPENDÊNCIA': '99',
+    'OUTROS': '99',
+    'OUTRAS': '99',
+    'SOGRO': '99',
+    'SOGRA': '99',
+    'GENRO': '99',
+    'NORA': '99',
+    'CUNHADO': '99',
+    'CUNHADA': '99',
+    'TIO': '99',
+    'TIA': '99',
+    'SOBRINHO': '99',
+    'SOBRINHA': '99',
+    'PRIMO': '99',
+    'PRIMA': '99'
+}
+
+
+def converter_valor(valor):
+    """
+    Converte um valor da planilha (número ou texto como '1.234,56') para float.
+    
+    Returns:
+        float: Valor convertido, ou None se vazio/inválido
+    """
+    if valor is None or (isinstance(valor, str) and valor.strip() == ''):
+        return None
+    
+    try:
+        if isinstance(valor, str):
+            # Remover caracteres não numéricos exceto vírgula e ponto (ex: 'R$ ')
+            valor_limpo = ''.join(c for c in valor if c.isdigit() or c in [',', '.'])
+            # Formato brasileiro: '.' separa milhares quando há vírgula decimal
+            # ('1.234,56') ou quando se repete ('1.234.567')
+            if ',' in valor_limpo or valor_limpo.count('.') > 1:
+                valor_limpo = valor_limpo.replace('.', '')
+            # Substituir vírgula por ponto para conversão
+            valor_limpo = valor_limpo.replace(',', '.')
+            valor_float = float(valor_limpo)
+        else:
+            valor_float = float(valor)
+    except (ValueError, TypeError):
+        return None
+    
+    # Célula vazia lida pelo pandas (NaN)
+    if pd.isna(valor_float):
+        return None
+    
+    return valor_float
+
+
+def primeiro_valor(linha, *colunas):
+    """
+    Retorna o primeiro valor diferente de zero entre as colunas da linha,
+    como 'linha.get(a) or linha.get(b)', mas tratando células vazias (NaN)
+    como ausentes em vez de verdadeiras.
+    
+    Returns:
+        float: Valor convertido, ou o da última coluna (0.0/None) se nenhum servir
+    """
+    valor = None
+    for coluna in colunas:
+        valor = converter_valor(linha.get(coluna))
+        if valor:
+            return valor
+    return valor
+
+
+def valores_invalidos(linha, *colunas):
+    """
+    Lista as células preenchidas das colunas que não são um valor numérico
+    (ex: 'isento', '12,3,4'), para que virem erro em vez de valor nulo.
+    
+    Returns:
+        list: Pares (coluna, conteúdo da célula)
+    """
+    invalidos = []
+    for coluna in colunas:
+        valor = linha.get(coluna)
+        vazio = valor is None or (isinstance(valor, str) and valor.strip() == '') or \
+            (not isinstance(valor, str) and pd.isna(valor))
+        if not vazio and converter_valor(valor) is None:
+            invalidos.append((coluna, valor))
+    return invalidos
+
+
+def valor_eh_zero_ou_nulo(valor):
+    """
+    Verifica se um valor é zero ou nulo (sem valor).
+    
+    Args:
+        valor: Valor a ser verificado (pode ser str, float, int, None, etc.)
+    
+    Returns:
+        bool: True se o valor for zero ou nulo, False caso contrário
+    """
+    valor_float = converter_valor(valor)
+    
+    # Verificar se é zero (com tolerância para pequenas diferenças de ponto flutuante)
+    return valor_float is None or abs(valor_float) < 0.01
+
+
+def mapear_dependencia(dependencia):
+    """Mapeia a dependência do Excel para o código do formulário/evento (relDep)"""
+    dependencia_upper = str(dependencia).strip().upper()
+    
+    # Buscar mapeamento exato
+    if dependencia_upper in MAPEAMENTO_DEPENDENCIAS:
+        return MAPEAMENTO_DEPENDENCIAS[dependencia_upper]
+    
+    # Buscar mapeamento parcial (para variações)
+    for key, value in MAPEAMENTO_DEPENDENCIAS.items():
+        if key in dependencia_upper or dependencia_upper in key:
+            return value
+    
+    # Se não encontrar, usar "Agregado/Outros" como padrão
+    print(f"⚠️ Dependência não mapeada: '{dependencia}' - usando '99' (Agregado/Outros)")
+    return '99'
+
+
+def normalizar_cpf(valor):
+    """Remove pontuação do CPF para comparação (ex: '000.000.000-00' -> '00000000000')"""
+    return re.sub(r'\D', '', str(valor))
+
+
+def agrupar_por_titular(dados):
+    """
+    Agrupa as linhas da planilha por titular.
+    
+    Cada linha TITULAR inicia um grupo; as linhas seguintes (dependentes) são
+    adicionadas a ele. Linhas sem NOME, DEPENDENCIA ou CPF são ignoradas.
+    
+    Args:
+        dados (pandas.DataFrame): Linhas da planilha
+    
+    Returns:
+        list: Grupos [titular, dependente, ...] (pandas.Series)
+    """
+    dados_limpos = dados.dropna(how='all')
+    dados_limpos = dados_limpos[dados_limpos['CPF'].notna()]
+    
+    # Agrupar por titular
+    grupos = []
+    grupo_atual = []
+    
+    for index, row in dados_limpos.iterrows():
+        if pd.isna(row['NOME']) or str(row['NOME']).strip() == '':
+            continue
+        if pd.isna(row['DEPENDENCIA']) or str(row['DEPENDENCIA']).strip() == '':
+            continue
+        if pd.isna(row['CPF']) or str(row['CPF']).strip() == '':
+            continue
+        
+        dependencia = str(row['DEPENDENCIA']).strip().upper()
+        
+        # Se for TITULAR, finaliza o grupo anterior e inicia um novo
+        if dependencia == 'TITULAR':
+            if grupo_atual:  # Se há um grupo anterior, adiciona à lista
+                grupos.append(grupo_atual)
+            grupo_atual = [row]  # Inicia novo grupo com o titular
+        else:
+            # Se não for titular, adiciona como dependente ao grupo atual
+            if grupo_atual:  # Só adiciona se há um grupo ativo
+                grupo_atual.append(row)
+    
+    # Adiciona o último grupo se existir
+    if grupo_atual:
+        grupos.append(grupo_atual)
+    
+    return grupos
+
+
+def ler_grupos(arquivo_excel, planilha):
+    """Lê a aba do Excel (cabeçalho na segunda linha) e agrupa por titular"""
+    dados = pd.read_excel(arquivo_excel, sheet_name=planilha, skiprows=1)
+    return agrupar_por_titular(dados)
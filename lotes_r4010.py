@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geração Offline de Lotes XML do Evento R-4010
+Transforma os mesmos grupos da planilha usados pela automação do formulário em
+eventos R-4010 (evtRetPF): titular, dependentes (ideDep), plano de saúde
+(ideOpSaude) e valores dos dependentes (infoDependPl). Os eventos são
+validados contra o XSD oficial (se configurado), agrupados em lotes do
+tamanho aceito pelo webservice e registrados no banco de checkpoints.
+
+Uso:
+    python lotes_r4010.py
+    python lotes_r4010.py --periodo 01/2025 --tamanho 50 --saida lotes_xml
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from config import (
+    ARQUIVO_EXCEL, PLANILHA, BANCO_DADOS, PERIODO_APURACAO, CNPJ_EMPRESA,
+    CNPJ_OPERADORA_PADRAO, XML_R4010_NAMESPACE, XML_LOTE_NAMESPACE, XML_XSD_R4010,
+    XML_TIPO_AMBIENTE, XML_VERSAO_PROCESSO, LOTE_XML_TAMANHO, LOTE_XML_DIRETORIO,
+)
+import leitura_planilha
+
+
+def formatar_valor_reinf(valor):
+    """Formata um valor no padrão dos leiautes da REINF (ex: 1234.5 ou '1.234,5' -> '1234,50')"""
+    return f"{leitura_planilha.converter_valor(valor):.2f}".replace('.', ',')
+
+
+# Maior sequencial que cabe nas 5 posições do Id (por momento de geração)
+SEQUENCIAL_MAXIMO = 99999
+
+
+def gerar_id_evento(cnpj_empresa, momento, sequencial):
+    """
+    Gera o Id do evento: 'ID' + tipo de inscrição + CNPJ (14) + AAAAMMDDHHMMSS + sequencial (5).
+
+    Raises:
+        ValueError: Se o sequencial não couber em 5 dígitos (Id fora das 36 posições)
+    """
+    if not 1 <= sequencial <= SEQUENCIAL_MAXIMO:
+        raise ValueError(f"Sequencial {sequencial} fora de 1..{SEQUENCIAL_MAXIMO} no Id do evento")
+    cnpj = leitura_planilha.normalizar_cpf(cnpj_empresa).ljust(14, '0')
+    return f"ID1{cnpj}{momento:%Y%m%d%H%M%S}{sequencial:05d}"
+
+
+def _sub(pai, tag, texto=None):
+    """Cria um elemento filho com texto opcional"""
+    elemento = ET.SubElement(pai, tag)
+    if texto is not None:
+        elemento.text = str(texto)
+    return elemento
+
+
+def montar_evento(titular, dependentes, periodo, cnpj_empresa, id_evento):
+    """
+    Monta o XML de um evento R-4010 para um grupo da planilha.
+
+    Dependentes com valor zero ou nulo são omitidos, como no formulário.
+
+    Args:
+        titular (pandas.Series): Linha do titular
+        dependentes (list): Linhas dos dependentes
+        periodo (str): Período de apuração MM/AAAA
+        cnpj_empresa (str): CNPJ do declarante
+        id_evento (str): Id do evento (ver gerar_id_evento)
+
+    Returns:
+        str: XML do evento (sem declaração), com o namespace do R-4010 como padrão
+    """
+    mes, ano = periodo.split('/')
+    cnpj = leitura_planilha.normalizar_cpf(cnpj_empresa)
+
+    reinf = ET.Element('Reinf', xmlns=XML_R4010_NAMESPACE)
+    evento = _sub(reinf, 'evtRetPF')
+    evento.set('id', id_evento)
+
+    ide_evento = _sub(evento, 'ideEvento')
+    _sub(ide_evento, 'indRetif', 1)
+    _sub(ide_evento, 'perApur', f"{ano}-{mes}")
+    _sub(ide_evento, 'tpAmb', XML_TIPO_AMBIENTE)
+    _sub(ide_evento, 'procEmi', 1)
+    _sub(ide_evento, 'verProc', XML_VERSAO_PROCESSO)
+
+    ide_contri = _sub(evento, 'ideContri')
+    _sub(ide_contri, 'tpInsc', 1)
+    _sub(ide_contri, 'nrInsc', cnpj[:8])
+
+    ide_estab = _sub(evento, 'ideEstab')
+    _sub(ide_estab, 'tpInscEstab', 1)
+    _sub(ide_estab, 'nrInscEstab', cnpj)
+
+    ide_benef = _sub(ide_estab, 'ideBenef')
+    _sub(ide_benef, 'cpfBenef', leitura_planilha.normalizar_cpf(titular['CPF']))
+    _sub(ide_benef, 'nmBenef', str(titular['NOME']).strip()[:70])
+
+    # Dependentes com valor (os demais não assinam mais o plano)
+    dependentes_validos = []
+    for dependente in dependentes:
+        valor = leitura_planilha.primeiro_valor(dependente, 'VALOR_DEPENDENTE', 'TOTAL')
+        if valor is None or leitura_planilha.valor_eh_zero_ou_nulo(valor):
+            continue
+        dependentes_validos.append((dependente, valor))
+
+        dependencia = str(dependente.get('DEPENDENCIA', '')).strip()
+        rel_dep = leitura_planilha.mapear_dependencia(dependencia)
+
+        ide_dep = _sub(ide_benef, 'ideDep')
+        _sub(ide_dep, 'cpfDep', leitura_planilha.normalizar_cpf(dependente['CPF']))
+        _sub(ide_dep, 'relDep', rel_dep)
+        if rel_dep == '99':
+            _sub(ide_dep, 'descrDep', dependencia[:30])
+
+    # Plano de saúde do titular e valores dos dependentes
+    ide_op_saude = _sub(ide_benef, 'ideOpSaude')
+    _sub(ide_op_saude, 'nrInsc', leitura_planilha.normalizar_cpf(titular.get('CNPJ_OPERADORA', CNPJ_OPERADORA_PADRAO)))
+    _sub(ide_op_saude, 'vlrSaude', formatar_valor_reinf(leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL')))
+    for dependente, valor in dependentes_validos:
+        info_depend = _sub(ide_op_saude, 'infoDependPl')
+        _sub(info_depend, 'cpfDep', leitura_planilha.normalizar_cpf(dependente['CPF']))
+        _sub(info_depend, 'vlrSaude', formatar_valor_reinf(valor))
+
+    return ET.tostring(reinf, encoding='unicode')
+
+
+def carregar_validador(caminho_xsd):
+    """
+    Carrega o XSD oficial do R-4010 para validação (requer lxml).
+
+    Returns:
+        callable: Função xml -> lista de erros (vazia se válido), ou None se
+            o XSD não estiver configurado ou o lxml não estiver instalado
+    """
+    if not caminho_xsd:
+        print("⚠️ XML_XSD_R4010 não configurado - eventos não serão validados")
+        return None
+
+    try:
+        from lxml import etree
+    except ImportError:
+        print("⚠️ lxml não instalado (pip install lxml) - eventos não serão validados")
+        return None
+
+    esquema = etree.XMLSchema(etree.parse(caminho_xsd))
+
+    def validar(xml):
+        if esquema.validate(etree.fromstring(xml.encode('utf-8'))):
+            return []
+        return [f"linha {erro.line}: {erro.message}" for erro in esquema.error_log]
+
+    return validar
+
+
+def montar_lote(eventos, cnpj_empresa):
+    """
+    Monta o XML do lote assíncrono com os eventos informados.
+
+    Args:
+        eventos (list): Tuplas (id_evento, xml_evento)
+        cnpj_empresa (str): CNPJ do declarante
+
+    Returns:
+        str: XML completo do lote
+    """
+    cnpj = leitura_planilha.normalizar_cpf(cnpj_empresa)
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<Reinf xmlns="{XML_LOTE_NAMESPACE}"><envioLoteEventos>',
+        f'<ideContribuinte><tpInsc>1</tpInsc><nrInsc>{cnpj[:8]}</nrInsc></ideContribuinte>',
+        '<eventos>',
+    ]
+    for id_evento, xml_evento in eventos:
+        partes.append(f'<evento Id="{id_evento}">{xml_evento}</evento>')
+    partes.append('</eventos></envioLoteEventos></Reinf>')
+    return '\n'.join(partes)
+
+
+def inicializar_tabelas_xml(cursor):
+    """Cria as tabelas de controle de eventos e lotes XML"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS eventos_xml (
+            id_evento TEXT PRIMARY KEY,
+            cpf_titular TEXT NOT NULL,
+            periodo_apuracao TEXT NOT NULL,
+            arquivo_lote TEXT,
+            status TEXT NOT NULL,
+            erros TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lotes_xml (
+            arquivo TEXT PRIMARY KEY,
+            periodo_apuracao TEXT NOT NULL,
+            qtd_eventos INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _titular_ja_atendido(cursor, cpf_titular, periodo):
+    """Verifica se o titular já foi enviado pelo formulário, pulado ou gerado em lote"""
+    cursor.execute('''
+        SELECT status FROM progresso_efd
+        WHERE cpf_titular = ?
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1
+    ''', (cpf_titular,))
+    ultimo = cursor.fetchone()
+    if ultimo and ultimo[0] in ('sucesso', 'pulado'):
+        return True
+
+    cursor.execute('''
+        SELECT 1 FROM eventos_xml
+        WHERE cpf_titular = ? AND periodo_apuracao = ? AND status != 'invalido'
+    ''', (cpf_titular, periodo))
+    return cursor.fetchone() is not None
+
+
+def gerar_lotes(grupos, periodo=PERIODO_APURACAO, saida=LOTE_XML_DIRETORIO,
+                tamanho=LOTE_XML_TAMANHO, banco_dados=BANCO_DADOS, regerar=False):
+    """
+    Gera os eventos R-4010 dos grupos e grava os lotes em disco.
+
+    Titulares já enviados pelo formulário, pulados ou já gerados em lote para
+    o período são ignorados (exceto com regerar=True). Eventos inválidos no
+    XSD ou com valor não numérico na planilha ficam fora dos lotes,
+    registrados com status 'invalido'.
+
+    Returns:
+        dict: Totais de 'eventos', 'invalidos', 'ignorados' e 'lotes'
+
+    Raises:
+        ValueError: Se houver mais grupos do que sequenciais de Id (SEQUENCIAL_MAXIMO)
+    """
+    if len(grupos) > SEQUENCIAL_MAXIMO:
+        raise ValueError(f"{len(grupos)} grupos excedem os {SEQUENCIAL_MAXIMO} eventos de uma geração "
+                         f"(sequencial do Id); divida a planilha")
+
+    validar = carregar_validador(XML_XSD_R4010)
+    momento = datetime.now()
+    resumo = {'eventos': 0, 'invalidos': 0, 'ignorados': 0, 'lotes': 0}
+
+    conn = sqlite3.connect(banco_dados)
+    try:
+        cursor = conn.cursor()
+        inicializar_tabelas_xml(cursor)
+
+        eventos = []
+        for grupo in grupos:
+            titular, dependentes = grupo[0], grupo[1:]
+            cpf_titular = titular['CPF']
+
+            if not regerar and _titular_ja_atendido(cursor, cpf_titular, periodo):
+                resumo['ignorados'] += 1
+                continue
+
+            # Células preenchidas que não são números viram evento inválido (não valor nulo)
+            invalidos = leitura_planilha.valores_invalidos(titular, 'VALOR_PLANO', 'TOTAL')
+            for dependente in dependentes:
+                invalidos += leitura_planilha.valores_invalidos(dependente, 'VALOR_DEPENDENTE', 'TOTAL')
+            if not invalidos:
+                valor_titular = leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL')
+                if valor_titular is None or leitura_planilha.valor_eh_zero_ou_nulo(valor_titular):
+                    resumo['ignorados'] += 1
+                    continue
+
+            id_evento = gerar_id_evento(CNPJ_EMPRESA, momento, len(eventos) + resumo['invalidos'] + 1)
+            if invalidos:
+                erros = [f"Valor inválido na planilha: {coluna} = {valor!r}" for coluna, valor in invalidos]
+            else:
+                xml_evento = montar_evento(titular, dependentes, periodo, CNPJ_EMPRESA, id_evento)
+                erros = validar(xml_evento) if validar else []
+            if erros:
+                print(f"❌ Evento de {cpf_titular} inválido: {erros[0]}")
+                cursor.execute('''
+                    INSERT OR REPLACE INTO eventos_xml (id_evento, cpf_titular, periodo_apuracao, status, erros)
+                    VALUES (?, ?, ?, 'invalido', ?)
+                ''', (id_evento, cpf_titular, periodo, '\n'.join(erros)))
+                resumo['invalidos'] += 1
+                continue
+
+            eventos.append((id_evento, cpf_titular, xml_evento))
+
+        # Gravar os lotes
+        diretorio = os.path.join(saida, periodo.replace('/', '-'))
+        os.makedirs(diretorio, exist_ok=True)
+
+        for inicio in range(0, len(eventos), tamanho):
+            lote = eventos[inicio:inicio + tamanho]
+            arquivo = os.path.join(diretorio, f"lote_{momento:%Y%m%d%H%M%S}_{inicio // tamanho + 1:04d}.xml")
+
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                f.write(montar_lote([(id_evento, xml) for id_evento, _, xml in lote], CNPJ_EMPRESA))
+
+            cursor.executemany('''
+                INSERT OR REPLACE INTO eventos_xml (id_evento, cpf_titular, periodo_apuracao, arquivo_lote, status)
+                VALUES (?, ?, ?, ?, 'gerado')
+            ''', [(id_evento, cpf_titular, periodo, arquivo) for id_evento, cpf_titular, _ in lote])
+            cursor.execute('''
+                INSERT OR REPLACE INTO lotes_xml (arquivo, periodo_apuracao, qtd_eventos, status)
+                VALUES (?, ?, ?, 'gerado')
+            ''', (arquivo, periodo, len(lote)))
+
+            print(f"📦 {arquivo}: {len(lote)} eventos")
+            resumo['lotes'] += 1
+
+        resumo['eventos'] = len(eventos)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return resumo
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera lotes XML do evento R-4010 a partir da planilha")
+    parser.add_argument('--arquivo', default=ARQUIVO_EXCEL, help="Arquivo Excel (padrão: ARQUIVO_EXCEL do config)")
+    parser.add_argument('--planilha', default=PLANILHA, help="Aba do Excel (padrão: PLANILHA do config)")
+    parser.add_argument('--periodo', default=PERIODO_APURACAO, help="Período de apuração MM/AAAA")
+    parser.add_argument('--saida', default=LOTE_XML_DIRETORIO, help="Diretório dos lotes")
+    parser.add_argument('--tamanho', type=int, default=LOTE_XML_TAMANHO, help="Eventos por lote")
+    parser.add_argument('--regerar', action='store_true',
+                        help="Inclui titulares já enviados, pulados ou gerados anteriormente")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("📦 GERAÇÃO DE LOTES XML R-4010")
+    print("="*60)
+
+    grupos = leitura_planilha.ler_grupos(args.arquivo, args.planilha)
+    print(f"📊 {len(grupos)} grupos (titulares) na planilha")
+
+    try:
+        resumo = gerar_lotes(grupos, args.periodo, args.saida, args.tamanho, regerar=args.regerar)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"\n{'='*60}")
+    print(f"✅ Eventos gerados: {resumo['eventos']} em {resumo['lotes']} lote(s)")
+    print(f"⏭️ Ignorados (já atendidos ou valor zero): {resumo['ignorados']}")
+    print(f"❌ Inválidos (XSD ou valores da planilha): {resumo['invalidos']}")
+    print(f"{'='*60}")
+    return 1 if resumo['invalidos'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
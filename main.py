@@ -5,6 +5,7 @@ Sistema para automatizar preenchimento de formulários
 
 # Imports
 import undetected_chromedriver as uc
+from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import Select
@@ -15,16 +16,32 @@ import time
 import random
 import pandas as pd
 import os
+import shutil
 import sys
+import json
+import argparse
 import platform
 import sqlite3
+import socket
+import subprocess
+import threading
+import queue
+from contextlib import contextmanager
 from datetime import datetime
-import pyautogui
 import traceback
+import numpy as np
 
 # Importar configurações
 from config import *
 
+from assinador import ClienteAssinador, ErroAssinador
+from eventos_ativos import ler_paginas_consulta, importar_cpfs_pulados
+import leitura_planilha
+from tempos_etapas import SQL_CRIAR_TABELA as SQL_TEMPOS_ETAPAS, RegistradorTempos, cronometrar
+from andamento import Andamento
+import contabilidade_tempo
+from contabilidade_tempo import SQL_CRIAR_TABELA as SQL_TEMPOS_CATEGORIAS, ContabilidadeTempo
+
 # Configurar encoding UTF-8 para Windows
 if platform.system() == "Windows":
     sys.stdout.reconfigure(encoding='utf-8')
@@ -34,126 +51,115 @@ if platform.system() == "Windows":
 # CONFIGURAÇÕES PYAUTOGUI
 # ============================================================
 
-# Configurar PyAutoGUI para segurança e performance
-pyautogui.FAILSAFE = PYAUTOGUI_FAILSAFE
-pyautogui.PAUSE = PYAUTOGUI_PAUSE
+pyautogui = None  # Importado por carregar_pyautogui() (no Linux exige DISPLAY)
+
+
+def carregar_pyautogui():
+    """
+    Importa o PyAutoGUI e aplica as configurações de segurança e performance.
+    
+    No Linux o import abre o DISPLAY atual e falha sem ele, então com --xvfb
+    é chamado depois que o display virtual define DISPLAY.
+    """
+    global pyautogui
+    if pyautogui is None:
+        import pyautogui as modulo
+        modulo.FAILSAFE = PYAUTOGUI_FAILSAFE
+        modulo.PAUSE = PYAUTOGUI_PAUSE
+        pyautogui = modulo
+    return pyautogui
+
+
+try:
+    carregar_pyautogui()
+except Exception:
+    # Sem display (servidor/CI): carregado depois pelo --xvfb, ou só a simulação funciona
+    pass
 
 # Detectar sistema operacional para configurações específicas
 SISTEMA_OPERACIONAL = platform.system()
 
-# Mapeamento de dependências do Excel para valores do formulário
-# Baseado nas opções do formulário EFD-REINF da Receita Federal
-MAPEAMENTO_DEPENDENCIAS = {
-    'TITULAR': None,  # Titular não é dependente
-    
-    # Código 1 - Cônjuge
-    'ESPOSA': '1',
-    'ESPOSO': '1',
-    'CONJUGE': '1',
-    'CÔNJUGE': '1',
-    'CONJUGUE': '1',
-    
-    # Código 2 - Companheiro(a) com filho ou união estável
-    'COMPANHEIRO(A)': '2',
-    'COMPANHEIRO': '2',
-    'COMPANHEIRA': '2',
-    'UNIAO ESTAVEL': '2',
-    'UNIÃO ESTÁVEL': '2',
-    
-    # Código 3 - Filho(a) ou enteado(a)
-    'FILHO': '3',
-    'FILHA': '3',
-    'ENTEADO': '3',
-    'ENTEADA': '3',
-    'FILHO(A)': '3',
-    'ENTEADO(A)': '3',
-    
-    # Código 6 - Irmão(ã), neto(a) ou bisneto(a) sem arrimo dos pais
-    'IRMAO': '6',
-    'IRMÃO': '6',
-    'IRMA': '6',
-    'IRMÃ': '6',
-    'IRMAO(A)': '6',
-    'IRMÃO(Ã)': '6',
-    'NETO': '6',
-    'NETA': '6',
-    'NETO(A)': '6',
-    'BISNETO': '6',
-    'BISNETA': '6',
-    'BISNETO(A)': '6',
-    
-    # Código 9 - Pais, avós e bisavós
-    'PAI': '9',
-    'MAE': '9',
-    'MÃE': '9',
-    'MAMAE': '9',
-    'MAMÃE': '9',
-    'AVO': '9',
-    'AVÔ': '9',
-    'AVO PATERNO': '9',
-    'AVÔ PATERNO': '9',
-    'AVO MATERNO': '9',
-    'AVÔ MATERNO': '9',
-    'AVO PATERNA': '9',
-    'AVÓ PATERNA': '9',
-    'AVO MATERNA': '9',
-    'AVÓ MATERNA': '9',
-    'BISAVO': '9',
-    'BISAVÔ': '9',
-    'BISAVO PATERNO': '9',
-    'BISAVÔ PATERNO': '9',
-    'BISAVO MATERNO': '9',
-    'BISAVÔ MATERNO': '9',
-    'BISAVO PATERNA': '9',
-    'BISAVÓ PATERNA': '9',
-    'BISAVO MATERNA': '9',
-    'BISAVÓ MATERNA': '9',
-    
-    # Código 10 - Menor pobre do qual detenha a guarda judicial
-    'MENOR POBRE': '10',
-    'GUARDA JUDICIAL': '10',
-    
-    # Código 11 - Pessoa absolutamente incapaz, da qual seja tutor ou curador
-    'TUTOR': '11',
-    'TUTORA': '11',
-    'CURADOR': '11',
-    'CURADORA': '11',
-    'TUTELADO': '11',
-    'TUTELADA': '11',
-    'CURATELADO': '11',
-    'CURATELADA': '11',
-    'PESSOA INCAPAZ': '11',
-    
-    # Código 12 - Ex-cônjuge
-    'EX ESPOSA': '12',
-    'EX ESPOSO': '12',
-    'EX CONJUGE': '12',
-    'EX CÔNJUGE': '12',
-    'EX CONJUGUE': '12',
-    'EX-ESPOSA': '12',
-    'EX-ESPOSO': '12',
-    'EX-CONJUGE': '12',
-    'EX-CÔNJUGE': '12',
-    'EX-CONJUGUE': '12',
-    
-    # Código 99 - Agregado/Outros
-    'AGREGADO': '99',
-    'OUTRA DEPENDENCIA': '99',
-    'OUTRA DEPENDÊNCIA': '99',
-    'OUTROS': '99',
-    'OUTRAS': '99',
-    'SOGRO': '99',
-    'SOGRA': '99',
-    'GENRO': '99',
-    'NORA': '99',
-    'CUNHADO': '99',
-    'CUNHADA': '99',
-    'TIO': '99',
-    'TIA': '99',
-    'SOBRINHO': '99',
-    'SOBRINHA': '99',
-    'PRIMO': '99',
-    'PRIMA': '99'
+# Seletor dos alertas do portal lidos pelas sondas abaixo
+SELETOR_ALERTAS = 'app-reinf-mensagens-alerta .message, app-reinf-mensagens-alerta [data-testid^="mensagem_descricao"]'
+
+# Marca, antes do clique em enviar, os alertas já visíveis (com o próprio texto)
+# e se a página já mostrava o MS7001, para que a sonda do resultado os ignore.
+# Argumento: seletor dos alertas.
+SCRIPT_MARCAR_ALERTAS = """
+var elementos = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < elementos.length; i++) {
+    if (elementos[i].getClientRects().length === 0) continue;
+    elementos[i].setAttribute('data-efd-anterior', (elementos[i].innerText || '').trim());
+}
+if (document.body) {
+    if (document.body.innerText.indexOf('MS7001 - Evento recebido com sucesso') !== -1) {
+        document.body.setAttribute('data-efd-ms7001-anterior', '1');
+    } else {
+        document.body.removeAttribute('data-efd-ms7001-anterior');
+    }
+}
+"""
+
+# Sonda JavaScript do resultado do envio: classifica, em uma única chamada por
+# verificação, o primeiro alerta visível como sucesso (MS7001), erro ou
+# cancelamento da assinatura, ignorando os alertas marcados antes do envio
+# (SCRIPT_MARCAR_ALERTAS) que continuam com o mesmo texto. Argumentos: códigos
+# de erro, textos de cancelamento e seletor dos alertas.
+SCRIPT_RESULTADO_ENVIO = """
+var codigosErro = arguments[0];
+var textosCancelamento = arguments[1];
+function sucesso(texto, contexto) {
+    // Recibo, protocolo e data/hora: na mensagem ou no texto ao redor dela
+    var fonte = texto + '\\n' + (contexto || '');
+    var recibo = fonte.match(/recibo[^0-9]{0,40}([0-9][0-9.\\-]{3,}[0-9])/i);
+    var protocolo = fonte.match(/protocolo[^0-9]{0,40}([0-9][0-9.\\-\\/]{3,}[0-9])/i);
+    var dataHora = fonte.match(/([0-9]{2}\\/[0-9]{2}\\/[0-9]{4}(?:\\s+(?:às\\s+)?[0-9]{2}:[0-9]{2}(?::[0-9]{2})?)?)/);
+    return {
+        tipo: 'sucesso',
+        texto: texto,
+        recibo: recibo ? recibo[1] : null,
+        protocolo: protocolo ? protocolo[1] : null,
+        data_hora: dataHora ? dataHora[1] : null
+    };
+}
+var elementos = document.querySelectorAll(arguments[2]);
+for (var i = 0; i < elementos.length; i++) {
+    var el = elementos[i];
+    if (el.getClientRects().length === 0) continue;
+    var texto = (el.innerText || '').trim();
+    if (!texto || el.getAttribute('data-efd-anterior') === texto) continue;
+    var minusculo = texto.toLowerCase();
+    if (minusculo.indexOf('ms7001') !== -1 && minusculo.indexOf('sucesso') !== -1) {
+        var bloco = el.closest('app-reinf-mensagens-alerta');
+        return sucesso(texto, (bloco && bloco.parentElement) ? bloco.parentElement.innerText : '');
+    }
+    for (var j = 0; j < textosCancelamento.length; j++) {
+        if (minusculo.indexOf(textosCancelamento[j].toLowerCase()) !== -1) {
+            return {tipo: 'cancelado', texto: texto};
+        }
+    }
+    var classe = (el.className || '').toString();
+    if (/\\b(error|erro|danger)\\b/.test(classe)) {
+        return {tipo: 'erro', texto: texto};
+    }
+    for (var k = 0; k < codigosErro.length; k++) {
+        if (minusculo.indexOf(codigosErro[k].toLowerCase()) !== -1) {
+            return {tipo: 'erro', texto: texto};
+        }
+    }
+}
+if (elementos.length === 0 && document.body && !document.body.hasAttribute('data-efd-ms7001-anterior') &&
+    document.body.innerText.indexOf('MS7001 - Evento recebido com sucesso') !== -1) {
+    return sucesso('MS7001 - Evento recebido com sucesso', document.body.innerText);
+}
+return null;
+"""
+
+# Ordens da fila de trabalho (FILA_ORDEM) -> cláusula ORDER BY
+ORDENS_FILA = {
+    'novos_primeiro': 'tentativas > 0, indice_grupo',
+    'retentativas_primeiro': 'tentativas = 0, indice_grupo',
+    'planilha': 'indice_grupo',
 }
 
 # ============================================================
@@ -181,7 +187,7 @@ class AutomacaoEFD:
         coordenadas_mouse_metodo_b (tuple): Coordenadas (x,y) para método B
     """
     
-    def __init__(self):
+    def __init__(self, worker=None, usar_xvfb=False, display_assinador=None):
         """
         Inicializa a automação configurando navegador e banco de dados.
         
@@ -189,15 +195,66 @@ class AutomacaoEFD:
         - Chrome com perfil dedicado e proteções anti-detecção
         - Banco de dados SQLite para checkpoints
         - Configurações padrão (verificação manual = True, método A)
+        
+        Args:
+            worker (int): Número do worker no modo pool. Cada worker usa o perfil
+                CHROME_PROFILE_DIR + '_<n>' e a porta de depuração + n.
+            usar_xvfb (bool): Abre o Chrome em um display Xvfb próprio (Linux),
+                também usado pelo PyAutoGUI e xdotool (padrão: XVFB_ATIVO)
+            display_assinador (str): Display Xvfb em que o assinador já roda (modo
+                pool); None = abre o assinador no display desta instância
         """
         self.driver = None
+        self.worker = worker
+        self.usar_xvfb = usar_xvfb or XVFB_ATIVO
+        self.display_virtual = None  # DisplayVirtual (Xvfb) desta instância
+        self._display_xlib = None  # Conexão Xlib do PyAutoGUI com o display virtual
+        self.display_assinador = display_assinador  # Display do assinador (destino do PyAutoGUI/xdotool)
+        self.trava_assinatura = None  # Lock compartilhado no modo pool (pyautogui é global)
+        self.janela_assinador = None  # Janela do assinador detectada (id X11 ou título)
+        self.cliente_assinador = None  # Cliente do stub do assinador (ASSINATURA_BACKEND = 'protocolo')
+        if ASSINATURA_BACKEND == 'protocolo':
+            print("🧪 ASSINATURA_BACKEND = 'protocolo' é experimental: só funciona com assinador_stub.py/"
+                  "portal_simulado.py (com o Assinador Serpro real os Métodos A/B são usados)")
+            self.cliente_assinador = ClienteAssinador(ASSINADOR_SERVICO_URL, ASSINADOR_SERVICO_TIMEOUT)
+        self.resultado_envio = None  # Último resultado da sonda de confirmação (tipo/texto)
+        self._referencia_assinador = None  # Captura da região do assinador antes do envio
+        self._template_botao = None  # Imagem do botão de confirmação (tons de cinza, NumPy)
+        self._bbox_botao_assinador = None  # Última posição (x, y, largura, altura) do botão na tela
+        self.usar_lease = False  # True = reivindica grupos pela tabela leases_grupos
+        self.lease_atual = None  # CPF do grupo cujo lease está sendo mantido (modo lease)
+        self.usar_pipeline = PIPELINE_DUAS_ABAS  # True = preenche o próximo grupo em uma segunda aba
+        self.pre_verificar_eventos = PRE_VERIFICAR_EVENTOS_ATIVOS  # True = consulta eventos ativos antes de processar
+        self.abas_pipeline = None  # Handles [aba A, aba B] quando o modo pipeline está ativo
+        self.usar_fila = FILA_TRABALHO_ATIVA  # True = fila persistente com retentativas em vez do loop linear
+        self.fila_em_uso = False  # True enquanto processar_todos_os_grupos consome a fila
+        self.reprocessar_erros = False  # True = processa só os grupos cujo último status é erro (--retry-failed)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker or 0}"
         self.cpf_titular_atual = None
         self.nome_titular_atual = None
         self.verificar_dados_manual = VERIFICACAO_MANUAL_PADRAO  # Por padrão, verificar dados manualmente
         self.metodo_assinatura = METODO_ASSINATURA_PADRAO  # Por padrão, usar método A
         self.coordenadas_mouse_metodo_b = COORDENADAS_MOUSE_METODO_B  # Carregar do config
+        self.sessao_reaproveitada = False  # True quando anexado a uma aba do eCAC já aberta
+        self.periodo_apuracao = PERIODO_APURACAO  # Jobs do daemon de outro período são recusados
+        self._cache_grupos = {}  # (arquivo, planilha) -> (mtime, grupos) para reaproveitar no daemon
+        self.economia_recursos = {'bloqueadas': 0, 'bytes_baixados': 0, 'bytes_economizados': 0}
+        self.tempos = RegistradorTempos(BANCO_DADOS, lambda: self.cpf_titular_atual,
+                                        TEMPOS_ETAPAS_LOTE, TEMPOS_ETAPAS_ATIVO)  # Spans das etapas do grupo
+        self.contabilidade = ContabilidadeTempo(BANCO_DADOS, CONTABILIDADE_TEMPO_LOTE,
+                                                CONTABILIDADE_TEMPO_ATIVA)  # Tempo do grupo por categoria
+        if CONTABILIDADE_TEMPO_ATIVA:
+            contabilidade_tempo.instalar(sys.modules[__name__])
         self.inicializar_banco_dados()
-        self.configurar_chrome()
+        try:
+            self.configurar_chrome()
+        except Exception:
+            # Não deixar o Xvfb órfão se o Chrome não abrir
+            if self.display_virtual:
+                self.display_virtual.parar()
+            raise
+        if CONTABILIDADE_TEMPO_ATIVA:
+            contabilidade_tempo.instrumentar_driver(self.driver)
     
     def configurar_chrome(self):
         """
@@ -209,6 +266,9 @@ class AutomacaoEFD:
         - Selenium stealth para mascarar automação
         - Configurações de performance e estabilidade
         
+        Com CHROME_MODO_ANEXAR ativo, conecta a um Chrome já aberto no mesmo
+        perfil (ver _anexar_chrome_existente) em vez de abrir um novo.
+        
         Raises:
             Exception: Se não conseguir inicializar o Chrome
         """
@@ -216,15 +276,34 @@ class AutomacaoEFD:
         print("🔧 CONFIGURANDO CHROME")
         print("="*60)
         
-        print("\n✅ Usando perfil DEDICADO de automação")
-        options = uc.ChromeOptions()
-        
         # Usar perfil DEDICADO
-        profile_dir = os.path.join(os.getcwd(), CHROME_PROFILE_DIR)
+        perfil = CHROME_PROFILE_DIR if self.worker is None else f"{CHROME_PROFILE_DIR}_{self.worker}"
+        profile_dir = os.path.join(os.getcwd(), perfil)
         if not os.path.exists(profile_dir):
             os.makedirs(profile_dir)
             print("📁 Perfil criado")
         
+        if self.usar_xvfb:
+            if CHROME_MODO_ANEXAR:
+                # O Chrome do modo anexar sobrevive à automação, o Xvfb não
+                print("⚠️ Xvfb não é usado no modo anexar - usando o display atual")
+            else:
+                self.display_virtual = DisplayVirtual()
+                self.display_virtual.iniciar()
+                if self.display_assinador is None:
+                    self.display_virtual.abrir_assinador()
+                    self.display_assinador = self.display_virtual.nome
+                self._apontar_pyautogui()
+        
+        if CHROME_MODO_ANEXAR:
+            self._anexar_chrome_existente(profile_dir)
+            self.aplicar_politica_recursos()
+            print("✅ Chrome conectado!")
+            return
+        
+        print("\n✅ Usando perfil DEDICADO de automação")
+        options = uc.ChromeOptions()
+        
         options.add_argument(f'--user-data-dir={profile_dir}')
         
         # Adicionar argumentos do Chrome do config
@@ -233,11 +312,57 @@ class AutomacaoEFD:
         
         options.add_argument('--start-maximized')
         
+        # Abrir no display virtual desta instância (sem depender do DISPLAY do processo)
+        if self.display_virtual:
+            options.add_argument(f'--display={self.display_virtual.nome}')
+            options.add_argument(f'--window-size={XVFB_RESOLUCAO.rsplit("x", 1)[0].replace("x", ",")}')
+        
+        # Log de performance para medir requisições bloqueadas por grupo
+        if BLOQUEIO_RECURSOS_ATIVO and BLOQUEIO_RECURSOS_RELATORIO:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
         print("🚀 Abrindo Chrome...")
         # Especificar versão do Chrome para compatibilidade do ChromeDriver
         self.driver = uc.Chrome(options=options, use_subprocess=True, version_main=CHROME_VERSION)
         
         # Aplicar proteção anti-detecção
+        self._aplicar_stealth()
+        
+        # Bloquear recursos desnecessários
+        self.aplicar_politica_recursos()
+        
+        print("✅ Chrome aberto!")
+    
+    def _apontar_pyautogui(self):
+        """
+        Aponta o PyAutoGUI (teclas, cliques e capturas de tela) para o display
+        virtual em que o assinador roda, importando-o se ainda não foi possível
+        (sem DISPLAY no início do processo). O PyAutoGUI usa um único display
+        por processo, então no modo pool isto é feito dentro da faixa de assinatura.
+        """
+        if self.display_assinador is None:
+            return
+        
+        os.environ['DISPLAY'] = self.display_assinador
+        try:
+            carregar_pyautogui()
+            from Xlib.display import Display
+            from pyautogui import _pyautogui_x11
+            
+            if self._display_xlib is None:
+                self._display_xlib = Display(self.display_assinador)
+            _pyautogui_x11._display = self._display_xlib
+        except Exception as e:
+            print(f"⚠️ Não foi possível apontar o PyAutoGUI para {self.display_assinador}: {e}")
+    
+    def _ambiente_x11(self):
+        """Ambiente para subprocessos do X11 (xdotool) no display do assinador"""
+        if self.display_assinador is None:
+            return None
+        return dict(os.environ, DISPLAY=self.display_assinador)
+    
+    def _aplicar_stealth(self):
+        """Aplica a proteção anti-detecção do selenium-stealth na sessão atual"""
         stealth(self.driver,
             languages=["pt-BR", "pt"],
             vendor="Google Inc.",
@@ -246,8 +371,209 @@ class AutomacaoEFD:
             renderer="Intel Iris OpenGL Engine",
             fix_hairline=True,
         )
+    
+    def _stealth_necessario(self):
+        """
+        Indica se o stealth deve ser aplicado na aba atual.
         
-        print("✅ Chrome aberto!")
+        Sempre fora do modo anexar e, no modo anexar, também sempre, exceto com
+        CHROME_ANEXAR_REAPLICAR_STEALTH = False, quando só é aplicado se a página
+        ainda expuser navigator.webdriver.
+        """
+        if not CHROME_MODO_ANEXAR or CHROME_ANEXAR_REAPLICAR_STEALTH:
+            return True
+        return bool(self.driver.execute_script("return navigator.webdriver"))
+    
+    def _anexar_chrome_existente(self, profile_dir):
+        """
+        Conecta a um Chrome já aberto via porta de depuração remota.
+        
+        Se não houver navegador escutando em CHROME_PORTA_DEPURACAO, abre um
+        Chrome independente do processo Python (mesmo perfil e argumentos), de
+        forma que ele continue aberto e logado se a automação cair. O stealth é
+        aplicado a cada anexação (navigator.webdriver falso não garante os demais
+        ajustes: idioma, WebGL, plugins), a menos que CHROME_ANEXAR_REAPLICAR_STEALTH
+        seja False, e a aba do eCAC já aberta é selecionada para reaproveitar o login.
+        
+        Args:
+            profile_dir (str): Diretório do perfil dedicado do Chrome
+        """
+        porta = CHROME_PORTA_DEPURACAO + (self.worker or 0)
+        
+        if self._porta_depuracao_ativa(porta):
+            print(f"\n♻️ Chrome encontrado na porta {porta} - anexando à sessão existente")
+        else:
+            print(f"\n🚀 Nenhum Chrome na porta {porta} - abrindo Chrome independente...")
+            self._iniciar_chrome_depuracao(profile_dir, porta)
+        
+        options = webdriver.ChromeOptions()
+        options.debugger_address = f"127.0.0.1:{porta}"
+        if BLOQUEIO_RECURSOS_ATIVO and BLOQUEIO_RECURSOS_RELATORIO:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        self.driver = webdriver.Chrome(options=options)
+        
+        # Aplicar proteção anti-detecção (opcionalmente só se ainda não estiver ativa)
+        if self._stealth_necessario():
+            self._aplicar_stealth()
+        else:
+            print("✅ Proteção anti-detecção já ativa - stealth não reaplicado")
+        
+        self.sessao_reaproveitada = self._selecionar_aba_ecac()
+    
+    def aplicar_politica_recursos(self):
+        """
+        Bloqueia fontes, analytics e demais padrões configurados via CDP.
+        
+        Usa Network.setBlockedURLs com os padrões de BLOQUEIO_RECURSOS_NEGAR. As
+        exceções de BLOQUEIO_RECURSOS_PERMITIR dependem do formato com
+        'urlPatterns' do CDP; em versões do Chrome sem suporte, apenas a lista
+        de bloqueio é aplicada. O bloqueio vale para o target da aba atual e
+        persiste entre navegações; iframes de outra origem rodam em targets
+        próprios e não são cobertos.
+        
+        Returns:
+            bool: True se a política foi aplicada
+        """
+        if not BLOQUEIO_RECURSOS_ATIVO:
+            return False
+        
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            
+            aplicado_com_excecoes = False
+            if BLOQUEIO_RECURSOS_PERMITIR:
+                padroes = [{'urlPattern': p, 'block': False} for p in BLOQUEIO_RECURSOS_PERMITIR]
+                padroes += [{'urlPattern': p, 'block': True} for p in BLOQUEIO_RECURSOS_NEGAR]
+                try:
+                    self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urlPatterns': padroes})
+                    aplicado_com_excecoes = True
+                except Exception:
+                    print("⚠️ Chrome sem suporte a exceções de bloqueio - BLOQUEIO_RECURSOS_PERMITIR ignorado")
+            
+            if not aplicado_com_excecoes:
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(BLOQUEIO_RECURSOS_NEGAR)})
+            
+            print(f"🧹 Política de recursos aplicada: {len(BLOQUEIO_RECURSOS_NEGAR)} padrões bloqueados")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Não foi possível aplicar a política de recursos: {e}")
+            return False
+    
+    def medir_recursos_grupo(self):
+        """
+        Lê o log de performance acumulado desde a última chamada e contabiliza
+        requisições bloqueadas pela política e bytes efetivamente baixados.
+        
+        Returns:
+            dict: 'bloqueadas', 'bytes_baixados' e 'bytes_economizados' (estimado),
+                ou None se o relatório estiver desativado
+        """
+        if not (BLOQUEIO_RECURSOS_ATIVO and BLOQUEIO_RECURSOS_RELATORIO):
+            return None
+        
+        try:
+            entradas = self.driver.get_log('performance')
+        except Exception:
+            return None
+        
+        bloqueadas = 0
+        bytes_baixados = 0
+        for entrada in entradas:
+            try:
+                mensagem = json.loads(entrada['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            
+            metodo = mensagem.get('method')
+            if metodo == 'Network.loadingFailed':
+                if mensagem['params'].get('blockedReason') == 'inspector':
+                    bloqueadas += 1
+            elif metodo == 'Network.loadingFinished':
+                bytes_baixados += mensagem['params'].get('encodedDataLength', 0)
+        
+        medicao = {
+            'bloqueadas': bloqueadas,
+            'bytes_baixados': int(bytes_baixados),
+            'bytes_economizados': bloqueadas * BLOQUEIO_BYTES_MEDIO_ESTIMADO,
+        }
+        for chave, valor in medicao.items():
+            self.economia_recursos[chave] += valor
+        
+        print(f"🧹 Recursos: {bloqueadas} requisições bloqueadas "
+              f"(~{medicao['bytes_economizados'] / 1024:.0f} KB economizados), "
+              f"{medicao['bytes_baixados'] / 1024:.0f} KB baixados")
+        return medicao
+    
+    def _porta_depuracao_ativa(self, porta):
+        """Verifica se há um Chrome escutando na porta de depuração remota"""
+        try:
+            with socket.create_connection(('127.0.0.1', porta), timeout=1):
+                return True
+        except OSError:
+            return False
+    
+    def _iniciar_chrome_depuracao(self, profile_dir, porta):
+        """Abre um Chrome desacoplado do processo Python com a porta de depuração ativa"""
+        executavel = CHROME_EXECUTAVEL or uc.find_chrome_executable()
+        if not executavel:
+            raise Exception("Executável do Chrome não encontrado - defina CHROME_EXECUTAVEL no config.py")
+        
+        argumentos = [
+            executavel,
+            f'--remote-debugging-port={porta}',
+            f'--user-data-dir={profile_dir}',
+            '--start-maximized',
+        ] + list(CHROME_ARGS)
+        
+        # Processo desacoplado: o Chrome sobrevive ao encerramento do Python
+        kwargs = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+        if SISTEMA_OPERACIONAL == "Windows":
+            kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+        subprocess.Popen(argumentos, **kwargs)
+        
+        inicio = time.time()
+        while time.time() - inicio < TIMEOUT_PORTA_DEPURACAO:
+            if self._porta_depuracao_ativa(porta):
+                return True
+            time.sleep(0.5)
+        
+        raise Exception(f"Chrome não abriu a porta de depuração {porta} em {TIMEOUT_PORTA_DEPURACAO}s")
+    
+    def _selecionar_aba_ecac(self):
+        """Seleciona a aba do eCAC já aberta no Chrome anexado (se existir)"""
+        dominio = URL_BASE.split('/')[2]
+        for handle in self.driver.window_handles:
+            try:
+                self.driver.switch_to.window(handle)
+                if dominio in self.driver.current_url:
+                    print(f"✅ Aba do eCAC reaproveitada: {self.driver.current_url}")
+                    return True
+            except Exception:
+                continue
+        
+        print("ℹ️ Nenhuma aba do eCAC aberta - será necessário acessar o site")
+        return False
+    
+    def _formulario_visivel(self):
+        """Verifica se o formulário (campo Período de Apuração) já está na tela"""
+        try:
+            self.driver.switch_to.default_content()
+            if self.driver.find_elements(By.ID, "periodo_apuracao"):
+                return True
+            
+            # O formulário costuma ficar dentro de um iframe
+            if self.driver.find_elements(By.TAG_NAME, "iframe"):
+                self.driver.switch_to.frame(0)
+                encontrado = bool(self.driver.find_elements(By.ID, "periodo_apuracao"))
+                self.driver.switch_to.default_content()
+                return encontrado
+            
+            return False
+        except Exception:
+            return False
     
     def abrir_site(self):
         """Abre o site da Receita Federal"""
@@ -277,11 +603,30 @@ class AutomacaoEFD:
             time.sleep(TEMPO_ESPERA_SCRIPT)
     
     def fechar(self):
-        """Fecha o navegador"""
+        """Fecha o navegador (no modo anexar apenas desconecta, mantendo o Chrome aberto)"""
+        self.tempos.gravar()
+        self.contabilidade.gravar()
+        
+        if self.driver and CHROME_MODO_ANEXAR:
+            print("\n🔌 Desconectando do Chrome (navegador continua aberto e logado)...")
+            try:
+                self.driver.service.stop()
+            except Exception:
+                pass
+            print("✅ Chrome desconectado!")
+            return
+        
         if self.driver:
             print("\n🔒 Fechando Chrome...")
             self.driver.quit()
             print("✅ Chrome fechado!")
+        
+        if self.display_virtual:
+            if self._display_xlib is not None:
+                self._display_xlib.close()
+                self._display_xlib = None
+            self.display_virtual.parar()
+            self.display_virtual = None
     
     # ============================================================
     # FUNÇÕES DE AUTOMAÇÃO (a serem implementadas)
@@ -299,23 +644,19 @@ class AutomacaoEFD:
     
     def formatar_valor(self, valor):
         """Formata um valor para 2 casas decimais no padrão brasileiro (vírgula)"""
-        try:
-            if isinstance(valor, str):
-                # Remover caracteres não numéricos exceto vírgula e ponto
-                valor_limpo = ''.join(c for c in valor if c.isdigit() or c in [',', '.'])
-                # Substituir vírgula por ponto para conversão
-                valor_limpo = valor_limpo.replace(',', '.')
-                valor_float = float(valor_limpo)
-            else:
-                valor_float = float(valor)
-            
-            # Arredondar para 2 casas decimais
-            valor_arredondado = round(valor_float, 2)
-            
-            # Formatar com 2 casas decimais e vírgula
-            return f"{valor_arredondado:.2f}".replace('.', ',')
-        except (ValueError, TypeError):
+        valor_float = leitura_planilha.converter_valor(valor)
+        if valor_float is None:
             return '0,00'
+        
+        # Arredondar para 2 casas decimais
+        valor_arredondado = round(valor_float, 2)
+        
+        # Formatar com 2 casas decimais e vírgula
+        return f"{valor_arredondado:.2f}".replace('.', ',')
+    
+    def normalizar_cpf(self, valor):
+        """Remove pontuação do CPF para comparação (ex: '000.000.000-00' -> '00000000000')"""
+        return leitura_planilha.normalizar_cpf(valor)
     
     def valor_eh_zero_ou_nulo(self, valor):
         """
@@ -327,26 +668,7 @@ class AutomacaoEFD:
         Returns:
             bool: True se o valor for zero ou nulo, False caso contrário
         """
-        # Se for None ou string vazia
-        if valor is None or (isinstance(valor, str) and valor.strip() == ''):
-            return True
-        
-        # Tentar converter para float e verificar se é zero
-        try:
-            if isinstance(valor, str):
-                # Remover caracteres não numéricos exceto vírgula e ponto
-                valor_limpo = ''.join(c for c in valor if c.isdigit() or c in [',', '.'])
-                # Substituir vírgula por ponto para conversão
-                valor_limpo = valor_limpo.replace(',', '.')
-                valor_float = float(valor_limpo)
-            else:
-                valor_float = float(valor)
-            
-            # Verificar se é zero (com tolerância para pequenas diferenças de ponto flutuante)
-            return abs(valor_float) < 0.01
-        except (ValueError, TypeError):
-            # Se não conseguir converter, considerar como nulo
-            return True
+        return leitura_planilha.valor_eh_zero_ou_nulo(valor)
 
     def salvar_coordenadas_config(self, coordenadas):
         """Salva as coordenadas no arquivo config.py"""
@@ -381,20 +703,7 @@ class AutomacaoEFD:
     
     def mapear_dependencia(self, dependencia_dataframe):
         """Mapeia a dependência do Excel para o valor do formulário"""
-        dependencia_upper = str(dependencia_dataframe).strip().upper()
-        
-        # Buscar mapeamento exato
-        if dependencia_upper in MAPEAMENTO_DEPENDENCIAS:
-            return MAPEAMENTO_DEPENDENCIAS[dependencia_upper]
-        
-        # Buscar mapeamento parcial (para variações)
-        for key, value in MAPEAMENTO_DEPENDENCIAS.items():
-            if key in dependencia_upper or dependencia_upper in key:
-                return value
-        
-        # Se não encontrar, usar "Agregado/Outros" como padrão
-        print(f"⚠️ Dependência não mapeada: '{dependencia_dataframe}' - usando '99' (Agregado/Outros)")
-        return '99'
+        return leitura_planilha.mapear_dependencia(dependencia_dataframe)
     
     def inicializar_banco_dados(self):
         """Inicializa o banco de dados SQLite para checkpoint"""
@@ -453,6 +762,60 @@ class AutomacaoEFD:
                 )
             ''')
             
+            # Criar tabela de recibos (comprovante de cada envio por titular e período)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS recibos (
+                    cpf_titular TEXT NOT NULL,
+                    periodo_apuracao TEXT NOT NULL,
+                    nome_titular TEXT,
+                    numero_recibo TEXT,
+                    protocolo TEXT,
+                    data_hora_portal TEXT,
+                    mensagem TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (cpf_titular, periodo_apuracao)
+                )
+            ''')
+            
+            # Criar tabela de leases (reserva de grupos entre processos concorrentes)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS leases_grupos (
+                    cpf_titular TEXT PRIMARY KEY,
+                    indice_grupo INTEGER,
+                    worker_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    expira_em REAL NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 1,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Criar fila de trabalho (grupos pendentes e retentativas com backoff)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS fila_grupos (
+                    cpf_titular TEXT PRIMARY KEY,
+                    indice_grupo INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    proxima_tentativa REAL NOT NULL DEFAULT 0,
+                    tipo_erro TEXT,
+                    ultimo_erro TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_fila_grupos_status ON fila_grupos (status, indice_grupo)')
+            
+            # Último checkpoint de cada titular sem varrer a tabela (--retry-failed)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_progresso_cpf_id ON progresso_efd (cpf_titular, id)')
+            
+            # Criar tabela de tempos das etapas (spans gravados em lote por tempos_etapas.py)
+            cursor.execute(SQL_TEMPOS_ETAPAS)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tempos_etapas_execucao ON tempos_etapas (execucao, etapa)')
+            
+            # Criar tabela do tempo de cada grupo por categoria (contabilidade_tempo.py)
+            cursor.execute(SQL_TEMPOS_CATEGORIAS)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tempos_categorias_execucao ON tempos_categorias (execucao)')
+            
             conn.commit()
             conn.close()
             print("✅ Banco de dados inicializado")
@@ -487,6 +850,38 @@ class AutomacaoEFD:
             print(f"❌ Erro ao salvar checkpoint: {e}")
             return False
     
+    def salvar_recibo(self, cpf_titular, nome_titular, resultado):
+        """
+        Salva o recibo do envio (um por titular e período de apuração).
+        
+        Args:
+            cpf_titular (str): CPF do titular
+            nome_titular (str): Nome do titular
+            resultado (dict): Resultado da sonda de confirmação (self.resultado_envio)
+        """
+        try:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            
+            # Reenvio no mesmo período substitui o recibo anterior
+            cursor.execute('''
+                INSERT OR REPLACE INTO recibos
+                (cpf_titular, periodo_apuracao, nome_titular, numero_recibo, protocolo, data_hora_portal, mensagem)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (cpf_titular, self.periodo_apuracao, nome_titular, resultado.get('recibo'),
+                  resultado.get('protocolo'), resultado.get('data_hora'), resultado.get('texto')))
+            
+            conn.commit()
+            conn.close()
+            
+            if resultado.get('recibo'):
+                print(f"🧾 Recibo {resultado['recibo']} salvo")
+            else:
+                print("⚠️ Número do recibo não encontrado na mensagem - mensagem salva em recibos")
+            
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar recibo: {e}")
+    
     def salvar_dependente_processado(self, cpf_titular, cpf_dependente, relacao, descricao_agregado, status):
         """Salva dependente processado"""
         try:
@@ -554,11 +949,11 @@ class AutomacaoEFD:
             conn = sqlite3.connect(BANCO_DADOS)
             cursor = conn.cursor()
             
-            # Buscar o último checkpoint deste CPF
+            # Buscar o último checkpoint deste CPF (id desempata checkpoints do mesmo segundo)
             cursor.execute('''
                 SELECT etapa_atual, status FROM progresso_efd 
                 WHERE cpf_titular = ? 
-                ORDER BY timestamp DESC 
+                ORDER BY timestamp DESC, id DESC
                 LIMIT 1
             ''', (cpf_titular,))
             
@@ -636,7 +1031,7 @@ class AutomacaoEFD:
                 SELECT etapa_atual, status, timestamp, observacoes
                 FROM progresso_efd 
                 WHERE cpf_titular = ? 
-                ORDER BY timestamp DESC 
+                ORDER BY timestamp DESC, id DESC
                 LIMIT 1
             ''', (cpf_titular,))
             
@@ -870,6 +1265,7 @@ class AutomacaoEFD:
             print(f"❌ Erro ao tratar CPF já lançado: {e}")
             return False
     
+    @cronometrar('dados_iniciais')
     def preencher_dados_iniciais(self, cpf_titular, nome_titular=None):
         """
         Preenche os 3 campos iniciais e clica em Continuar
@@ -930,7 +1326,7 @@ class AutomacaoEFD:
             campo_data = self.driver.find_element(By.ID, "periodo_apuracao")
             campo_data.clear()
             self.delay_humano(0.1, 0.2)
-            self.digitar_devagar(campo_data, PERIODO_APURACAO)
+            self.digitar_devagar(campo_data, self.periodo_apuracao)
             self.delay_humano(0.1, 0.3)
             
             # CAMPO 2: CNPJ
@@ -1129,6 +1525,7 @@ class AutomacaoEFD:
             print(f"❌ Erro ao verificar segunda etapa: {e}")
             return False
     
+    @cronometrar('continuar')
     def continuar_para_proxima_etapa(self):
         """Clica no botão Continuar e verifica se passou para a próxima etapa"""
         try:
@@ -1178,6 +1575,7 @@ class AutomacaoEFD:
             )
             return False
     
+    @cronometrar('modal_dependente')
     def adicionar_dependente(self, cpf_dependente, relacao_valor, agregado_outros=None):
         """Adiciona um dependente ao formulário"""
         try:
@@ -1280,6 +1678,7 @@ class AutomacaoEFD:
             self.salvar_dependente_processado(self.cpf_titular_atual, cpf_dependente, relacao_valor, agregado_outros, "erro")
             return False
     
+    @cronometrar('modal_plano')
     def adicionar_plano_saude(self, cnpj_operadora, valor_titular):
         """Adiciona um plano de saúde ao formulário"""
         try:
@@ -1344,6 +1743,7 @@ class AutomacaoEFD:
             self.salvar_plano_processado(self.cpf_titular_atual, cnpj_operadora, valor_titular, "erro")
             return False
     
+    @cronometrar('modal_info_dependente')
     def adicionar_informacao_dependente(self, cpf_dependente, valor_dependente):
         """Adiciona informação de dependente (valor)"""
         try:
@@ -1402,6 +1802,7 @@ class AutomacaoEFD:
             print(f"❌ Erro ao adicionar informação do dependente: {e}")
             return False
     
+    @cronometrar('envio')
     def enviar_declaracao(self):
         """Envia a declaração usando o botão 'Concluir e enviar'"""
         try:
@@ -1423,6 +1824,15 @@ class AutomacaoEFD:
             self.driver.execute_script("arguments[0].scrollIntoView(true);", botao_enviar)
             time.sleep(TEMPO_APOS_SCROLL)
             
+            # Capturar a região do assinador antes dele abrir (detecção por mudança de tela)
+            self._capturar_referencia_assinador()
+            
+            # Alertas já na tela (ex: do grupo anterior) não são o resultado deste envio
+            try:
+                self.driver.execute_script(SCRIPT_MARCAR_ALERTAS, SELETOR_ALERTAS)
+            except Exception:
+                pass
+            
             # Clicar no botão
             botao_enviar.click()
             
@@ -1438,51 +1848,40 @@ class AutomacaoEFD:
             print("💡 Verifique se o formulário foi totalmente preenchido")
             return False
     
+    @cronometrar('confirmacao')
     def aguardar_alerta_sucesso_assinatura(self):
-        """Aguarda automaticamente o alerta de sucesso da assinatura eletrônica"""
+        """
+        Aguarda o resultado do envio após a assinatura eletrônica.
+        
+        Uma única sonda JavaScript (SCRIPT_RESULTADO_ENVIO) é avaliada a cada
+        ALERTA_INTERVALO_VERIFICACAO e retorna o primeiro resultado visível:
+        sucesso (MS7001), erro do portal ou cancelamento da assinatura. Alertas
+        que já estavam na tela antes do clique em enviar (marcados por
+        enviar_declaracao) são ignorados enquanto mantêm o mesmo texto. Assim
+        falhas são reconhecidas em segundos, sem esperar TIMEOUT_ALERTA_SUCESSO.
+        O resultado fica em self.resultado_envio ({'tipo', 'texto'}), com tipo
+        'timeout' quando nada é detectado. No sucesso, a mesma sonda extrai
+        'recibo', 'protocolo' e 'data_hora' da mensagem (None se ausentes).
+        
+        Returns:
+            bool: True somente se o sucesso (MS7001) foi detectado
+        """
+        self.resultado_envio = {'tipo': 'timeout', 'texto': None}
+        
+        def sondar(driver):
+            return driver.execute_script(SCRIPT_RESULTADO_ENVIO, ALERTA_CODIGOS_ERRO,
+                                         ALERTA_TEXTOS_CANCELAMENTO, SELETOR_ALERTAS)
+        
         try:
-            
-            wait = WebDriverWait(self.driver, TIMEOUT_ALERTA_SUCESSO)
-            
-            # Tentar detectar alerta de sucesso
-            try:
-                alerta = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="mensagem_descricao_0"]'))
-                )
-                if "ms7001" in alerta.text.lower() and "evento recebido com sucesso" in alerta.text.lower():
-                    return True
-                    
-            except:
-                try:
-                    alerta = wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'app-reinf-mensagens-alerta .message.success'))
-                    )
-                    if alerta.is_displayed():
-                        texto_alerta = alerta.text
-                        if "ms7001" in texto_alerta.lower() and "evento recebido com sucesso" in texto_alerta.lower():
-                            return True
-                        
-                except:
-                    try:
-                        alerta = wait.until(
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'MS7001 - Evento recebido com sucesso')]"))
-                        )
-                        if alerta.is_displayed():
-                            return True
-                        
-                    except:
-                        componente_mensagem = wait.until(
-                            EC.presence_of_element_located((By.TAG_NAME, "app-reinf-mensagens-alerta"))
-                        )
-                        if componente_mensagem.is_displayed():
-                            texto_componente = componente_mensagem.text
-                            if "sucesso" in texto_componente.lower() and "ms7001" in texto_componente.lower():
-                                return True
-            
-            return False
-            
-        except Exception as e:
+            wait = WebDriverWait(self.driver, TIMEOUT_ALERTA_SUCESSO, poll_frequency=ALERTA_INTERVALO_VERIFICACAO)
+            self.resultado_envio = wait.until(sondar)
+        except Exception:
             return False
+        
+        if self.resultado_envio['tipo'] != 'sucesso':
+            print(f"⚠️ Resultado do envio: {self.resultado_envio['tipo']} - {self.resultado_envio['texto']}")
+        
+        return self.resultado_envio['tipo'] == 'sucesso'
     
     def realizar_assinatura_automatica(self, metodo_assinatura=1):
         """
@@ -1492,8 +1891,12 @@ class AutomacaoEFD:
         de assinatura (como Assinador Serpro) se estabilizar e executando a
         sequência de comandos apropriada.
         
+        Com ASSINATURA_BACKEND = 'protocolo' (experimental, só atendido pelo
+        stub/portal simulado), a solicitação é confirmada pelo protocolo
+        hipotético de assinador.py; se falhar, segue para os métodos PyAutoGUI.
+        
         Fluxo:
-        1. Aguarda 15s para aplicativo de assinatura carregar
+        1. Aguarda a janela do assinador aparecer (no máximo TEMPO_ESPERA_ASSINADOR)
         2. Executa método de assinatura selecionado:
            - Método A: Seta ↑, Seta ↑, Enter (recomendado)
            - Método B: Click nas coordenadas + Enter
@@ -1511,8 +1914,11 @@ class AutomacaoEFD:
         try:
             print("🔐 Executando assinatura automática...")
             
+            if self.cliente_assinador is not None and self._assinatura_protocolo():
+                return True
+            
             # Aguardar aplicativo de assinatura
-            if not self._aguardar_tempo_fixo(TEMPO_ESPERA_ASSINADOR):
+            if not self.aguardar_assinador_pronto():
                 print("❌ Erro durante espera")
                 return False
             
@@ -1528,64 +1934,269 @@ class AutomacaoEFD:
             print(f"❌ Erro na assinatura automática: {e}")
             return False
     
-    def _aguardar_tempo_fixo(self, tempo_espera=15):
+    @cronometrar('assinatura')
+    def _assinatura_protocolo(self):
         """
-        Aguarda um tempo fixo para o aplicativo de assinatura se estabilizar
+        Confirma a assinatura pelo serviço local do assinador.
         
-        Args:
-            tempo_espera (int): Tempo em segundos para aguardar
+        Returns:
+            bool: True se assinado; False para usar os métodos PyAutoGUI
         """
         try:
-            print(f"⏳ Aguardando {tempo_espera}s...")
-            time.sleep(tempo_espera)
-            return True
-            
-        except Exception as e:
-            return True  # Continuar mesmo com erro
+            print("🔌 Assinando pelo serviço local do assinador...")
+            if self.cliente_assinador.assinar_pendente(
+                ASSINADOR_CERTIFICADO,
+                tempo_maximo=TEMPO_ESPERA_ASSINADOR,
+                intervalo=ASSINADOR_INTERVALO_VERIFICACAO,
+            ):
+                print("✅ Assinatura confirmada pelo serviço local")
+                return True
+            print("⚠️ Nenhuma solicitação de assinatura recebida pelo serviço local")
+        except ErroAssinador as e:
+            print(f"⚠️ {e}")
+        
+        print("💡 Usando o método PyAutoGUI como alternativa")
+        return False
     
-    def _assinatura_metodo_a(self):
-        """Método A de assinatura - 3 teclas: Seta ↑, Seta ↑, Enter"""
+    @contextmanager
+    def faixa_assinatura(self):
+        """
+        Faixa exclusiva de assinatura para o modo pool.
+        
+        O assinador é controlado por teclado/mouse globais (pyautogui), então
+        apenas um worker por vez pode enviar e assinar. Ao entrar na faixa, a
+        janela do Chrome deste worker é trazida para frente para que o
+        assinador abra sobre ela. Fora do modo pool não faz nada.
+        """
+        if self.trava_assinatura is None:
+            self._apontar_pyautogui()
+            yield
+            return
+        
+        with self.trava_assinatura:
+            self._apontar_pyautogui()
+            self.trazer_janela_para_frente()
+            yield
+    
+    def trazer_janela_para_frente(self):
+        """Traz a janela do Chrome para frente (minimizar + maximizar força o foco)"""
         try:
-            print("🔐 Executando Método A de assinatura...")
-            print("📝 Sequência: Seta ↑ → Seta ↑ → Enter")
-            
-            # A página já foi verificada, pode executar diretamente
-            
-            # Sequência específica do Método A
-            print("1️⃣ Pressionando Seta para Cima...")
-            pyautogui.press('up')
-            time.sleep(ASSINATURA_METODO_A_INTERVALO)
-            
-            print("2️⃣ Pressionando Seta para Cima...")
-            pyautogui.press('up')
-            time.sleep(ASSINATURA_METODO_A_INTERVALO)
-            
-            print("3️⃣ Pressionando Enter...")
-            pyautogui.press('enter')
-            time.sleep(TEMPO_ESPERA_CLIQUE)
-            
-            print("✅ Método A concluído - sequência de teclas executada")
-            return True
-            
+            self.driver.minimize_window()
+            self.driver.maximize_window()
         except Exception as e:
-            print(f"❌ Erro no Método A: {e}")
-            return False
+            print(f"⚠️ Não foi possível focar a janela do Chrome: {e}")
     
-    def _assinatura_metodo_b(self):
+    @cronometrar('espera_assinador')
+    def aguardar_assinador_pronto(self):
+        """
+        Aguarda a janela do assinador aparecer, usando TEMPO_ESPERA_ASSINADOR
+        apenas como tempo máximo.
+        
+        Detecção (verificada a cada ASSINADOR_INTERVALO_VERIFICACAO):
+        - Título da janela: lista de janelas do X11 (xdotool) no Linux ou
+          títulos das janelas via PyAutoGUI no Windows
+        - Região da tela (ASSINADOR_REGIAO_TELA): mudança em relação à captura
+          feita antes de clicar em 'Concluir e enviar'
+        
+        Sem nenhum método disponível, mantém a espera fixa anterior.
+        
+        Returns:
+            bool: True para prosseguir com as teclas de assinatura
+        """
+        self.janela_assinador = None
+        
+        titulo_disponivel = self._deteccao_titulo_disponivel()
+        if not ASSINADOR_DETECCAO_ATIVA or not (titulo_disponivel or self._referencia_assinador is not None):
+            return self._aguardar_tempo_fixo(TEMPO_ESPERA_ASSINADOR)
+        
+        print(f"⏳ Aguardando janela do assinador (máx. {TEMPO_ESPERA_ASSINADOR}s)...")
+        inicio = time.time()
+        while time.time() - inicio < TEMPO_ESPERA_ASSINADOR:
+            janela = self.localizar_janela_assinador() if titulo_disponivel else None
+            
+            if janela or self._regiao_assinador_mudou():
+                self.janela_assinador = janela
+                print(f"✅ Assinador detectado em {time.time() - inicio:.1f}s")
+                # Pequena pausa para o diálogo aceitar teclas
+                time.sleep(ASSINADOR_TEMPO_ESTABILIZACAO)
+                return True
+            
+            time.sleep(ASSINADOR_INTERVALO_VERIFICACAO)
+        
+        print("⚠️ Assinador não detectado - prosseguindo após o tempo máximo")
+        return True
+    
+    def _deteccao_titulo_disponivel(self):
+        """Verifica se é possível listar janelas por título neste sistema"""
+        if SISTEMA_OPERACIONAL == "Linux":
+            return shutil.which('xdotool') is not None
+        return hasattr(pyautogui, 'getAllTitles')
+    
+    def localizar_janela_assinador(self):
+        """
+        Procura a janela do assinador pelos títulos de ASSINADOR_TITULOS_JANELA.
+        
+        Returns:
+            str: Id da janela no X11 (Linux) ou título da janela (Windows),
+                None se não encontrada
+        """
+        try:
+            if SISTEMA_OPERACIONAL == "Linux":
+                for titulo in ASSINADOR_TITULOS_JANELA:
+                    resultado = subprocess.run(
+                        ['xdotool', 'search', '--onlyvisible', '--name', titulo],
+                        capture_output=True, text=True, timeout=2, env=self._ambiente_x11()
+                    )
+                    ids = resultado.stdout.split()
+                    if ids:
+                        return ids[-1]  # Janela mais recente
+                return None
+            
+            for titulo_janela in pyautogui.getAllTitles():
+                if any(titulo.lower() in titulo_janela.lower() for titulo in ASSINADOR_TITULOS_JANELA):
+                    return titulo_janela
+            return None
+            
+        except Exception:
+            return None
+    
+    def _capturar_referencia_assinador(self):
+        """Captura a região do assinador antes do envio para detectar quando ele abrir"""
+        self._referencia_assinador = None
+        if not (ASSINADOR_DETECCAO_ATIVA and ASSINADOR_REGIAO_TELA):
+            return
+        
+        try:
+            self._referencia_assinador = pyautogui.screenshot(region=ASSINADOR_REGIAO_TELA)
+        except Exception as e:
+            print(f"⚠️ Não foi possível capturar a região do assinador: {e}")
+    
+    def _regiao_assinador_mudou(self):
+        """Compara a região do assinador com a captura anterior ao envio"""
+        if self._referencia_assinador is None:
+            return False
+        
+        try:
+            from PIL import ImageChops
+            
+            atual = pyautogui.screenshot(region=ASSINADOR_REGIAO_TELA).convert('L')
+            diferenca = ImageChops.difference(atual, self._referencia_assinador.convert('L'))
+            
+            # Fração de pixels com diferença perceptível
+            pixels_alterados = diferenca.point(lambda p: 255 if p > 30 else 0).histogram()[255]
+            largura, altura = atual.size
+            return pixels_alterados / (largura * altura) >= ASSINADOR_LIMIAR_MUDANCA
+            
+        except Exception:
+            return False
+    
+    def _aguardar_tempo_fixo(self, tempo_espera=15):
+        """
+        Aguarda um tempo fixo para o aplicativo de assinatura se estabilizar
+        
+        Args:
+            tempo_espera (int): Tempo em segundos para aguardar
+        """
+        try:
+            print(f"⏳ Aguardando {tempo_espera}s...")
+            time.sleep(tempo_espera)
+            return True
+            
+        except Exception as e:
+            return True  # Continuar mesmo com erro
+    
+    @cronometrar('assinatura')
+    def _assinatura_metodo_a(self):
+        """Método A de assinatura - 3 teclas: Seta ↑, Seta ↑, Enter"""
+        try:
+            print("🔐 Executando Método A de assinatura...")
+            print("📝 Sequência: Seta ↑ → Seta ↑ → Enter")
+            
+            # No Linux, enviar as teclas direto para a janela do assinador (sem depender do foco)
+            if self._enviar_teclas_assinador(['Up', 'Up', 'Return'], ASSINATURA_METODO_A_INTERVALO):
+                time.sleep(TEMPO_ESPERA_CLIQUE)
+                print("✅ Método A concluído - teclas enviadas à janela do assinador")
+                return True
+            
+            # A página já foi verificada, pode executar diretamente
+            
+            # Sequência específica do Método A
+            print("1️⃣ Pressionando Seta para Cima...")
+            pyautogui.press('up')
+            time.sleep(ASSINATURA_METODO_A_INTERVALO)
+            
+            print("2️⃣ Pressionando Seta para Cima...")
+            pyautogui.press('up')
+            time.sleep(ASSINATURA_METODO_A_INTERVALO)
+            
+            print("3️⃣ Pressionando Enter...")
+            pyautogui.press('enter')
+            time.sleep(TEMPO_ESPERA_CLIQUE)
+            
+            print("✅ Método A concluído - sequência de teclas executada")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro no Método A: {e}")
+            return False
+    
+    def _enviar_teclas_assinador(self, teclas, intervalo):
+        """
+        Envia teclas para a janela do assinador pelo id X11 (xdotool), sem
+        passar pelo teclado global.
+        
+        Modos (ASSINADOR_TECLAS_MODO):
+        - 'janela': eventos enviados à janela (XSendEvent), sem precisar de foco
+        - 'foco': ativa a janela do assinador e envia as teclas (XTest)
+        - 'global': não usa xdotool (teclas globais do PyAutoGUI)
+        
+        Args:
+            teclas (list): Nomes das teclas no formato do X11 (ex: 'Up', 'Return')
+            intervalo (float): Intervalo entre teclas (segundos)
+        
+        Returns:
+            bool: True se enviadas; False para usar as teclas globais
+        """
+        janela = self.janela_assinador
+        if (ASSINADOR_TECLAS_MODO == 'global' or SISTEMA_OPERACIONAL != "Linux"
+                or not (janela and str(janela).isdigit()) or shutil.which('xdotool') is None):
+            return False
+        
+        atraso = str(int(intervalo * 1000))
+        if ASSINADOR_TECLAS_MODO == 'foco':
+            comando = ['xdotool', 'windowactivate', '--sync', janela, 'key', '--delay', atraso] + teclas
+        else:
+            comando = ['xdotool', 'key', '--window', janela, '--delay', atraso] + teclas
+        
+        try:
+            print(f"⌨️ Enviando {' → '.join(teclas)} para a janela {janela} do assinador...")
+            subprocess.run(comando, check=True, capture_output=True, timeout=5 + len(teclas) * intervalo,
+                           env=self._ambiente_x11())
+            return True
+        except Exception as e:
+            print(f"⚠️ Falha ao enviar teclas para a janela do assinador: {e}")
+            return False
+    
+    @cronometrar('assinatura')
+    def _assinatura_metodo_b(self):
         """Método B de assinatura - Click do mouse + Enter"""
         try:
             print("🔐 Executando Método B de assinatura...")
             print("📝 Sequência: Click do Mouse → Enter")
             
-            # Verificar se coordenadas foram configuradas
-            if not self.coordenadas_mouse_metodo_b:
-                print("❌ Coordenadas do mouse não configuradas para Método B")
-                print("💡 Configure as coordenadas antes de executar")
+            # Localizar o botão pela imagem; coordenadas configuradas ficam como alternativa
+            posicao = self.localizar_botao_assinador()
+            if posicao:
+                x, y = posicao
+                print(f"🎯 Botão localizado pela imagem: ({x}, {y})")
+            elif self.coordenadas_mouse_metodo_b:
+                x, y = self.coordenadas_mouse_metodo_b
+                print(f"🎯 Coordenadas configuradas: ({x}, {y})")
+            else:
+                print("❌ Botão do assinador não localizado e coordenadas não configuradas")
+                print("💡 Configure as coordenadas ou a imagem do botão antes de executar")
                 return False
             
-            x, y = self.coordenadas_mouse_metodo_b
-            print(f"🎯 Coordenadas configuradas: ({x}, {y})")
-            
             # A página já foi verificada, pode executar diretamente
             
             # Sequência específica do Método B
@@ -1604,6 +2215,139 @@ class AutomacaoEFD:
             print(f"❌ Erro no Método B: {e}")
             return False
     
+    def localizar_botao_assinador(self):
+        """
+        Localiza o botão de confirmação do assinador na tela por template matching.
+        
+        A imagem ASSINADOR_TEMPLATE_BOTAO é procurada primeiro ao redor da
+        última posição encontrada (cache entre grupos) e, se não estiver lá,
+        em ASSINADOR_REGIAO_TELA ou na tela inteira.
+        
+        Returns:
+            tuple: Centro (x, y) do botão, ou None se não encontrado
+        """
+        template = self._carregar_template_botao()
+        if template is None:
+            return None
+        
+        try:
+            if self._bbox_botao_assinador:
+                x, y, largura, altura = self._bbox_botao_assinador
+                margem = ASSINADOR_TEMPLATE_MARGEM
+                regiao = (max(0, x - margem), max(0, y - margem), largura + 2 * margem, altura + 2 * margem)
+                posicao = self._buscar_template(template, regiao)
+                if posicao:
+                    return posicao
+                print("🔎 Botão fora da posição anterior - procurando na tela")
+            
+            return self._buscar_template(template, ASSINADOR_REGIAO_TELA)
+            
+        except Exception as e:
+            print(f"⚠️ Erro ao localizar o botão do assinador: {e}")
+            return None
+    
+    def _carregar_template_botao(self):
+        """Carrega (uma vez) a imagem do botão em tons de cinza"""
+        if self._template_botao is None and ASSINADOR_TEMPLATE_BOTAO and os.path.exists(ASSINADOR_TEMPLATE_BOTAO):
+            from PIL import Image
+            
+            with Image.open(ASSINADOR_TEMPLATE_BOTAO) as imagem:
+                self._template_botao = np.asarray(imagem.convert('L'), dtype=np.float32)
+        return self._template_botao
+    
+    def _buscar_template(self, template, regiao=None):
+        """
+        Procura o template em uma região da tela e atualiza o cache de posição.
+        
+        Args:
+            template (numpy.ndarray): Imagem do botão em tons de cinza
+            regiao (tuple): (x, y, largura, altura) ou None para a tela inteira
+        
+        Returns:
+            tuple: Centro (x, y) do botão, ou None se a semelhança ficar abaixo
+                de ASSINADOR_TEMPLATE_LIMIAR
+        """
+        if regiao is not None:
+            # Limitar a região ao tamanho da tela
+            largura_tela, altura_tela = pyautogui.size()
+            x, y, largura, altura = regiao
+            regiao = (x, y, min(largura, largura_tela - x), min(altura, altura_tela - y))
+        
+        origem_x, origem_y = (regiao[0], regiao[1]) if regiao else (0, 0)
+        imagem = np.asarray(pyautogui.screenshot(region=regiao).convert('L'), dtype=np.float32)
+        
+        altura_t, largura_t = template.shape
+        if imagem.shape[0] < altura_t or imagem.shape[1] < largura_t:
+            return None
+        
+        semelhanca, (linha, coluna) = self._correlacao_normalizada(imagem, template)
+        if semelhanca < ASSINADOR_TEMPLATE_LIMIAR:
+            return None
+        
+        self._bbox_botao_assinador = (origem_x + coluna, origem_y + linha, largura_t, altura_t)
+        return (origem_x + coluna + largura_t // 2, origem_y + linha + altura_t // 2)
+    
+    @staticmethod
+    def _correlacao_normalizada(imagem, template):
+        """
+        Correlação cruzada normalizada (NCC) do template em todas as posições
+        da imagem, calculada por FFT com somas de janela por imagem integral.
+        
+        Returns:
+            tuple: (maior semelhança entre -1 e 1, (linha, coluna) do canto superior esquerdo)
+        """
+        altura_t, largura_t = template.shape
+        altura_i, largura_i = imagem.shape
+        n = altura_t * largura_t
+        
+        template = template - template.mean()
+        norma_template = np.sqrt((template ** 2).sum())
+        if norma_template == 0:
+            return 0.0, (0, 0)
+        
+        # Correlação do template (média zero) com a imagem em todas as posições válidas
+        forma = (altura_i + altura_t - 1, largura_i + largura_t - 1)
+        espectro = np.fft.rfft2(imagem, forma) * np.fft.rfft2(template[::-1, ::-1], forma)
+        correlacao = np.fft.irfft2(espectro, forma)[altura_t - 1:altura_i, largura_t - 1:largura_i]
+        
+        # Soma e soma dos quadrados de cada janela (imagem integral)
+        def somas_janela(matriz):
+            integral = np.pad(matriz.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+            return (integral[altura_t:, largura_t:] - integral[:-altura_t, largura_t:]
+                    - integral[altura_t:, :-largura_t] + integral[:-altura_t, :-largura_t])
+        
+        imagem = imagem.astype(np.float64)
+        soma = somas_janela(imagem)
+        variancia = np.maximum(somas_janela(imagem ** 2) - soma ** 2 / n, 1e-6)
+        
+        ncc = correlacao / (np.sqrt(variancia) * norma_template)
+        linha, coluna = np.unravel_index(np.argmax(ncc), ncc.shape)
+        return float(ncc[linha, coluna]), (int(linha), int(coluna))
+    
+    def capturar_template_botao(self):
+        """Salva a imagem do botão do assinador a partir da posição do mouse"""
+        try:
+            print("\n📸 CAPTURA DA IMAGEM DO BOTÃO DO ASSINADOR")
+            print("="*40)
+            print("1. Abra o assinador (envie uma declaração de teste, se necessário)")
+            print("2. Posicione o mouse no CENTRO do botão de confirmação")
+            print("3. Pressione ENTER")
+            
+            input("\nPositione o mouse e pressione ENTER...")
+            
+            x, y = pyautogui.position()
+            largura, altura = ASSINADOR_TEMPLATE_TAMANHO
+            pyautogui.screenshot(region=(x - largura // 2, y - altura // 2, largura, altura)).save(ASSINADOR_TEMPLATE_BOTAO)
+            self._template_botao = None
+            self._bbox_botao_assinador = (x - largura // 2, y - altura // 2, largura, altura)
+            
+            print(f"✅ Imagem do botão salva em {ASSINADOR_TEMPLATE_BOTAO}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao capturar imagem do botão: {e}")
+            return False
+    
     def configurar_coordenadas_metodo_b(self):
         """Configura coordenadas do mouse para Método B de forma interativa"""
         try:
@@ -1614,8 +2358,9 @@ class AutomacaoEFD:
             print("1️⃣ - Detectar posição atual do mouse")
             print("2️⃣ - Inserir coordenadas manualmente") 
             print("3️⃣ - Usar coordenadas salvas anteriormente")
+            print("4️⃣ - Localizar o botão pela imagem (sem coordenadas fixas)")
             
-            opcao = input("\nEscolha uma opção (1, 2 ou 3): ").strip()
+            opcao = input("\nEscolha uma opção (1, 2, 3 ou 4): ").strip()
             
             if opcao == "1":
                 return self._detectar_posicao_mouse()
@@ -1623,8 +2368,13 @@ class AutomacaoEFD:
                 return self._inserir_coordenadas_manual()
             elif opcao == "3":
                 return self._usar_coordenadas_salvas()
+            elif opcao == "4":
+                if self._carregar_template_botao() is not None:
+                    print(f"✅ Usando imagem do botão: {ASSINADOR_TEMPLATE_BOTAO}")
+                    return True
+                return self.capturar_template_botao()
             else:
-                print("❌ Opção inválida! Digite apenas 1, 2 ou 3")
+                print("❌ Opção inválida! Digite apenas 1, 2, 3 ou 4")
                 print("💡 Tente novamente com uma opção válida")
                 return False
                 
@@ -1713,6 +2463,7 @@ class AutomacaoEFD:
             return False
     
     
+    @cronometrar('proximo_cpf')
     def clicar_proximo_cpf(self):
         """Clica no botão 'Incluir novo pagamento' para ir ao próximo CPF"""
         try:
@@ -1804,48 +2555,462 @@ class AutomacaoEFD:
             print(f"❌ Erro ao carregar Excel: {e}")
             return None
     
-    def processar_dataframe_por_grupos(self):
-        """Processa o dataframe agrupando por titular"""
+    def processar_dataframe_por_grupos(self, arquivo_excel=None, planilha=None):
+        """
+        Processa o dataframe agrupando por titular.
+        
+        Os grupos ficam em cache por (arquivo, planilha) enquanto o arquivo não
+        for modificado, para que jobs repetidos no daemon não releiam o Excel.
+        
+        Args:
+            arquivo_excel (str): Arquivo Excel (padrão: ARQUIVO_EXCEL do config)
+            planilha (str): Aba do Excel (padrão: PLANILHA do config)
+        """
         try:
+            arquivo_excel = arquivo_excel or ARQUIVO_EXCEL
+            planilha = planilha or PLANILHA
+            
+            chave = (os.path.abspath(arquivo_excel), planilha)
+            mtime = os.path.getmtime(arquivo_excel)
+            em_cache = self._cache_grupos.get(chave)
+            if em_cache and em_cache[0] == mtime:
+                print(f"\n♻️ {len(em_cache[1])} grupos reaproveitados do cache ({planilha})")
+                return em_cache[1]
+            
             print("\n📊 Processando dados do Excel por grupos...")
-            dados = pd.read_excel(ARQUIVO_EXCEL, sheet_name=PLANILHA, skiprows=1)
-            dados_limpos = dados.dropna(how='all')
-            dados_limpos = dados_limpos[dados_limpos['CPF'].notna()]
+            grupos = leitura_planilha.ler_grupos(arquivo_excel, planilha)
             
-            # Agrupar por titular
-            grupos = []
-            grupo_atual = []
+            print(f"✅ {len(grupos)} grupos (titulares) encontrados")
+            self._cache_grupos[chave] = (mtime, grupos)
+            return grupos
             
-            for index, row in dados_limpos.iterrows():
-                if pd.isna(row['NOME']) or str(row['NOME']).strip() == '':
-                    continue
-                if pd.isna(row['DEPENDENCIA']) or str(row['DEPENDENCIA']).strip() == '':
-                    continue
-                if pd.isna(row['CPF']) or str(row['CPF']).strip() == '':
-                    continue
+        except Exception as e:
+            print(f"❌ Erro ao processar dataframe: {e}")
+            return []
+    
+    # ============================================================
+    # LEASES DE GRUPOS (vários processos/máquinas no mesmo banco)
+    # ============================================================
+    
+    def reivindicar_proximo_grupo(self, grupos, inicio=0):
+        """
+        Reivindica atomicamente o próximo grupo não finalizado a partir de 'inicio'.
+        
+        Um grupo pode ser reivindicado se ainda não tem lease, se o lease
+        expirou (worker travou ou foi encerrado) ou se falhou com menos de
+        LEASE_MAX_TENTATIVAS tentativas. Grupos concluídos nunca são
+        reivindicados novamente.
+        
+        Args:
+            grupos (list): Lista completa de grupos da planilha
+            inicio (int): Índice a partir do qual procurar
+        
+        Returns:
+            int: Índice do grupo reivindicado, ou None se não houver mais grupos
+        """
+        for i in range(inicio, len(grupos)):
+            cpf_titular = grupos[i][0]['CPF']
+            
+            # Grupos finalizados em execuções anteriores não precisam de lease
+            if self.verificar_grupo_completamente_processado(cpf_titular) or \
+               self.verificar_ultimo_status_pulado(cpf_titular):
+                continue
+            
+            try:
+                conn = sqlite3.connect(BANCO_DADOS, timeout=30)
+                cursor = conn.cursor()
+                agora = time.time()
                 
-                dependencia = str(row['DEPENDENCIA']).strip().upper()
+                # INSERT ou UPDATE condicional em um único comando = reivindicação atômica
+                cursor.execute('''
+                    INSERT INTO leases_grupos (cpf_titular, indice_grupo, worker_id, status, expira_em)
+                    VALUES (?, ?, ?, 'em_andamento', ?)
+                    ON CONFLICT(cpf_titular) DO UPDATE SET
+                        indice_grupo = excluded.indice_grupo,
+                        worker_id = excluded.worker_id,
+                        status = 'em_andamento',
+                        expira_em = excluded.expira_em,
+                        tentativas = leases_grupos.tentativas + 1,
+                        timestamp = CURRENT_TIMESTAMP
+                    WHERE (leases_grupos.status = 'em_andamento' AND leases_grupos.expira_em < ?)
+                       OR (leases_grupos.status = 'erro' AND leases_grupos.tentativas < ?)
+                ''', (cpf_titular, i, self.worker_id, agora + LEASE_DURACAO, agora, LEASE_MAX_TENTATIVAS))
                 
-                # Se for TITULAR, finaliza o grupo anterior e inicia um novo
-                if dependencia == 'TITULAR':
-                    if grupo_atual:  # Se há um grupo anterior, adiciona à lista
-                        grupos.append(grupo_atual)
-                    grupo_atual = [row]  # Inicia novo grupo com o titular
-                else:
-                    # Se não for titular, adiciona como dependente ao grupo atual
-                    if grupo_atual:  # Só adiciona se há um grupo ativo
-                        grupo_atual.append(row)
+                reivindicado = cursor.rowcount == 1
+                conn.commit()
+                conn.close()
+                
+                if reivindicado:
+                    print(f"🔒 Lease obtido para o grupo {i+1} ({cpf_titular})")
+                    return i
+                
+            except Exception as e:
+                print(f"⚠️ Erro ao reivindicar grupo {i+1}: {e}")
+        
+        return None
+    
+    def renovar_lease(self, cpf_titular):
+        """Estende o lease de um grupo que este worker ainda está processando"""
+        try:
+            conn = sqlite3.connect(BANCO_DADOS, timeout=30)
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE leases_grupos SET expira_em = ?, timestamp = CURRENT_TIMESTAMP
+                WHERE cpf_titular = ? AND worker_id = ? AND status = 'em_andamento'
+            ''', (time.time() + LEASE_DURACAO, cpf_titular, self.worker_id))
+            renovado = cursor.rowcount == 1
+            conn.commit()
+            conn.close()
+            return renovado
             
-            # Adiciona o último grupo se existir
-            if grupo_atual:
-                grupos.append(grupo_atual)
+        except Exception as e:
+            print(f"⚠️ Erro ao renovar lease: {e}")
+            return False
+    
+    def liberar_lease(self, cpf_titular, status):
+        """
+        Libera o lease de um grupo ao final do processamento.
+        
+        Args:
+            cpf_titular (str): CPF do titular do grupo
+            status (str): 'concluido' (sucesso/pulado) ou 'erro' (pode ser
+                reivindicado novamente até LEASE_MAX_TENTATIVAS)
+        """
+        try:
+            conn = sqlite3.connect(BANCO_DADOS, timeout=30)
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE leases_grupos SET status = ?, expira_em = 0, timestamp = CURRENT_TIMESTAMP
+                WHERE cpf_titular = ? AND worker_id = ?
+            ''', (status, cpf_titular, self.worker_id))
+            conn.commit()
+            conn.close()
+            return True
             
-            print(f"✅ {len(grupos)} grupos (titulares) encontrados")
-            return grupos
+        except Exception as e:
+            print(f"⚠️ Erro ao liberar lease: {e}")
+            return False
+    
+    def confirmar_lease_atual(self):
+        """
+        Confirma, renovando na hora, que o grupo em processamento ainda é deste
+        worker. Chamado antes de enviar/assinar: se o lease expirou e outro
+        worker assumiu o grupo, o envio aqui duplicaria a declaração.
+        
+        Returns:
+            bool: True fora do modo lease ou se o lease continua deste worker
+        """
+        if self.lease_atual is None:
+            return True
+        return self.renovar_lease(self.lease_atual)
+    
+    @contextmanager
+    def manter_lease(self, cpf_titular):
+        """Renova o lease em segundo plano enquanto o grupo está sendo processado"""
+        parar = threading.Event()
+        
+        def renovar():
+            while not parar.wait(LEASE_RENOVACAO):
+                if not self.renovar_lease(cpf_titular):
+                    print(f"⚠️ Lease do grupo {cpf_titular} foi perdido")
+                    return
+        
+        thread = threading.Thread(target=renovar, daemon=True, name=threading.current_thread().name)
+        thread.start()
+        self.lease_atual = cpf_titular
+        try:
+            yield
+        finally:
+            self.lease_atual = None
+            parar.set()
+            thread.join()
+    
+    def processar_grupos_com_lease(self, grupos):
+        """
+        Processa grupos reivindicando cada um pela tabela leases_grupos.
+        
+        Permite que vários main.py (ou máquinas usando o mesmo banco) dividam a
+        mesma planilha sem processar o mesmo titular duas vezes. O checkpoint
+        de índice não é usado nesse modo. Ao chegar ao fim da planilha, a busca
+        recomeça do início para retentar grupos com erro (deste ou de outros
+        workers) até LEASE_MAX_TENTATIVAS; termina quando nada mais pode ser
+        reivindicado.
+        
+        Returns:
+            dict: Totais de 'sucessos', 'pulados' e 'erros' deste worker
+        """
+        sucessos = 0
+        erros = 0
+        pulados = 0
+        self.contabilidade.reiniciar()
+        
+        proximo = 0
+        while True:
+            i = self.reivindicar_proximo_grupo(grupos, proximo)
+            if i is None and proximo > 0:
+                # Fim da planilha: recomeçar para retentar os grupos que falharam
+                proximo = 0
+                continue
+            if i is None:
+                break
+            proximo = i + 1
+            
+            cpf_titular = grupos[i][0]['CPF']
+            resultado = "erro"
+            try:
+                with self.manter_lease(cpf_titular):
+                    resultado = self.processar_grupo_indice(grupos, i, salvar_indice=False)
+            finally:
+                # Lease perdido pertence a outro worker (ou expirou): não mexer nele
+                if resultado != "lease_perdido":
+                    self.liberar_lease(cpf_titular, "erro" if resultado == "erro" else "concluido")
+            
+            if resultado in ("sucesso", "ja_processado"):
+                sucessos += 1
+            elif resultado == "pulado":
+                pulados += 1
+            else:
+                erros += 1
+            
+            time.sleep(TEMPO_ENTRE_GRUPOS)
+        
+        print(f"🏁 Nenhum grupo disponível - {sucessos} sucessos, {pulados} pulados, {erros} erros")
+        self.contabilidade.imprimir_resumo()
+        return {'sucessos': sucessos, 'pulados': pulados, 'erros': erros}
+    
+    # ============================================================
+    # FILA DE TRABALHO (retentativas com backoff)
+    # ============================================================
+    
+    def inicializar_fila(self, grupos):
+        """
+        Sincroniza a fila persistente com os grupos da planilha.
+        
+        Grupos novos entram como 'pendente' e grupos 'em_andamento' de uma
+        execução interrompida voltam para 'pendente'. Itens concluídos e
+        falhas definitivas são mantidos; CPFs que saíram da planilha ficam
+        com índice -1 e não são mais processados.
+        """
+        conn = sqlite3.connect(BANCO_DADOS)
+        cursor = conn.cursor()
+        
+        cursor.execute('UPDATE fila_grupos SET indice_grupo = -1')
+        cursor.executemany('''
+            INSERT INTO fila_grupos (cpf_titular, indice_grupo) VALUES (?, ?)
+            ON CONFLICT(cpf_titular) DO UPDATE SET indice_grupo = excluded.indice_grupo
+        ''', [(grupo[0]['CPF'], i) for i, grupo in enumerate(grupos)])
+        cursor.execute("UPDATE fila_grupos SET status = 'pendente' WHERE status = 'em_andamento'")
+        
+        conn.commit()
+        conn.close()
+    
+    def indices_da_fila(self, grupos):
+        """
+        Gera os índices dos grupos na ordem da fila (FILA_ORDEM).
+        
+        Retentativas só saem da fila após o backoff; quando só restam
+        retentativas agendadas, aguarda a mais próxima. Termina quando não
+        há mais grupos pendentes.
+        
+        Yields:
+            int: Índice do próximo grupo (marcado como 'em_andamento')
+        """
+        ordem = ORDENS_FILA.get(FILA_ORDEM, ORDENS_FILA['novos_primeiro'])
+        
+        while True:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT cpf_titular, indice_grupo FROM fila_grupos
+                WHERE status = 'pendente' AND indice_grupo >= 0 AND proxima_tentativa <= ?
+                ORDER BY {ordem}
+                LIMIT 1
+            ''', (time.time(),))
+            proximo = cursor.fetchone()
+            
+            if proximo:
+                cursor.execute('''
+                    UPDATE fila_grupos SET status = 'em_andamento', timestamp = CURRENT_TIMESTAMP
+                    WHERE cpf_titular = ?
+                ''', (proximo[0],))
+            else:
+                cursor.execute('''
+                    SELECT MIN(proxima_tentativa) FROM fila_grupos
+                    WHERE status = 'pendente' AND indice_grupo >= 0
+                ''')
+                proxima_tentativa = cursor.fetchone()[0]
+            
+            conn.commit()
+            conn.close()
+            
+            if proximo:
+                yield proximo[1]
+                continue
             
+            if proxima_tentativa is None:
+                return
+            
+            espera = max(0, proxima_tentativa - time.time())
+            print(f"⏳ Só restam retentativas agendadas - aguardando {espera:.0f}s")
+            time.sleep(espera)
+    
+    def classificar_erro_grupo(self, cpf_titular):
+        """
+        Classifica o último erro do grupo como permanente ou transitório.
+        
+        Permanente quando a etapa está em FILA_ETAPAS_PERMANENTES ou as
+        observações contêm um dos FILA_TEXTOS_PERMANENTES (ex: CPF inválido);
+        qualquer outro erro (timeout, elemento stale, sem confirmação) é
+        considerado transitório.
+        
+        Returns:
+            tuple: ('permanente' ou 'transitorio', descrição do erro)
+        """
+        try:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            # 'grupo_erro' é genérico: a causa está no checkpoint anterior
+            cursor.execute('''
+                SELECT etapa_atual, observacoes FROM progresso_efd
+                WHERE cpf_titular = ? AND status = 'erro' AND etapa_atual != 'grupo_erro'
+                ORDER BY timestamp DESC, id DESC
+                LIMIT 1
+            ''', (cpf_titular,))
+            ultimo = cursor.fetchone()
+            conn.close()
         except Exception as e:
-            print(f"❌ Erro ao processar dataframe: {e}")
+            print(f"⚠️ Erro ao classificar erro do grupo: {e}")
+            ultimo = None
+        
+        if not ultimo:
+            return 'transitorio', 'grupo_erro'
+        
+        etapa, observacoes = ultimo[0], ultimo[1] or ''
+        descricao = f"{etapa}: {observacoes}"[:500]
+        
+        if etapa in FILA_ETAPAS_PERMANENTES or \
+           any(texto.lower() in observacoes.lower() for texto in FILA_TEXTOS_PERMANENTES):
+            return 'permanente', descricao
+        return 'transitorio', descricao
+    
+    def registrar_resultado_fila(self, cpf_titular, resultado):
+        """
+        Atualiza o item da fila com o resultado do grupo.
+        
+        Sucesso, pulado e já processado concluem o item. Erros permanentes
+        saem da fila como 'falha'; transitórios voltam para 'pendente' com
+        backoff exponencial (FILA_BACKOFF_BASE * 2^(tentativa-1), limitado a
+        FILA_BACKOFF_MAXIMO) até FILA_MAX_TENTATIVAS.
+        """
+        try:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            
+            if resultado in ("sucesso", "pulado", "ja_processado"):
+                cursor.execute('''
+                    UPDATE fila_grupos SET status = 'concluido', timestamp = CURRENT_TIMESTAMP
+                    WHERE cpf_titular = ?
+                ''', (cpf_titular,))
+                conn.commit()
+                conn.close()
+                return
+            
+            tipo_erro, descricao = self.classificar_erro_grupo(cpf_titular)
+            
+            cursor.execute('SELECT tentativas FROM fila_grupos WHERE cpf_titular = ?', (cpf_titular,))
+            linha = cursor.fetchone()
+            tentativas = (linha[0] if linha else 0) + 1
+            
+            if tipo_erro == 'permanente' or tentativas >= FILA_MAX_TENTATIVAS:
+                status = 'falha'
+                proxima_tentativa = 0
+                print(f"🚫 Grupo {cpf_titular} fora da fila ({tipo_erro}, tentativa {tentativas}): {descricao}")
+            else:
+                status = 'pendente'
+                espera = min(FILA_BACKOFF_BASE * 2 ** (tentativas - 1), FILA_BACKOFF_MAXIMO)
+                proxima_tentativa = time.time() + espera
+                print(f"🔁 Grupo {cpf_titular} volta para a fila em {espera:.0f}s "
+                      f"(tentativa {tentativas}/{FILA_MAX_TENTATIVAS})")
+            
+            cursor.execute('''
+                UPDATE fila_grupos SET status = ?, tentativas = ?, proxima_tentativa = ?,
+                    tipo_erro = ?, ultimo_erro = ?, timestamp = CURRENT_TIMESTAMP
+                WHERE cpf_titular = ?
+            ''', (status, tentativas, proxima_tentativa, tipo_erro, descricao, cpf_titular))
+            
+            conn.commit()
+            conn.close()
+        
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar fila de trabalho: {e}")
+    
+    def resumo_fila(self):
+        """Retorna a quantidade de itens da fila (grupos da planilha atual) por status"""
+        try:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            cursor.execute('SELECT status, COUNT(*) FROM fila_grupos WHERE indice_grupo >= 0 GROUP BY status')
+            totais = dict(cursor.fetchall())
+            conn.close()
+            return totais
+        except Exception as e:
+            print(f"⚠️ Erro ao ler fila de trabalho: {e}")
+            return {}
+    
+    def indice_grupos_por_cpf(self, grupos):
+        """Monta o índice CPF do titular (somente dígitos) -> posição do grupo na planilha"""
+        return {leitura_planilha.normalizar_cpf(grupo[0]['CPF']): i for i, grupo in enumerate(grupos)}
+    
+    def selecionar_grupos_com_erro(self, grupos):
+        """
+        Seleciona os grupos cujo último checkpoint é um erro reprocessável.
+        
+        Uma única consulta (índice idx_progresso_cpf_id) traz os titulares cujo
+        último registro tem status 'erro' em uma das ETAPAS_REPROCESSAVEIS; o
+        índice CPF -> grupo os leva de volta à planilha.
+        
+        Args:
+            grupos (list): Lista completa de grupos da planilha
+        
+        Returns:
+            list: Índices dos grupos a reprocessar, em ordem da planilha
+        """
+        try:
+            conn = sqlite3.connect(BANCO_DADOS)
+            cursor = conn.cursor()
+            marcadores = ', '.join('?' for _ in ETAPAS_REPROCESSAVEIS)
+            cursor.execute(f'''
+                SELECT p.cpf_titular, p.etapa_atual
+                FROM progresso_efd p
+                JOIN (SELECT MAX(id) AS id FROM progresso_efd GROUP BY cpf_titular) ultimo ON ultimo.id = p.id
+                WHERE p.status = 'erro' AND p.etapa_atual IN ({marcadores})
+            ''', list(ETAPAS_REPROCESSAVEIS))
+            com_erro = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"❌ Erro ao buscar grupos com erro: {e}")
             return []
+        
+        indice_por_cpf = self.indice_grupos_por_cpf(grupos)
+        indices = []
+        por_etapa = {}
+        fora_da_planilha = 0
+        
+        for cpf_titular, etapa in com_erro:
+            i = indice_por_cpf.get(leitura_planilha.normalizar_cpf(cpf_titular))
+            if i is None:
+                fora_da_planilha += 1
+                continue
+            indices.append(i)
+            por_etapa[etapa] = por_etapa.get(etapa, 0) + 1
+        
+        print(f"🔁 {len(indices)} grupos com erro para reprocessar")
+        for etapa, total in sorted(por_etapa.items()):
+            print(f"   {etapa:25} | {total:5}")
+        if fora_da_planilha:
+            print(f"⚠️ {fora_da_planilha} titulares com erro não estão na planilha atual")
+        
+        return sorted(indices)
     
     def salvar_checkpoint_indice(self, indice_grupo):
         """Salva o checkpoint do último grupo processado"""
@@ -1896,120 +3061,100 @@ class AutomacaoEFD:
             print(f"⚠️ Erro ao carregar checkpoint de índice: {e}")
             return -1
     
-    def processar_todos_os_grupos(self):
-        """Processa todos os grupos, pulando automaticamente em caso de erro"""
+    def processar_todos_os_grupos(self, grupos=None, indices=None):
+        """
+        Processa todos os grupos, pulando automaticamente em caso de erro.
+        
+        Args:
+            grupos (list): Grupos já carregados (padrão: lê o Excel do config)
+            indices (list): Índices específicos dos grupos a processar. Quando
+                informado, o checkpoint de índice não é lido nem alterado.
+        
+        Returns:
+            dict: Totais de 'sucessos', 'pulados' e 'erros' (None em caso de falha)
+        """
         try:
             print("\n" + "="*60)
             print("🤖 PROCESSANDO TODOS OS GRUPOS")
             print("="*60)
             
             # Carregar grupos
-            grupos = self.processar_dataframe_por_grupos()
+            if grupos is None:
+                grupos = self.processar_dataframe_por_grupos()
             if not grupos:
                 print("❌ Nenhum grupo encontrado")
                 return
             
             print(f"📊 Total de grupos: {len(grupos)}")
             
-            # Verificar checkpoint de índice
-            checkpoint_indice = self.carregar_checkpoint_indice()
-            inicio = 0
-            
-            if checkpoint_indice >= 0:
-                print(f"🔄 Checkpoint encontrado no grupo {checkpoint_indice + 1}")
-                print("💡 Continuando de onde parou...")
-                inicio = checkpoint_indice + 1
-            
-            # Verificar se já terminou
-            if inicio >= len(grupos):
-                print("✅ Todos os grupos já foram processados!")
-                return
-            
-            print(f"📊 Processando grupos {inicio + 1} até {len(grupos)}")
+            # Seleção explícita de grupos e a fila não mexem no checkpoint de índice
+            salvar_indice = indices is None and not self.usar_fila
+            
+            if indices is None and self.usar_fila:
+                # Fila persistente: grupos com erro transitório voltam com backoff
+                self.inicializar_fila(grupos)
+                self.fila_em_uso = True
+                print(f"📊 Processando pela fila de trabalho (ordem: {FILA_ORDEM})")
+                indices = self.indices_da_fila(grupos)
+            elif indices is None:
+                # Verificar checkpoint de índice
+                checkpoint_indice = self.carregar_checkpoint_indice()
+                inicio = 0
+                
+                if checkpoint_indice >= 0:
+                    print(f"🔄 Checkpoint encontrado no grupo {checkpoint_indice + 1}")
+                    print("💡 Continuando de onde parou...")
+                    inicio = checkpoint_indice + 1
+                
+                # Verificar se já terminou
+                if inicio >= len(grupos):
+                    print("✅ Todos os grupos já foram processados!")
+                    return {'sucessos': 0, 'pulados': 0, 'erros': 0}
+                
+                print(f"📊 Processando grupos {inicio + 1} até {len(grupos)}")
+                indices = range(inicio, len(grupos))
+            else:
+                print(f"📊 Processando {len(indices)} grupos selecionados")
             
             sucessos = 0
             erros = 0
             pulados = 0
             
-            for i in range(inicio, len(grupos)):
-                grupo = grupos[i]
-                print(f"\n{'='*60}")
-                print(f"🔄 Processando grupo {i+1}/{len(grupos)}")
-                
-                titular = grupo[0]  # Primeiro item é sempre o titular
-                dependentes = grupo[1:] if len(grupo) > 1 else []
-                
-                print(f"👤 Titular: {titular['NOME']} - CPF: {titular['CPF']}")
-                print(f"👥 Dependentes: {len(dependentes)}")
+            # Ritmo, taxas e previsão de término (linha de status + ANDAMENTO_ARQUIVO)
+            if self.fila_em_uso:
+                obter_restantes = lambda: self.resumo_fila().get('pendente', 0)
+                total = obter_restantes()
+            else:
+                obter_restantes = None
+                total = len(indices)
+            andamento = Andamento(total, obter_restantes, self.tempos, ANDAMENTO_ARQUIVO,
+                                  ANDAMENTO_INTERVALO, ANDAMENTO_JANELA)
+            self.contabilidade.reiniciar()
+            
+            if self.abas_pipeline:
+                # Duas abas: o próximo grupo é preenchido enquanto o atual é assinado
+                resultados = self.processar_indices_em_pipeline(grupos, indices, salvar_indice)
+            else:
+                resultados = (self.processar_grupo_indice(grupos, i, salvar_indice) for i in indices)
+            
+            for resultado in resultados:
+                andamento.registrar(resultado)
                 
-                # Verificar se grupo já foi completamente processado ANTES de tentar processar
-                cpf_titular = titular['CPF'] 
-                if self.verificar_grupo_completamente_processado(cpf_titular):
-                    print(f"✅ Grupo {cpf_titular} já foi completamente processado - pulando")
+                if resultado == "ja_processado":
                     sucessos += 1
                     continue
-                
-                # Verificar se grupo foi pulado (ex: CPF já lançado)
-                if self.verificar_ultimo_status_pulado(cpf_titular):
-                    print(f"⏭️ Grupo {cpf_titular} foi pulado anteriormente - pulando")
+                elif resultado == "sucesso":
                     sucessos += 1
-                    continue
-                
-                # Tentar processar este grupo
-                try:
-                    resultado = self.processar_grupo_individual(titular, dependentes)
-                    
-                    if resultado == "sucesso":
-                        sucessos += 1
-                        print(f"✅ Grupo {i+1} processado com sucesso!")
-                        # Salvar checkpoint após sucesso
-                        self.salvar_checkpoint_indice(i)
-                    elif resultado == "pulado":
-                        pulados += 1
-                        print(f"⏭️ Grupo {i+1} pulado (CPF já lançado)")
-                        # Salvar checkpoint mesmo quando pulado
-                        self.salvar_checkpoint_indice(i)
-                    else:
-                        erros += 1
-                        print(f"❌ Grupo {i+1} falhou")
-                        
-                        # Salvar checkpoint com status "erro" na tabela progresso_efd
-                        cpf_titular = titular['CPF']
-                        nome_titular = titular['NOME']
-                        self.salvar_checkpoint(
-                            cpf_titular,
-                            nome_titular,
-                            "grupo_erro",
-                            "erro",
-                            observacoes=f"Grupo falhou durante processamento"
-                        )
-                        
-                        # Salvar checkpoint do grupo atual para reprocessar
-                        self.salvar_checkpoint_indice(i)
-                        
-                except Exception as e:
-                    # Capturar erros não tratados (ex: erros do Chrome/Selenium)
+                elif resultado == "pulado":
+                    pulados += 1
+                else:
                     erros += 1
-                    print(f"❌ Erro não tratado ao processar grupo {i+1}: {e}")
-                    traceback.print_exc()
-                    
-                    # Salvar checkpoint com status "erro"
-                    cpf_titular = titular['CPF']
-                    nome_titular = titular['NOME']
-                    self.salvar_checkpoint(
-                        cpf_titular,
-                        nome_titular,
-                        "grupo_erro",
-                        "erro",
-                        observacoes=f"Erro não tratado durante processamento: {str(e)}"
-                    )
-                    
-                    # Salvar checkpoint do grupo atual para reprocessar
-                    self.salvar_checkpoint_indice(i)
                 
                 # Pequena pausa entre grupos
                 time.sleep(TEMPO_ENTRE_GRUPOS)
             
+            andamento.emitir(final=True)
+            
             # Resumo final
             print(f"\n{'='*60}")
             print("📊 RESUMO FINAL")
@@ -2018,10 +3163,277 @@ class AutomacaoEFD:
             print(f"✅ Sucessos: {sucessos}")
             print(f"⏭️ Pulados: {pulados}")
             print(f"❌ Erros: {erros}")
+            if BLOQUEIO_RECURSOS_ATIVO and BLOQUEIO_RECURSOS_RELATORIO:
+                print(f"🧹 Requisições bloqueadas: {self.economia_recursos['bloqueadas']} "
+                      f"(~{self.economia_recursos['bytes_economizados'] / 1048576:.1f} MB economizados)")
+            if self.fila_em_uso:
+                fila = self.resumo_fila()
+                print(f"🔁 Fila: {fila.get('concluido', 0)} concluídos, {fila.get('falha', 0)} falhas "
+                      f"definitivas, {fila.get('pendente', 0)} pendentes")
+            self.contabilidade.imprimir_resumo()
             print(f"{'='*60}")
             
+            return {'sucessos': sucessos, 'pulados': pulados, 'erros': erros}
+            
         except Exception as e:
             print(f"❌ Erro ao processar grupos: {e}")
+        finally:
+            self.fila_em_uso = False
+            self.tempos.gravar()
+            self.contabilidade.gravar()
+    
+    def processar_grupo_indice(self, grupos, i, salvar_indice=True):
+        """
+        Processa o grupo de índice i, registrando checkpoints e tratando erros.
+        
+        Args:
+            grupos (list): Lista completa de grupos da planilha
+            i (int): Índice do grupo a processar
+            salvar_indice (bool): Se deve atualizar o checkpoint de índice
+        
+        Returns:
+            str: 'sucesso', 'pulado', 'erro', 'ja_processado' (grupo concluído
+                ou pulado em execução anterior) ou 'lease_perdido' (modo lease)
+        """
+        grupo = self._iniciar_grupo_indice(grupos, i)
+        if grupo is None:
+            return "ja_processado"
+        titular, dependentes = grupo
+        
+        # Tentar processar este grupo
+        try:
+            resultado = self.processar_grupo_individual(titular, dependentes)
+        except Exception as e:
+            # Capturar erros não tratados (ex: erros do Chrome/Selenium)
+            return self._registrar_resultado_grupo(grupos, i, "erro", salvar_indice, erro=e)
+        
+        return self._registrar_resultado_grupo(grupos, i, resultado, salvar_indice)
+    
+    def _iniciar_grupo_indice(self, grupos, i):
+        """
+        Exibe o cabeçalho do grupo i e verifica se ele já foi finalizado.
+        
+        Returns:
+            tuple: (titular, dependentes), ou None se o grupo já foi concluído
+                ou pulado em execução anterior
+        """
+        grupo = grupos[i]
+        print(f"\n{'='*60}")
+        print(f"🔄 Processando grupo {i+1}/{len(grupos)}")
+        
+        titular = grupo[0]  # Primeiro item é sempre o titular
+        dependentes = grupo[1:] if len(grupo) > 1 else []
+        
+        print(f"👤 Titular: {titular['NOME']} - CPF: {titular['CPF']}")
+        print(f"👥 Dependentes: {len(dependentes)}")
+        
+        # Verificar se grupo já foi completamente processado ANTES de tentar processar
+        cpf_titular = titular['CPF'] 
+        if self.verificar_grupo_completamente_processado(cpf_titular):
+            print(f"✅ Grupo {cpf_titular} já foi completamente processado - pulando")
+            if self.fila_em_uso:
+                self.registrar_resultado_fila(cpf_titular, "ja_processado")
+            return None
+        
+        # Verificar se grupo foi pulado (ex: CPF já lançado)
+        if self.verificar_ultimo_status_pulado(cpf_titular):
+            print(f"⏭️ Grupo {cpf_titular} foi pulado anteriormente - pulando")
+            if self.fila_em_uso:
+                self.registrar_resultado_fila(cpf_titular, "ja_processado")
+            return None
+        
+        return titular, dependentes
+    
+    def _registrar_resultado_grupo(self, grupos, i, resultado, salvar_indice=True, erro=None):
+        """
+        Registra o resultado final do grupo i (mensagens, checkpoints e recursos).
+        
+        Args:
+            grupos (list): Lista completa de grupos da planilha
+            i (int): Índice do grupo
+            resultado (str): Resultado retornado pelo processamento
+            salvar_indice (bool): Se deve atualizar o checkpoint de índice
+            erro (Exception): Erro não tratado que interrompeu o grupo (opcional)
+        
+        Returns:
+            str: 'sucesso', 'pulado', 'erro' ou 'lease_perdido'
+        """
+        titular = grupos[i][0]
+        
+        if erro is None and resultado == "sucesso":
+            print(f"✅ Grupo {i+1} processado com sucesso!")
+        elif erro is None and resultado == "pulado":
+            print(f"⏭️ Grupo {i+1} pulado (CPF já lançado)")
+        elif erro is None and resultado == "lease_perdido":
+            # O grupo agora é de outro worker: nenhum checkpoint de erro por cima do dele
+            print(f"⏭️ Grupo {i+1} abandonado (lease assumido por outro worker)")
+        else:
+            resultado = "erro"
+            if erro is None:
+                print(f"❌ Grupo {i+1} falhou")
+                observacoes = "Grupo falhou durante processamento"
+            else:
+                print(f"❌ Erro não tratado ao processar grupo {i+1}: {erro}")
+                traceback.print_exception(type(erro), erro, erro.__traceback__)
+                observacoes = f"Erro não tratado durante processamento: {str(erro)}"
+            
+            # Salvar checkpoint com status "erro" na tabela progresso_efd
+            self.salvar_checkpoint(
+                titular['CPF'],
+                titular['NOME'],
+                "grupo_erro",
+                "erro",
+                observacoes=observacoes
+            )
+        
+        # Salvar checkpoint de índice (também quando pulado ou com erro)
+        if salvar_indice:
+            self.salvar_checkpoint_indice(i)
+        
+        # Concluir o item da fila ou reagendá-lo com backoff
+        if self.fila_em_uso:
+            self.registrar_resultado_fila(titular['CPF'], resultado)
+        
+        # Requisições bloqueadas e bytes baixados neste grupo
+        self.medir_recursos_grupo()
+        
+        # Tempo desde o grupo anterior por categoria (pausas, WebDriver, banco...)
+        self.contabilidade.fechar_grupo(titular['CPF'], resultado)
+        
+        return resultado
+    
+    # ============================================================
+    # MODO PIPELINE (DUAS ABAS)
+    # ============================================================
+    
+    def abrir_aba_pipeline(self):
+        """
+        Abre a segunda aba do modo pipeline na mesma sessão autenticada e
+        aguarda o usuário navegar até o formulário nela.
+        
+        Returns:
+            bool: True se as duas abas estão prontas
+        """
+        print("\n" + "="*60)
+        print("🗂️ MODO PIPELINE: SEGUNDA ABA")
+        print("="*60)
+        
+        try:
+            aba_principal = self.driver.current_window_handle
+            self.driver.switch_to.new_window('tab')
+            
+            # Stealth e bloqueio de recursos do CDP valem por aba
+            if self._stealth_necessario():
+                self._aplicar_stealth()
+            self.aplicar_politica_recursos()
+            
+            self.abrir_site()
+            print("📋 Uma NOVA ABA foi aberta - navegue nela até o formulário também")
+            self.aguardar_login()
+            
+            self.abas_pipeline = [aba_principal, self.driver.current_window_handle]
+            self.driver.switch_to.window(aba_principal)
+            print("✅ Duas abas prontas - o próximo titular será preenchido durante a assinatura")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao abrir a segunda aba: {e}")
+            print("💡 Continuando com uma aba só")
+            self.abas_pipeline = None
+            return False
+    
+    def _ativar_aba(self, handle):
+        """Torna a aba ativa e entra no iframe do formulário (se houver)"""
+        self.driver.switch_to.window(handle)
+        if self.driver.find_elements(By.TAG_NAME, "iframe"):
+            self.driver.switch_to.frame(0)
+    
+    def processar_indices_em_pipeline(self, grupos, indices, salvar_indice=True):
+        """
+        Processa os grupos alternando duas abas da mesma sessão.
+        
+        Enquanto a aba ativa envia, assina e aguarda a confirmação do grupo N,
+        a outra aba preenche dados iniciais, dependentes, planos e informações
+        do grupo N+1. Após a confirmação as abas trocam de papel, de forma que
+        o tempo do assinador e da confirmação fica escondido atrás do
+        preenchimento. As teclas do assinador são enviadas antes de trocar de
+        aba, para que o foco não mude durante a assinatura.
+        
+        Args:
+            grupos (list): Lista completa de grupos da planilha
+            indices (iterable): Índices dos grupos a processar, em ordem
+            salvar_indice (bool): Se deve atualizar o checkpoint de índice
+        
+        Yields:
+            str: Resultado de cada grupo ('sucesso', 'pulado', 'erro' ou
+                'ja_processado'), na ordem em que são concluídos
+        """
+        pendentes = iter(indices)
+        abas = self.abas_pipeline
+        ativa = 0
+        
+        atual = yield from self._preparar_proximo_em_aba(grupos, pendentes, abas[ativa], salvar_indice)
+        
+        while atual is not None:
+            titular = grupos[atual][0]
+            erro = None
+            resultado = "erro"
+            
+            # Enviar e assinar o grupo atual
+            self._ativar_aba(abas[ativa])
+            try:
+                with self.faixa_assinatura():
+                    declaracao_enviada, assinatura_sucesso = self.enviar_e_assinar()
+            except Exception as e:
+                erro = e
+            
+            # Enquanto o portal confirma, a outra aba prepara o próximo grupo
+            proximo = yield from self._preparar_proximo_em_aba(grupos, pendentes, abas[1 - ativa], salvar_indice)
+            
+            if erro is None:
+                self._ativar_aba(abas[ativa])
+                try:
+                    resultado = self.concluir_grupo(titular, declaracao_enviada, assinatura_sucesso)
+                except Exception as e:
+                    resultado = self._erro_processamento_grupo(titular, e)
+            else:
+                resultado = self._erro_processamento_grupo(titular, erro)
+            
+            yield self._registrar_resultado_grupo(grupos, atual, resultado, salvar_indice)
+            
+            # Trocar o papel das abas
+            atual = proximo
+            ativa = 1 - ativa
+    
+    def _preparar_proximo_em_aba(self, grupos, pendentes, aba, salvar_indice):
+        """
+        Prepara na aba informada o próximo grupo pendente que precise de envio.
+        
+        Grupos já finalizados, pulados ou com erro no preenchimento são
+        registrados (e seus resultados emitidos) até encontrar um grupo pronto.
+        
+        Returns:
+            int: Índice do grupo pronto para envio, ou None se acabaram os grupos
+        """
+        for i in pendentes:
+            grupo = self._iniciar_grupo_indice(grupos, i)
+            if grupo is None:
+                yield "ja_processado"
+                continue
+            titular, dependentes = grupo
+            
+            self._ativar_aba(aba)
+            try:
+                preparo = self.preparar_grupo(titular, dependentes)
+            except Exception as e:
+                preparo = self._erro_processamento_grupo(titular, e)
+            
+            if preparo == "pronto":
+                return i
+            
+            yield self._registrar_resultado_grupo(grupos, i, preparo, salvar_indice)
+        
+        return None
     
     def processar_grupo_individual(self, titular, dependentes):
         """
@@ -2036,12 +3448,18 @@ class AutomacaoEFD:
         6. Navegação para próximo CPF
         7. Salvamento de checkpoints em cada etapa
         
+        As etapas são executadas por preparar_grupo, enviar_e_assinar e
+        concluir_grupo, que o modo pipeline chama separadamente em duas abas.
+        No modo lease, o envio só acontece se o lease ainda for deste worker
+        (senão retorna 'lease_perdido' sem enviar).
+        A duração de cada etapa (e do grupo) vai para a tabela tempos_etapas.
+        
         Args:
             titular (pandas.Series): Dados do titular (primeira linha do grupo)
             dependentes (pandas.DataFrame): DataFrame com todos os dependentes do grupo
         
         Returns:
-            bool: True se grupo foi processado com sucesso, False em caso de erro
+            str: 'sucesso', 'pulado' ou 'erro'
         
         O método implementa verificação manual opcional e tratamento robusto de erros,
         salvando checkpoints detalhados para permitir retomada em caso de falha.
@@ -2054,202 +3472,302 @@ class AutomacaoEFD:
         - erro_*: Em caso de falhas específicas
         """
         try:
-            cpf_titular = titular['CPF']
-            nome_titular = titular['NOME']
-            
-            # Verificar se o valor do titular é zero ou nulo - se for, pular o grupo inteiro
-            valor_titular_raw = titular.get('VALOR_PLANO') or titular.get('TOTAL')
-            
-            # Se não houver valor, considerar como nulo (pular grupo)
-            if valor_titular_raw is None or self.valor_eh_zero_ou_nulo(valor_titular_raw):
-                print(f"\n{'='*60}")
-                print(f"⏭️ GRUPO PULADO - VALOR DO TITULAR É ZERO OU NULO")
-                print(f"{'='*60}")
-                print(f"👤 Titular: {nome_titular} - CPF: {cpf_titular}")
-                print(f"💰 Valor do plano: {valor_titular_raw if valor_titular_raw is not None else 'N/A'}")
-                print(f"ℹ️ Grupo inteiro será pulado (titular não assina mais o plano ou valor não informado)")
+            with self.tempos.etapa('grupo') as span:
+                preparo = self.preparar_grupo(titular, dependentes)
+                if preparo != "pronto":
+                    span['status'] = preparo
+                    return preparo
                 
-                # Salvar checkpoint com status "pulado"
-                self.salvar_checkpoint(
-                    cpf_titular,
-                    nome_titular,
-                    "grupo_pulado",
-                    "pulado",
-                    observacoes=f"Grupo pulado - valor do titular é zero ou nulo (não assina mais o plano)"
-                )
+                # Modo lease: sem o lease, outro worker pode estar enviando este grupo
+                if not self.confirmar_lease_atual():
+                    print(f"⚠️ Lease do grupo {titular['CPF']} perdido - envio cancelado")
+                    span['status'] = "lease_perdido"
+                    return "lease_perdido"
                 
-                return "pulado"
-            
-            # Se há dados parciais (grupo incompleto), limpar tudo
-            print(f"🔍 Verificando dados parciais para {cpf_titular}...")
-            
-            # Verificar se há dependentes ou planos salvos (dados parciais)
-            conn = sqlite3.connect(BANCO_DADOS)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM dependentes_processados WHERE cpf_titular = ?', (cpf_titular,))
-            dependentes_parciais = cursor.fetchone()[0]
+                # ETAPA FINAL: Enviar declaração e assinar (faixa exclusiva no modo pool)
+                with self.faixa_assinatura():
+                    declaracao_enviada, assinatura_sucesso = self.enviar_e_assinar()
+                
+                span['status'] = self.concluir_grupo(titular, declaracao_enviada, assinatura_sucesso)
+                return span['status']
             
-            cursor.execute('SELECT COUNT(*) FROM planos_processados WHERE cpf_titular = ?', (cpf_titular,))
-            planos_parciais = cursor.fetchone()[0]
+        except Exception as e:
+            return self._erro_processamento_grupo(titular, e)
+    
+    def _erro_processamento_grupo(self, titular, erro):
+        """Registra um erro inesperado durante o processamento do grupo"""
+        cpf_titular = titular['CPF']
+        nome_titular = titular['NOME']
+        
+        print(f"❌ Erro ao processar grupo individual: {erro}")
+        traceback.print_exception(type(erro), erro, erro.__traceback__)
+        
+        # Salvar checkpoint com status "erro"
+        self.salvar_checkpoint(
+            cpf_titular,
+            nome_titular,
+            "erro_processamento",
+            "erro",
+            observacoes=f"Erro durante processamento: {str(erro)}"
+        )
+        
+        self.limpar_dados_parciais_grupo(cpf_titular)
+        return "erro"
+    
+    def preparar_grupo(self, titular, dependentes):
+        """
+        Preenche o formulário do grupo até o ponto de envio.
+        
+        Inclui a verificação de valores inválidos ou zerados, limpeza de dados
+        parciais, dados iniciais, dependentes, planos, informações dos
+        dependentes e a pausa opcional para verificação manual.
+        
+        Returns:
+            str: 'pronto' (pronto para envio), 'pulado' ou 'erro'
+        """
+        cpf_titular = titular['CPF']
+        nome_titular = titular['NOME']
+        
+        # Valor preenchido que não é número: erro de planilha, não valor nulo
+        invalidos = leitura_planilha.valores_invalidos(titular, 'VALOR_PLANO', 'TOTAL')
+        for dependente in dependentes:
+            invalidos += leitura_planilha.valores_invalidos(dependente, 'VALOR_DEPENDENTE', 'TOTAL')
+        if invalidos:
+            descricao = ', '.join(f"{coluna} = {valor!r}" for coluna, valor in invalidos)
+            print(f"❌ Valor inválido na planilha para {cpf_titular}: {descricao}")
+            self.salvar_checkpoint(
+                cpf_titular,
+                nome_titular,
+                "erro_valor_invalido",
+                "erro",
+                observacoes=f"Valor não numérico na planilha: {descricao}"
+            )
+            return "erro"
+        
+        # Verificar se o valor do titular é zero ou nulo - se for, pular o grupo inteiro
+        valor_titular_raw = leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL')
+        
+        # Se não houver valor, considerar como nulo (pular grupo)
+        if valor_titular_raw is None or self.valor_eh_zero_ou_nulo(valor_titular_raw):
+            print(f"\n{'='*60}")
+            print(f"⏭️ GRUPO PULADO - VALOR DO TITULAR É ZERO OU NULO")
+            print(f"{'='*60}")
+            print(f"👤 Titular: {nome_titular} - CPF: {cpf_titular}")
+            print(f"💰 Valor do plano: {valor_titular_raw if valor_titular_raw is not None else 'N/A'}")
+            print(f"ℹ️ Grupo inteiro será pulado (titular não assina mais o plano ou valor não informado)")
             
-            conn.close()
+            # Salvar checkpoint com status "pulado"
+            self.salvar_checkpoint(
+                cpf_titular,
+                nome_titular,
+                "grupo_pulado",
+                "pulado",
+                observacoes=f"Grupo pulado - valor do titular é zero ou nulo (não assina mais o plano)"
+            )
             
-            if dependentes_parciais > 0 or planos_parciais > 0:
-                print(f"🧹 Encontrados dados parciais para {cpf_titular} - limpando para recomeçar...")
-                self.limpar_dados_parciais_grupo(cpf_titular)
+            return "pulado"
+        
+        # Se há dados parciais (grupo incompleto), limpar tudo
+        print(f"🔍 Verificando dados parciais para {cpf_titular}...")
+        
+        # Verificar se há dependentes ou planos salvos (dados parciais)
+        conn = sqlite3.connect(BANCO_DADOS)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COUNT(*) FROM dependentes_processados WHERE cpf_titular = ?', (cpf_titular,))
+        dependentes_parciais = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(*) FROM planos_processados WHERE cpf_titular = ?', (cpf_titular,))
+        planos_parciais = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        if dependentes_parciais > 0 or planos_parciais > 0:
+            print(f"🧹 Encontrados dados parciais para {cpf_titular} - limpando para recomeçar...")
+            self.limpar_dados_parciais_grupo(cpf_titular)
+        
+        # Preencher dados iniciais
+        if not self.preencher_dados_iniciais(cpf_titular, nome_titular):
+            print(f"❌ Falha no preenchimento inicial para {cpf_titular}")
+            self.limpar_dados_parciais_grupo(cpf_titular)
+            return "erro"
+        
+        # Continuar para próxima etapa
+        if not self.continuar_para_proxima_etapa():
+            print(f"❌ Falha ao continuar para próxima etapa para {cpf_titular}")
             
-            # Preencher dados iniciais
-            if not self.preencher_dados_iniciais(cpf_titular, nome_titular):
-                print(f"❌ Falha no preenchimento inicial para {cpf_titular}")
+            # Verificar se foi erro de "CPF já lançado" (status pulado)
+            if self.verificar_ultimo_status_pulado(cpf_titular):
+                print(f"⏭️ CPF {cpf_titular} foi pulado (já lançado) - mantendo dados salvos")
+                return "pulado"
+            else:
+                # Erro real - limpar dados parciais
                 self.limpar_dados_parciais_grupo(cpf_titular)
                 return "erro"
+        
+        # Processar dependentes
+        self.processar_dependentes_grupo(dependentes)
+        
+        # Processar planos de saúde
+        self.processar_planos_grupo(titular)
+        
+        # Processar informações dos dependentes (valores pagos pelos dependentes)
+        self.processar_info_dependentes_grupo(dependentes)
+        
+        # VERIFICAÇÃO CONDICIONAL DOS DADOS
+        with self.tempos.etapa('pausa_verificacao'):
+            self._pausa_verificacao()
+        
+        return "pronto"
+    
+    def _pausa_verificacao(self):
+        """Pausa para verificação manual dos dados (ou espera fixa no modo automático)"""
+        if self.verificar_dados_manual:
+            # PAUSA PARA ANÁLISE - Verificar se tudo está correto
+            print(f"\n{'='*60}")
+            print("⏸️ PAUSA PARA ANÁLISE")
+            print(f"{'='*60}")
+            print("📋 Verifique se todos os dados foram preenchidos corretamente:")
+            print("   ✅ Dados iniciais (Período, CNPJ, CPF)")
+            print("   ✅ Dependentes (se houver)")
+            print("   ✅ Planos de saúde (se houver)")
+            print("   ✅ Informações dos dependentes (se houver)")
+            print("\n💡 Após verificar, pressione ENTER para continuar...")
+            print("   (Ou Ctrl+C para interromper)")
             
-            # Continuar para próxima etapa
-            if not self.continuar_para_proxima_etapa():
-                print(f"❌ Falha ao continuar para próxima etapa para {cpf_titular}")
-                
-                # Verificar se foi erro de "CPF já lançado" (status pulado)
-                if self.verificar_ultimo_status_pulado(cpf_titular):
-                    print(f"⏭️ CPF {cpf_titular} foi pulado (já lançado) - mantendo dados salvos")
-                    return "pulado"
-                else:
-                    # Erro real - limpar dados parciais
-                    self.limpar_dados_parciais_grupo(cpf_titular)
-                    return "erro"
-            
-            # Processar dependentes
-            self.processar_dependentes_grupo(dependentes)
-            
-            # Processar planos de saúde
-            self.processar_planos_grupo(titular)
-            
-            # Processar informações dos dependentes (valores pagos pelos dependentes)
-            self.processar_info_dependentes_grupo(dependentes)
-            
-            # VERIFICAÇÃO CONDICIONAL DOS DADOS
-            if self.verificar_dados_manual:
-                # PAUSA PARA ANÁLISE - Verificar se tudo está correto
-                print(f"\n{'='*60}")
-                print("⏸️ PAUSA PARA ANÁLISE")
-                print(f"{'='*60}")
-                print("📋 Verifique se todos os dados foram preenchidos corretamente:")
-                print("   ✅ Dados iniciais (Período, CNPJ, CPF)")
-                print("   ✅ Dependentes (se houver)")
-                print("   ✅ Planos de saúde (se houver)")
-                print("   ✅ Informações dos dependentes (se houver)")
-                print("\n💡 Após verificar, pressione ENTER para continuar...")
-                print("   (Ou Ctrl+C para interromper)")
-                
-                try:
-                    input("\n⏸️ Pressione ENTER para continuar ou Ctrl+C para interromper...")
-                except (EOFError, KeyboardInterrupt):
-                    print(f"\n⚠️ Executando via script - aguardando {TEMPO_SCRIPT_VERIFICACAO}s...")
-                    time.sleep(TEMPO_SCRIPT_VERIFICACAO)
-            else:
-                # Modo automático - sem verificação manual
-                time.sleep(TEMPO_MODO_AUTOMATICO)
+            try:
+                input("\n⏸️ Pressione ENTER para continuar ou Ctrl+C para interromper...")
+            except (EOFError, KeyboardInterrupt):
+                print(f"\n⚠️ Executando via script - aguardando {TEMPO_SCRIPT_VERIFICACAO}s...")
+                time.sleep(TEMPO_SCRIPT_VERIFICACAO)
+        else:
+            # Modo automático - sem verificação manual
+            time.sleep(TEMPO_MODO_AUTOMATICO)
+    
+    def enviar_e_assinar(self):
+        """
+        Envia a declaração preenchida e executa a assinatura eletrônica.
+        
+        Returns:
+            tuple: (declaracao_enviada, assinatura_sucesso)
+        """
+        declaracao_enviada = self.enviar_declaracao()
+        
+        # Executar assinatura eletrônica automática
+        assinatura_sucesso = declaracao_enviada and self.realizar_assinatura_automatica(self.metodo_assinatura)
+        
+        return declaracao_enviada, assinatura_sucesso
+    
+    def concluir_grupo(self, titular, declaracao_enviada, assinatura_sucesso):
+        """
+        Aguarda a confirmação do envio, salva o checkpoint final e avança para
+        o próximo CPF na aba atual.
+        
+        Args:
+            titular (pandas.Series): Dados do titular do grupo enviado
+            declaracao_enviada (bool): Resultado de enviar_declaracao
+            assinatura_sucesso (bool): Resultado da assinatura automática
+        
+        Returns:
+            str: 'sucesso' ou 'erro'
+        """
+        cpf_titular = titular['CPF']
+        nome_titular = titular['NOME']
+        
+        if declaracao_enviada:
             
-            # ETAPA FINAL: Enviar declaração
-            if self.enviar_declaracao():
-                
-                # Executar assinatura eletrônica automática
-                assinatura_sucesso = self.realizar_assinatura_automatica(self.metodo_assinatura)
-                
-                if assinatura_sucesso:
-                    # Aguardar um pouco antes de verificar a confirmação
-                    time.sleep(3)
+            if assinatura_sucesso:
+                # Aguardar automaticamente pelo alerta de sucesso (ou de falha)
+                if self.aguardar_alerta_sucesso_assinatura():
+                    print("✅ Processo concluído com confirmação de sucesso!")
                     
-                    # Aguardar automaticamente pelo alerta de sucesso
-                    if self.aguardar_alerta_sucesso_assinatura():
-                        print("✅ Processo concluído com confirmação de sucesso!")
-                        
-                        # GRUPO COMPLETO COM SUCESSO! Salvar checkpoint final
-                        self.salvar_checkpoint(
-                            cpf_titular,
-                            nome_titular,
-                            "grupo_completo",
-                            "sucesso",
-                            observacoes="Grupo processado completamente - confirmação de sucesso detectada"
-                        )
-                        
-                        # Próximo passo: clicar no botão próximo CPF
-                        
-                        if self.clicar_proximo_cpf():
-                            return "sucesso"
-                        else:
-                            print("❌ Erro ao clicar no botão próximo CPF")
-                            
-                            # Salvar checkpoint com erro no próximo CPF
-                            self.salvar_checkpoint(
-                                cpf_titular,
-                                nome_titular,
-                                "erro_proximo_cpf",
-                                "erro",
-                                observacoes="Erro ao clicar no botão próximo CPF - verificar manualmente"
-                            )
-                            
-                            self.limpar_dados_parciais_grupo(cpf_titular)
-                            return "erro"
-                        
+                    # GRUPO COMPLETO COM SUCESSO! Salvar checkpoint final
+                    self.salvar_checkpoint(
+                        cpf_titular,
+                        nome_titular,
+                        "grupo_completo",
+                        "sucesso",
+                        observacoes="Grupo processado completamente - confirmação de sucesso detectada"
+                    )
+                    
+                    # Comprovante do envio para conferência local
+                    self.salvar_recibo(cpf_titular, nome_titular, self.resultado_envio)
+                    
+                    # Próximo passo: clicar no botão próximo CPF
+                    
+                    if self.clicar_proximo_cpf():
+                        return "sucesso"
                     else:
-                        print("❌ Confirmação de sucesso NÃO detectada!")
-                        print("⚠️ Grupo NÃO será marcado como sucesso")
-                        time.sleep(TEMPO_CONFIRMACAO_NAO_DETECTADA)
+                        print("❌ Erro ao clicar no botão próximo CPF")
                         
-                        # Marcar como ERRO porque não houve confirmação
+                        # Salvar checkpoint com erro no próximo CPF
                         self.salvar_checkpoint(
                             cpf_titular,
                             nome_titular,
-                            "erro_sem_confirmacao",
+                            "erro_proximo_cpf",
                             "erro",
-                            observacoes="Confirmação de sucesso não detectada após assinatura - necessário verificação manual"
+                            observacoes="Erro ao clicar no botão próximo CPF - verificar manualmente"
                         )
                         
                         self.limpar_dados_parciais_grupo(cpf_titular)
                         return "erro"
-                        
+                    
                 else:
-                    print("❌ Erro na assinatura")
-                    time.sleep(TEMPO_ERRO_ASSINATURA)
+                    print("❌ Confirmação de sucesso NÃO detectada!")
+                    print("⚠️ Grupo NÃO será marcado como sucesso")
                     
-                    # Marcar como erro na assinatura
+                    tipo_resultado = self.resultado_envio['tipo']
+                    if tipo_resultado == 'erro':
+                        # Erro informado pelo portal
+                        etapa_erro = "erro_alerta_portal"
+                        observacoes = f"Portal recusou o envio: {self.resultado_envio['texto']}"
+                    elif tipo_resultado == 'cancelado':
+                        # Assinatura cancelada/recusada no assinador
+                        etapa_erro = "erro_assinatura"
+                        observacoes = f"Assinatura cancelada: {self.resultado_envio['texto']}"
+                    else:
+                        # Nada detectado até o timeout
+                        time.sleep(TEMPO_CONFIRMACAO_NAO_DETECTADA)
+                        etapa_erro = "erro_sem_confirmacao"
+                        observacoes = "Confirmação de sucesso não detectada após assinatura - necessário verificação manual"
+                    
+                    # Marcar como ERRO porque não houve confirmação
                     self.salvar_checkpoint(
                         cpf_titular,
                         nome_titular,
-                        "erro_assinatura",
+                        etapa_erro,
                         "erro",
-                        observacoes="Erro ao executar assinatura eletrônica - verificar manualmente"
+                        observacoes=observacoes
                     )
                     
                     self.limpar_dados_parciais_grupo(cpf_titular)
                     return "erro"
+                    
             else:
-                print("❌ Falha ao enviar declaração")
+                print("❌ Erro na assinatura")
+                time.sleep(TEMPO_ERRO_ASSINATURA)
                 
-                # Salvar checkpoint com erro no envio
+                # Marcar como erro na assinatura
                 self.salvar_checkpoint(
                     cpf_titular,
                     nome_titular,
-                    "erro_envio",
+                    "erro_assinatura",
                     "erro",
-                    observacoes="Erro ao enviar declaração - verificar manualmente"
+                    observacoes="Erro ao executar assinatura eletrônica - verificar manualmente"
                 )
                 
                 self.limpar_dados_parciais_grupo(cpf_titular)
                 return "erro"
+        else:
+            print("❌ Falha ao enviar declaração")
             
-        except Exception as e:
-            print(f"❌ Erro ao processar grupo individual: {e}")
-            traceback.print_exc()
-            
-            # Salvar checkpoint com status "erro"
+            # Salvar checkpoint com erro no envio
             self.salvar_checkpoint(
                 cpf_titular,
                 nome_titular,
-                "erro_processamento",
+                "erro_envio",
                 "erro",
-                observacoes=f"Erro durante processamento: {str(e)}"
+                observacoes="Erro ao enviar declaração - verificar manualmente"
             )
             
             self.limpar_dados_parciais_grupo(cpf_titular)
@@ -2270,7 +3788,7 @@ class AutomacaoEFD:
                 cpf_dep = dependente['CPF']
                 
                 # Verificar se o valor do dependente é nulo ANTES de adicionar à lista
-                valor_dependente_raw = dependente.get('VALOR_DEPENDENTE') or dependente.get('TOTAL')
+                valor_dependente_raw = leitura_planilha.primeiro_valor(dependente, 'VALOR_DEPENDENTE', 'TOTAL')
                 if valor_dependente_raw is None or self.valor_eh_zero_ou_nulo(valor_dependente_raw):
                     print(f"   ⏭️ Dependente {cpf_dep} tem valor zero ou nulo - não será adicionado (não assina mais o plano)")
                     dependentes_pulados += 1
@@ -2314,7 +3832,7 @@ class AutomacaoEFD:
         try:
             # Dados do plano - usando dados do Excel
             cnpj_operadora = titular.get('CNPJ_OPERADORA', CNPJ_OPERADORA_PADRAO)  # CNPJ padrão
-            valor_titular_raw = titular.get('VALOR_PLANO', titular.get('TOTAL', "100.00"))  # Valor do Excel
+            valor_titular_raw = leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL')  # Valor do Excel
             valor_titular = self.formatar_valor(valor_titular_raw)  # Formatar com 2 casas decimais
             
             print(f"\n🏥 Processando plano de saúde...")
@@ -2349,7 +3867,7 @@ class AutomacaoEFD:
             
             for dependente in dependentes:
                 cpf_dep = dependente['CPF']
-                valor_dependente_raw = dependente.get('VALOR_DEPENDENTE', dependente.get('TOTAL', "50.00"))
+                valor_dependente_raw = leitura_planilha.primeiro_valor(dependente, 'VALOR_DEPENDENTE', 'TOTAL')
                 
                 # Verificar se o valor é zero ou nulo ANTES de processar
                 if self.valor_eh_zero_ou_nulo(valor_dependente_raw):
@@ -2458,6 +3976,115 @@ class AutomacaoEFD:
         print("   5. ✨ NOVO: Envia automaticamente cada declaração")
         print("="*60)
         
+        if not self.preparar_sessao():
+            return
+        
+        # Titulares com evento ativo no portal viram 'pulado' antes do loop
+        if self.pre_verificar_eventos:
+            self.verificar_eventos_ativos_portal(self.processar_dataframe_por_grupos())
+        
+        # Processar todos os grupos
+        if self.reprocessar_erros:
+            grupos = self.processar_dataframe_por_grupos()
+            indices = self.selecionar_grupos_com_erro(grupos)
+            if indices:
+                self.processar_todos_os_grupos(grupos, indices)
+            else:
+                print("✅ Nenhum grupo com erro para reprocessar")
+        elif self.usar_lease:
+            self.processar_grupos_com_lease(self.processar_dataframe_por_grupos())
+        else:
+            self.processar_todos_os_grupos()
+        
+        print("\n✅ Processo concluído!")
+        print("💡 Use o gerenciador de checkpoint para ver detalhes: python gerenciar_checkpoint.py")
+        print("🚀 Sistema totalmente funcional com automação completa!")
+    
+    def verificar_eventos_ativos_portal(self, grupos):
+        """
+        Pré-verificação: lê a consulta de eventos R-4010 do período no portal,
+        página por página, e registra como 'pulado' os titulares que já possuem
+        evento ativo. O loop principal então não abre o formulário para eles.
+        
+        Args:
+            grupos (list): Grupos da planilha (usados para mapear os CPFs)
+        
+        Returns:
+            int: Quantidade de titulares importados como 'pulado'
+        """
+        print("\n" + "="*60)
+        print("🔎 PRÉ-VERIFICAÇÃO DE EVENTOS R-4010 ATIVOS")
+        print("="*60)
+        print(f"📋 Abra a CONSULTA de eventos R-4010 do período {self.periodo_apuracao}")
+        print("   e pesquise até a lista de eventos aparecer.")
+        
+        try:
+            resposta = input("\n✅ Pressione ENTER quando a lista estiver na tela (ou P para pular)... ")
+        except (EOFError, KeyboardInterrupt):
+            print("\n⚠️ Executando via script - pré-verificação ignorada")
+            return 0
+        if resposta.strip().upper() == 'P':
+            print("⏭️ Pré-verificação pulada")
+            return 0
+        
+        cpfs, paginas = ler_paginas_consulta(self._html_consulta_eventos, self._avancar_pagina_consulta,
+                                             CONSULTA_EVENTOS_MAX_PAGINAS)
+        
+        titulares = {self.normalizar_cpf(grupo[0]['CPF']): (grupo[0]['CPF'], grupo[0]['NOME']) for grupo in grupos}
+        selecionados = {cpf: titulares[cpf] for cpf in cpfs if cpf in titulares}
+        importados = importar_cpfs_pulados(selecionados, BANCO_DADOS)
+        
+        print(f"\n📊 {len(cpfs)} CPFs com evento ativo em {paginas} página(s)")
+        print(f"👤 {len(selecionados)} são titulares da planilha")
+        print(f"⏭️ {importados} titulares marcados como 'pulado'")
+        
+        # Voltar ao formulário para o processamento
+        self.aguardar_login()
+        return importados
+    
+    def _html_consulta_eventos(self):
+        """HTML da consulta de eventos (dentro do iframe, se houver)"""
+        self.driver.switch_to.default_content()
+        if self.driver.find_elements(By.TAG_NAME, "iframe"):
+            self.driver.switch_to.frame(0)
+        return self.driver.page_source
+    
+    def _avancar_pagina_consulta(self, html_atual):
+        """
+        Clica em 'próxima página' da consulta e aguarda o conteúdo mudar.
+        
+        Returns:
+            bool: True se avançou; False na última página
+        """
+        botoes = [botao for botao in self.driver.find_elements(By.XPATH, CONSULTA_EVENTOS_PROXIMA_XPATH)
+                  if botao.is_displayed()]
+        if not botoes:
+            return False
+        
+        botao = botoes[0]
+        classes = (botao.get_attribute('class') or '').lower()
+        if botao.get_attribute('disabled') or botao.get_attribute('aria-disabled') == 'true' or 'disabled' in classes:
+            return False
+        
+        self.driver.execute_script("arguments[0].click();", botao)
+        try:
+            WebDriverWait(self.driver, TIMEOUT_WEBDRIVER).until(lambda driver: driver.page_source != html_atual)
+            return True
+        except Exception:
+            return False
+    
+    def preparar_sessao(self, configurar_coordenadas=True):
+        """
+        Prepara a sessão para processar grupos: aplica configurações do config.py,
+        abre o site, aguarda o login manual e configura as coordenadas do Método B.
+        
+        Args:
+            configurar_coordenadas (bool): Se deve configurar as coordenadas do
+                Método B (no modo pool, apenas o primeiro worker configura)
+        
+        Returns:
+            bool: True se a sessão está pronta, False se o usuário cancelou
+        """
         # Configurações automáticas do config.py
         print("\n⚙️ CONFIGURAÇÕES AUTOMÁTICAS")
         print("="*40)
@@ -2481,14 +4108,23 @@ class AutomacaoEFD:
         print("\n💡 Para alterar essas configurações, edite o arquivo config.py")
         print("="*60)
         
-        # Abrir site
-        self.abrir_site()
+        if self.sessao_reaproveitada and self._formulario_visivel():
+            # Modo anexar: aba do eCAC já logada e no formulário
+            print("\n♻️ Sessão reaproveitada - formulário já está aberto, pulando login")
+        else:
+            # Abrir site (no modo anexar, a aba do eCAC já está aberta)
+            if not self.sessao_reaproveitada:
+                self.abrir_site()
+            
+            # Aguardar login e navegação manual
+            self.aguardar_login()
         
-        # Aguardar login e navegação manual
-        self.aguardar_login()
+        # Modo pipeline: segunda aba na mesma sessão (não se aplica aos leases)
+        if self.usar_pipeline and not self.usar_lease and not self.abas_pipeline:
+            self.abrir_aba_pipeline()
         
         # Configurar coordenadas para Método B DEPOIS de acessar o ECAC
-        if METODO_ASSINATURA_PADRAO == 2:
+        if METODO_ASSINATURA_PADRAO == 2 and configurar_coordenadas:
             print("\n" + "="*60)
             print("📍 CONFIGURAÇÃO DE COORDENADAS - MÉTODO B")
             print("="*60)
@@ -2520,7 +4156,7 @@ class AutomacaoEFD:
                             coordenadas_configuradas = True  # Sair do loop
                         elif opcao_erro == "3":
                             print("❌ Execução cancelada pelo usuário")
-                            return  # Sair da função executar
+                            return False
                         else:
                             print("⚠️ Opção inválida, tentando novamente...")
                             continue
@@ -2530,12 +4166,414 @@ class AutomacaoEFD:
                     self.metodo_assinatura = 1
                     coordenadas_configuradas = True
         
-        # Processar todos os grupos
-        self.processar_todos_os_grupos()
+        return True
+    
+    # ============================================================
+    # MODO DAEMON
+    # ============================================================
+    
+    def executar_daemon(self):
+        """
+        Mantém a automação aberta aguardando jobs em um socket Unix local.
         
-        print("\n✅ Processo concluído!")
-        print("💡 Use o gerenciador de checkpoint para ver detalhes: python gerenciar_checkpoint.py")
-        print("🚀 Sistema totalmente funcional com automação completa!")
+        O Chrome (já logado), o banco de dados e as planilhas lidas ficam
+        carregados entre os jobs, então lotes pequenos de correção começam
+        imediatamente. Cada job é uma linha JSON com as chaves opcionais
+        'arquivo', 'planilha', 'periodo' e 'cpfs'; o progresso é devolvido ao
+        cliente (cliente.py) como linhas JSON até a mensagem final 'fim'.
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            print("❌ Modo daemon requer socket Unix (Linux/Mac)")
+            return
+        
+        print("\n" + "="*60)
+        print("🛰️ AUTOMAÇÃO EFD-REINF - MODO DAEMON")
+        print("="*60)
+        
+        if not self.preparar_sessao():
+            return
+        
+        if os.path.exists(SOCKET_DAEMON):
+            os.remove(SOCKET_DAEMON)
+        
+        servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        servidor.bind(SOCKET_DAEMON)
+        servidor.listen(1)
+        print(f"\n🛰️ Aguardando jobs em {SOCKET_DAEMON} (use: python cliente.py)")
+        
+        try:
+            while True:
+                conexao, _ = servidor.accept()
+                with conexao:
+                    if not self._atender_conexao_daemon(conexao):
+                        break
+        finally:
+            servidor.close()
+            if os.path.exists(SOCKET_DAEMON):
+                os.remove(SOCKET_DAEMON)
+            print("🛰️ Daemon encerrado")
+    
+    def _atender_conexao_daemon(self, conexao):
+        """
+        Lê um job da conexão, executa e envia o progresso de volta.
+        
+        Returns:
+            bool: False se o cliente pediu para encerrar o daemon
+        """
+        saida = SaidaSocket(conexao)
+        try:
+            linha = conexao.makefile('r', encoding='utf-8').readline()
+            job = json.loads(linha) if linha.strip() else {}
+        except (ValueError, OSError) as e:
+            saida.enviar({'tipo': 'fim', 'erro': f"Job inválido: {e}"})
+            return True
+        
+        if job.get('comando') == 'parar':
+            saida.enviar({'tipo': 'fim', 'resumo': None})
+            return False
+        
+        print(f"\n📥 Job recebido: {job}")
+        resumo = None
+        erro = None
+        stdout_original = sys.stdout
+        sys.stdout = saida
+        try:
+            resumo = self.executar_job(job)
+        except ValueError as e:
+            erro = str(e)
+        except Exception as e:
+            erro = str(e)
+            traceback.print_exc(file=saida)
+        finally:
+            saida.flush()
+            sys.stdout = stdout_original
+        
+        saida.enviar({'tipo': 'fim', 'resumo': resumo, 'erro': erro})
+        print(f"📤 Job finalizado: {resumo if resumo else erro}")
+        return True
+    
+    def executar_job(self, job):
+        """
+        Executa um job do daemon reaproveitando a sessão aberta.
+        
+        O progresso (progresso_efd, fila_grupos, checkpoint de índice) é
+        guardado por CPF, sem período nem planilha, então jobs de outro período
+        são recusados e jobs de outra planilha processam a lista explícita dos
+        seus grupos em vez de seguir o checkpoint/fila globais. Dentro do job
+        não há prompts: a verificação manual é desligada até o fim.
+        
+        Args:
+            job (dict): 'arquivo', 'planilha', 'periodo' e 'cpfs' (todos opcionais).
+                Com 'cpfs', apenas os grupos desses titulares são processados e o
+                checkpoint de índice não é alterado.
+        
+        Returns:
+            dict: Resumo retornado por processar_todos_os_grupos
+        
+        Raises:
+            ValueError: Se o período do job for diferente de PERIODO_APURACAO
+        """
+        periodo = job.get('periodo')
+        if periodo and periodo.strip() != PERIODO_APURACAO:
+            raise ValueError(f"Período {periodo} diferente do PERIODO_APURACAO do daemon "
+                             f"({PERIODO_APURACAO}); o progresso não é separado por período, "
+                             f"inicie um daemon com o config desse período")
+        
+        verificar_dados_manual = self.verificar_dados_manual
+        self.verificar_dados_manual = False
+        try:
+            grupos = self.processar_dataframe_por_grupos(job.get('arquivo'), job.get('planilha'))
+            if not grupos:
+                return None
+            
+            indices = None
+            cpfs = {self.normalizar_cpf(cpf) for cpf in job.get('cpfs') or []}
+            if cpfs:
+                indices = [i for i, grupo in enumerate(grupos)
+                           if self.normalizar_cpf(grupo[0]['CPF']) in cpfs]
+                nao_encontrados = len(cpfs) - len(indices)
+                if nao_encontrados > 0:
+                    print(f"⚠️ {nao_encontrados} CPF(s) não encontrados como titular na planilha")
+            elif (os.path.abspath(job.get('arquivo') or ARQUIVO_EXCEL) != os.path.abspath(ARQUIVO_EXCEL)
+                  or (job.get('planilha') or PLANILHA) != PLANILHA):
+                # Checkpoint de índice e fila pertencem à planilha do config
+                indices = list(range(len(grupos)))
+            
+            return self.processar_todos_os_grupos(grupos, indices)
+        finally:
+            self.verificar_dados_manual = verificar_dados_manual
+
+class PoolAutomacao:
+    """
+    Pool de workers, cada um com seu próprio Chrome/perfil, consumindo grupos
+    de uma fila compartilhada.
+    
+    O preenchimento dos formulários acontece em paralelo; o envio + assinatura
+    passa por uma trava global (ver AutomacaoEFD.faixa_assinatura), pois o
+    assinador é operado com teclado e mouse globais. Os logins manuais são
+    feitos um worker por vez.
+    
+    Attributes:
+        num_workers (int): Quantidade de navegadores em paralelo
+        fila (queue.Queue): Índices dos grupos ainda não reivindicados
+        resumo (dict): Totais de sucessos, pulados e erros de todos os workers
+    """
+    
+    def __init__(self, num_workers, usar_lease=False, usar_xvfb=False):
+        self.num_workers = num_workers
+        self.usar_lease = usar_lease
+        self.usar_xvfb = usar_xvfb
+        self.display_assinador = None  # Display Xvfb do assinador compartilhado pelos workers
+        self.fila = queue.Queue()
+        self.grupos = None
+        self.trava_assinatura = threading.Lock()
+        self.trava_login = threading.Lock()
+        self.trava_resumo = threading.Lock()
+        self.resumo = {'sucessos': 0, 'pulados': 0, 'erros': 0}
+        self.primeiro_worker = None
+    
+    def executar(self):
+        """Inicia os workers e aguarda todos terminarem"""
+        print("\n" + "="*60)
+        print(f"🤖 AUTOMAÇÃO EFD-REINF - POOL COM {self.num_workers} NAVEGADORES")
+        print("="*60)
+        print("💡 Faça o login em cada Chrome quando solicitado (um por vez)")
+        
+        # Com Xvfb, o assinador roda em um display próprio: as teclas de todos os
+        # workers vão para ele (um por vez, pela faixa de assinatura)
+        display_assinador = None
+        if self.usar_xvfb and not CHROME_MODO_ANEXAR:
+            display_assinador = DisplayVirtual()
+            display_assinador.iniciar()
+            display_assinador.abrir_assinador()
+            self.display_assinador = display_assinador.nome
+        
+        stdout_original = sys.stdout
+        sys.stdout = SaidaPrefixada(stdout_original)
+        try:
+            threads = []
+            for n in range(1, self.num_workers + 1):
+                thread = threading.Thread(target=self._executar_worker, args=(n,), name=f"W{n}")
+                thread.start()
+                threads.append(thread)
+            
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.stdout = stdout_original
+            if display_assinador:
+                display_assinador.parar()
+        
+        print(f"\n{'='*60}")
+        print("📊 RESUMO FINAL DO POOL")
+        print(f"{'='*60}")
+        print(f"✅ Sucessos: {self.resumo['sucessos']}")
+        print(f"⏭️ Pulados: {self.resumo['pulados']}")
+        print(f"❌ Erros: {self.resumo['erros']}")
+        print(f"{'='*60}")
+    
+    def _executar_worker(self, n):
+        """Abre o Chrome do worker, aguarda o login e consome grupos da fila"""
+        automacao = None
+        try:
+            # Abertura do Chrome e login manual, um worker por vez
+            with self.trava_login:
+                automacao = AutomacaoEFD(worker=n, usar_xvfb=self.usar_xvfb, display_assinador=self.display_assinador)
+                automacao.trava_assinatura = self.trava_assinatura
+                automacao.usar_lease = self.usar_lease
+                automacao.usar_pipeline = False  # Paralelismo já vem dos vários navegadores
+                
+                if self.primeiro_worker is None:
+                    if not automacao.preparar_sessao():
+                        return
+                    self.primeiro_worker = automacao
+                    self.grupos = automacao.processar_dataframe_por_grupos()
+                    for i in range(len(self.grupos)):
+                        self.fila.put(i)
+                else:
+                    if not automacao.preparar_sessao(configurar_coordenadas=False):
+                        return
+                    automacao.metodo_assinatura = self.primeiro_worker.metodo_assinatura
+                    automacao.coordenadas_mouse_metodo_b = self.primeiro_worker.coordenadas_mouse_metodo_b
+            
+            # Login e leitura da planilha não entram no tempo do primeiro grupo
+            automacao.contabilidade.reiniciar()
+            
+            # Com leases, outros processos também podem estar dividindo a planilha
+            if self.usar_lease:
+                resumo = automacao.processar_grupos_com_lease(self.grupos)
+                with self.trava_resumo:
+                    for chave, valor in resumo.items():
+                        self.resumo[chave] += valor
+                return
+            
+            while True:
+                try:
+                    i = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+                
+                # Sem checkpoint de índice: com vários workers ele não representa o progresso
+                resultado = automacao.processar_grupo_indice(self.grupos, i, salvar_indice=False)
+                
+                with self.trava_resumo:
+                    if resultado in ("sucesso", "ja_processado"):
+                        self.resumo['sucessos'] += 1
+                    elif resultado == "pulado":
+                        self.resumo['pulados'] += 1
+                    else:
+                        self.resumo['erros'] += 1
+                
+                if resultado != "ja_processado":
+                    time.sleep(TEMPO_ENTRE_GRUPOS)
+            
+            print("🏁 Fila vazia - worker finalizado")
+            
+        except Exception as e:
+            print(f"❌ Erro no worker {n}: {e}")
+            traceback.print_exc()
+        finally:
+            if automacao:
+                automacao.fechar()
+
+class SaidaPrefixada:
+    """
+    Saída de texto que prefixa cada linha com o nome da thread (ex: '[W1]'),
+    para distinguir os logs dos workers no modo pool.
+    """
+    
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.trava = threading.Lock()
+        self.inicio_linha = {}
+    
+    def write(self, texto):
+        nome = threading.current_thread().name
+        with self.trava:
+            for k, parte in enumerate(texto.split('\n')):
+                if k > 0:
+                    self.terminal.write('\n')
+                    self.inicio_linha[nome] = True
+                if parte:
+                    if self.inicio_linha.get(nome, True):
+                        self.terminal.write(f"[{nome}] ")
+                    self.terminal.write(parte)
+                    self.inicio_linha[nome] = False
+        return len(texto)
+    
+    def flush(self):
+        self.terminal.flush()
+
+class SaidaSocket:
+    """
+    Saída de texto que envia cada linha impressa ao cliente do daemon.
+    
+    Usada no lugar de sys.stdout durante um job, para que todos os prints
+    existentes da automação virem progresso no cliente. As linhas também
+    são repetidas no terminal do daemon.
+    """
+    
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.terminal = sys.stdout
+        self.buffer = ''
+    
+    def enviar(self, mensagem):
+        """Envia uma mensagem JSON (uma por linha) ao cliente"""
+        try:
+            self.conexao.sendall((json.dumps(mensagem, ensure_ascii=False) + '\n').encode('utf-8'))
+        except OSError:
+            pass  # Cliente desconectou - o job continua normalmente
+    
+    def write(self, texto):
+        self.terminal.write(texto)
+        self.buffer += texto
+        while '\n' in self.buffer:
+            linha, self.buffer = self.buffer.split('\n', 1)
+            self.enviar({'tipo': 'log', 'mensagem': linha})
+        return len(texto)
+    
+    def flush(self):
+        self.terminal.flush()
+        if self.buffer:
+            self.enviar({'tipo': 'log', 'mensagem': self.buffer})
+            self.buffer = ''
+
+class DisplayVirtual:
+    """
+    Display X dedicado (Xvfb) para uma instância da automação em servidores
+    Linux sem tela física. O número do display é escolhido pelo próprio Xvfb
+    (-displayfd), então várias instâncias podem rodar na mesma máquina.
+    
+    Attributes:
+        nome (str): Nome do display (ex: ':99'), definido após iniciar()
+        processo (subprocess.Popen): Processo do Xvfb
+    """
+    
+    def __init__(self, resolucao=XVFB_RESOLUCAO):
+        self.resolucao = resolucao
+        self.nome = None
+        self.processo = None
+        self.assinador = None  # Processo do assinador aberto neste display
+    
+    def iniciar(self):
+        """Inicia o Xvfb e aguarda ele informar o número do display"""
+        if shutil.which(XVFB_EXECUTAVEL) is None:
+            raise Exception(f"{XVFB_EXECUTAVEL} não encontrado - instale o pacote xvfb")
+        
+        leitura, escrita = os.pipe()
+        try:
+            self.processo = subprocess.Popen(
+                [XVFB_EXECUTAVEL, '-displayfd', str(escrita), '-screen', '0', self.resolucao, '-nolisten', 'tcp'],
+                pass_fds=(escrita,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            os.close(escrita)
+            with os.fdopen(leitura) as saida:
+                numero = saida.readline().strip()
+        except Exception:
+            self.parar()
+            raise
+        
+        if not numero:
+            self.parar()
+            raise Exception("Xvfb não informou o número do display")
+        
+        self.nome = f":{numero}"
+        print(f"🖥️ Display virtual {self.nome} iniciado ({self.resolucao})")
+        print(f"💡 Para acompanhar ou fazer o login: x11vnc -display {self.nome}")
+        return self.nome
+    
+    def abrir_assinador(self, comando=XVFB_ASSINADOR_COMANDO):
+        """Abre o assinador neste display (XVFB_ASSINADOR_COMANDO)"""
+        if not comando:
+            print(f"⚠️ XVFB_ASSINADOR_COMANDO não definido - abra o assinador com DISPLAY={self.nome}")
+            return
+        
+        self.assinador = subprocess.Popen(
+            comando, env=dict(os.environ, DISPLAY=self.nome),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        print(f"🔐 Assinador aberto no display {self.nome}")
+    
+    def parar(self):
+        """Encerra o assinador aberto aqui e o Xvfb"""
+        if self.assinador is not None:
+            self.assinador.terminate()
+            try:
+                self.assinador.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.assinador.kill()
+            self.assinador = None
+        
+        if self.processo is None:
+            return
+        self.processo.terminate()
+        try:
+            self.processo.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+        self.processo = None
+        print(f"🖥️ Display virtual {self.nome} encerrado")
 
 # ============================================================
 # PROGRAMA PRINCIPAL
@@ -2543,11 +4581,49 @@ class AutomacaoEFD:
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Automação EFD-REINF")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Mantém a sessão aberta e recebe jobs pelo socket local (ver cliente.py)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Quantidade de navegadores em paralelo (modo pool, assinatura serializada)")
+    parser.add_argument('--lease', action='store_true',
+                        help="Reivindica grupos pela tabela de leases (vários main.py no mesmo banco)")
+    parser.add_argument('--xvfb', action='store_true',
+                        help="Abre cada Chrome em um display Xvfb próprio (Linux sem tela física)")
+    parser.add_argument('--pre-verificar', action='store_true',
+                        help="Antes de processar, lê a consulta de eventos R-4010 ativos e marca esses titulares como pulados")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Preenche o próximo titular em uma segunda aba enquanto o atual é assinado")
+    parser.add_argument('--retry-failed', '--reprocessar-erros', dest='reprocessar_erros', action='store_true',
+                        help="Processa apenas os grupos cujo último checkpoint é um erro (ETAPAS_REPROCESSAVEIS)")
+    parser.add_argument('--linear', action='store_true',
+                        help="Percorre a planilha em ordem pelo checkpoint de índice, sem a fila de trabalho")
+    args = parser.parse_args()
+    
+    if args.workers > 1:
+        try:
+            PoolAutomacao(args.workers, usar_lease=args.lease, usar_xvfb=args.xvfb).executar()
+        except KeyboardInterrupt:
+            print("\n\n⚠️ Interrompido pelo usuário")
+        return
+    
     automacao = None
     
     try:
-        automacao = AutomacaoEFD()
-        automacao.executar()
+        automacao = AutomacaoEFD(usar_xvfb=args.xvfb)
+        automacao.usar_lease = args.lease
+        if args.pipeline:
+            automacao.usar_pipeline = True
+        if args.linear:
+            automacao.usar_fila = False
+        if args.reprocessar_erros:
+            automacao.reprocessar_erros = True
+        if args.pre_verificar:
+            automacao.pre_verificar_eventos = True
+        if args.daemon:
+            automacao.executar_daemon()
+        else:
+            automacao.executar()
         
     except KeyboardInterrupt:
         print("\n\n⚠️ Interrompido pelo usuário")
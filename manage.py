@@ -5,14 +5,18 @@ Gerenciador de Checkpoint EFD-REINF
 Permite visualizar e gerenciar o progresso da automação
 """
 
+import json
 import sqlite3
 import pandas as pd
 from datetime import datetime
 import os
 import re
+import time
 
 # Importar configurações
 from config import BANCO_DADOS
+from tempos_etapas import SQL_CRIAR_TABELA as SQL_TEMPOS_ETAPAS
+from contabilidade_tempo import CATEGORIAS, SQL_CRIAR_TABELA as SQL_TEMPOS_CATEGORIAS
 
 class GerenciadorCheckpoint:
     """
@@ -63,6 +67,11 @@ class GerenciadorCheckpoint:
         print("5. 🗑️ Limpar dados")
         print("6. 📋 Gerar planilha de visualização")
         print("7. ⚙️ Alterar checkpoint atual")
+        print("8. 🔒 Ver leases de grupos")
+        print("9. 🧾 Ver recibos de envio")
+        print("10. 🔁 Ver fila de trabalho")
+        print("11. ⏱️ Ver tempos das etapas")
+        print("12. 🧮 Ver tempo por categoria (pausas, WebDriver, banco...)")
         print("0. ❌ Sair")
         print("="*60)
     
@@ -80,7 +89,12 @@ class GerenciadorCheckpoint:
                 'progresso_efd',
                 'dependentes_processados', 
                 'planos_processados',
-                'info_dependentes_processados'
+                'info_dependentes_processados',
+                'leases_grupos',
+                'fila_grupos',
+                'recibos',
+                'eventos_xml',
+                'lotes_xml'
             ]
             
             print(f"\n📊 STATUS GERAL DO BANCO DE DADOS")
@@ -353,7 +367,65 @@ class GerenciadorCheckpoint:
                     ultimo_indice INTEGER NOT NULL,
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
-            ''')
+            '''),
+            ('leases_grupos', '''
+                CREATE TABLE IF NOT EXISTS leases_grupos (
+                    cpf_titular TEXT PRIMARY KEY,
+                    indice_grupo INTEGER,
+                    worker_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    expira_em REAL NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 1,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            '''),
+            ('recibos', '''
+                CREATE TABLE IF NOT EXISTS recibos (
+                    cpf_titular TEXT NOT NULL,
+                    periodo_apuracao TEXT NOT NULL,
+                    nome_titular TEXT,
+                    numero_recibo TEXT,
+                    protocolo TEXT,
+                    data_hora_portal TEXT,
+                    mensagem TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (cpf_titular, periodo_apuracao)
+                )
+            '''),
+            ('fila_grupos', '''
+                CREATE TABLE IF NOT EXISTS fila_grupos (
+                    cpf_titular TEXT PRIMARY KEY,
+                    indice_grupo INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    proxima_tentativa REAL NOT NULL DEFAULT 0,
+                    tipo_erro TEXT,
+                    ultimo_erro TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            '''),
+            ('eventos_xml', '''
+                CREATE TABLE IF NOT EXISTS eventos_xml (
+                    id_evento TEXT PRIMARY KEY,
+                    cpf_titular TEXT NOT NULL,
+                    periodo_apuracao TEXT NOT NULL,
+                    arquivo_lote TEXT,
+                    status TEXT NOT NULL,
+                    erros TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            '''),
+            ('lotes_xml', '''
+                CREATE TABLE IF NOT EXISTS lotes_xml (
+                    arquivo TEXT PRIMARY KEY,
+                    periodo_apuracao TEXT NOT NULL,
+                    qtd_eventos INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            '''),
+            ('tempos_etapas', SQL_TEMPOS_ETAPAS),
+            ('tempos_categorias', SQL_TEMPOS_CATEGORIAS)
         ]
         
         for nome_tabela, create_sql in tabelas:
@@ -387,10 +459,13 @@ class GerenciadorCheckpoint:
                         cursor.execute('DELETE FROM planos_processados')
                         cursor.execute('DELETE FROM info_dependentes_processados')
                         cursor.execute('DELETE FROM checkpoint_indice')
+                        cursor.execute('DELETE FROM leases_grupos')
+                        cursor.execute('DELETE FROM fila_grupos')
                         conn.commit()
                         conn.close()
                         print("✅ Todos os dados foram limpos!")
                         print("💡 Checkpoint de índice também foi resetado - processamento começará do início")
+                        print("💡 Recibos de envio foram mantidos (opção 9 do menu)")
                     else:
                         print("❌ Erro ao conectar banco")
                 else:
@@ -410,6 +485,8 @@ class GerenciadorCheckpoint:
                         cursor.execute('DELETE FROM dependentes_processados WHERE cpf_titular = ?', (cpf,))
                         cursor.execute('DELETE FROM planos_processados WHERE cpf_titular = ?', (cpf,))
                         cursor.execute('DELETE FROM info_dependentes_processados WHERE cpf_titular = ?', (cpf,))
+                        cursor.execute('DELETE FROM leases_grupos WHERE cpf_titular = ?', (cpf,))
+                        cursor.execute('DELETE FROM fila_grupos WHERE cpf_titular = ?', (cpf,))
                         conn.commit()
                         conn.close()
                         print(f"✅ Dados do CPF {cpf} foram limpos!")
@@ -878,6 +955,321 @@ class GerenciadorCheckpoint:
         except Exception as e:
             print(f"❌ Erro ao alterar checkpoint por CPF: {e}")
     
+    def ver_leases(self):
+        """Mostra os leases de grupos (execuções concorrentes com --lease)"""
+        try:
+            conn = self.conectar_banco()
+            if not conn:
+                return
+            
+            cursor = conn.cursor()
+            self.criar_tabelas_se_nao_existirem(cursor)
+            agora = time.time()
+            
+            print(f"\n🔒 LEASES DE GRUPOS")
+            print(f"{'='*60}")
+            
+            cursor.execute('''
+                SELECT status, COUNT(*) FROM leases_grupos
+                GROUP BY status ORDER BY status
+            ''')
+            totais = cursor.fetchall()
+            
+            if not totais:
+                print("ℹ️ Nenhum lease registrado (modo --lease ainda não utilizado)")
+                conn.close()
+                return
+            
+            print(f"\n📊 Por Status:")
+            for status, total in totais:
+                print(f"   {status:15} | {total:5} grupos")
+            
+            # Leases em andamento: ativos ou expirados (worker travou/encerrou)
+            cursor.execute('''
+                SELECT cpf_titular, indice_grupo, worker_id, expira_em, tentativas
+                FROM leases_grupos
+                WHERE status = 'em_andamento'
+                ORDER BY indice_grupo
+            ''')
+            em_andamento = cursor.fetchall()
+            
+            if em_andamento:
+                print(f"\n⏳ EM ANDAMENTO ({len(em_andamento)}):")
+                print(f"{'CPF':15} | {'Grupo':6} | {'Worker':30} | {'Tent.':5} | {'Situação'}")
+                print("-" * 80)
+                for cpf, indice, worker_id, expira_em, tentativas in em_andamento:
+                    restante = expira_em - agora
+                    situacao = f"expira em {restante:.0f}s" if restante > 0 else "EXPIRADO (será reivindicado)"
+                    print(f"{cpf:15} | {indice + 1:6} | {worker_id[:30]:30} | {tentativas:5} | {situacao}")
+            
+            print("\n1. 🔓 Liberar leases com erro (permite nova tentativa)")
+            print("2. 🗑️ Limpar todos os leases")
+            print("0. ⬅️ Voltar")
+            opcao = input("\nEscolha uma opção: ").strip()
+            
+            if opcao == "1":
+                cursor.execute("DELETE FROM leases_grupos WHERE status = 'erro'")
+                print(f"✅ {cursor.rowcount} leases com erro liberados")
+            elif opcao == "2":
+                confirmar = input("⚠️ Limpar todos os leases? Workers em execução podem repetir grupos (digite 'SIM'): ")
+                if confirmar.strip().upper() == "SIM":
+                    cursor.execute('DELETE FROM leases_grupos')
+                    print(f"✅ {cursor.rowcount} leases removidos")
+                else:
+                    print("❌ Operação cancelada")
+            
+            conn.commit()
+            conn.close()
+            
+        except Exception as e:
+            print(f"❌ Erro ao ver leases: {e}")
+    
+    def ver_fila(self):
+        """Mostra a fila de trabalho e permite recolocar falhas na fila"""
+        try:
+            conn = self.conectar_banco()
+            if not conn:
+                return
+            
+            cursor = conn.cursor()
+            self.criar_tabelas_se_nao_existirem(cursor)
+            agora = time.time()
+            
+            print(f"\n🔁 FILA DE TRABALHO")
+            print(f"{'='*60}")
+            
+            cursor.execute('''
+                SELECT status, COUNT(*) FROM fila_grupos
+                WHERE indice_grupo >= 0
+                GROUP BY status ORDER BY status
+            ''')
+            totais = cursor.fetchall()
+            
+            if not totais:
+                print("ℹ️ Fila vazia (python main.py ainda não foi executado com a fila)")
+                conn.close()
+                return
+            
+            print(f"\n📊 Por Status:")
+            for status, total in totais:
+                print(f"   {status:15} | {total:5} grupos")
+            
+            # Retentativas agendadas e falhas definitivas
+            cursor.execute('''
+                SELECT cpf_titular, indice_grupo, status, tentativas, proxima_tentativa, tipo_erro, ultimo_erro
+                FROM fila_grupos
+                WHERE indice_grupo >= 0 AND (status = 'falha' OR tentativas > 0 AND status = 'pendente')
+                ORDER BY status, indice_grupo
+            ''')
+            itens = cursor.fetchall()
+            
+            if itens:
+                print(f"\n⚠️ RETENTATIVAS E FALHAS ({len(itens)}):")
+                print(f"{'CPF':15} | {'Grupo':6} | {'Tent.':5} | {'Situação':22} | {'Último erro'}")
+                print("-" * 100)
+                for cpf, indice, status, tentativas, proxima, tipo_erro, ultimo_erro in itens[:50]:
+                    if status == 'falha':
+                        situacao = f"falha ({tipo_erro})"
+                    else:
+                        situacao = f"retenta em {max(0, proxima - agora):.0f}s"
+                    print(f"{cpf:15} | {indice + 1:6} | {tentativas:5} | {situacao:22} | {(ultimo_erro or '')[:40]}")
+                if len(itens) > 50:
+                    print(f"   ... e mais {len(itens) - 50}")
+            
+            print("\n1. 🔁 Recolocar falhas na fila (zera tentativas)")
+            print("2. ⏩ Retentar agendados imediatamente")
+            print("0. ⬅️ Voltar")
+            opcao = input("\nEscolha uma opção: ").strip()
+            
+            if opcao == "1":
+                cursor.execute('''
+                    UPDATE fila_grupos SET status = 'pendente', tentativas = 0, proxima_tentativa = 0
+                    WHERE status = 'falha'
+                ''')
+                print(f"✅ {cursor.rowcount} grupos recolocados na fila")
+            elif opcao == "2":
+                cursor.execute("UPDATE fila_grupos SET proxima_tentativa = 0 WHERE status = 'pendente'")
+                print(f"✅ {cursor.rowcount} grupos liberados para a próxima execução")
+            
+            conn.commit()
+            conn.close()
+            
+        except Exception as e:
+            print(f"❌ Erro ao ver fila: {e}")
+    
+    def ver_recibos(self):
+        """Mostra os recibos de envio por período e permite exportá-los"""
+        try:
+            conn = self.conectar_banco()
+            if not conn:
+                return
+            
+            cursor = conn.cursor()
+            self.criar_tabelas_se_nao_existirem(cursor)
+            
+            print(f"\n🧾 RECIBOS DE ENVIO")
+            print(f"{'='*60}")
+            
+            cursor.execute('''
+                SELECT periodo_apuracao, COUNT(*), COUNT(numero_recibo)
+                FROM recibos
+                GROUP BY periodo_apuracao ORDER BY periodo_apuracao
+            ''')
+            periodos = cursor.fetchall()
+            
+            if not periodos:
+                print("ℹ️ Nenhum recibo registrado")
+                conn.close()
+                return
+            
+            print(f"\n📅 Por Período:")
+            for periodo, total, com_numero in periodos:
+                print(f"   {periodo:10} | {total:5} envios | {total - com_numero:3} sem número de recibo")
+            
+            filtro = input("\nDigite um período (MM/AAAA) ou CPF para detalhar (ENTER = voltar): ").strip()
+            if not filtro:
+                conn.close()
+                return
+            
+            coluna = 'periodo_apuracao' if '/' in filtro else 'cpf_titular'
+            df = pd.read_sql_query(f'''
+                SELECT cpf_titular, nome_titular, periodo_apuracao, numero_recibo,
+                       protocolo, data_hora_portal, timestamp
+                FROM recibos
+                WHERE {coluna} = ?
+                ORDER BY timestamp
+            ''', conn, params=(filtro,))
+            conn.close()
+            
+            if df.empty:
+                print(f"❌ Nenhum recibo encontrado para {filtro}")
+                return
+            
+            print(f"\n{'CPF':15} | {'Período':8} | {'Recibo':28} | {'Data/Hora portal'}")
+            print("-" * 80)
+            for _, linha in df.iterrows():
+                print(f"{linha['cpf_titular']:15} | {linha['periodo_apuracao']:8} | "
+                      f"{linha['numero_recibo'] or 'N/A':28} | {linha['data_hora_portal'] or 'N/A'}")
+            
+            exportar = input("\n📤 Exportar para Excel? (S/N): ").strip().upper()
+            if exportar == "S":
+                nome_arquivo = f"recibos_{re.sub(r'[^0-9A-Za-z]', '_', filtro)}.xlsx"
+                df.to_excel(nome_arquivo, index=False)
+                print(f"✅ Recibos exportados para {nome_arquivo}")
+            
+        except Exception as e:
+            print(f"❌ Erro ao ver recibos: {e}")
+    
+    def _imprimir_tempos(self, df, coluna, titulo):
+        """Imprime contagem, p50, p95, máximo e total da duração agrupada por coluna"""
+        tabela = df.groupby(coluna)['duracao'].agg(
+            qtd='count',
+            p50=lambda d: d.quantile(0.5),
+            p95=lambda d: d.quantile(0.95),
+            maximo='max',
+            total='sum',
+        ).sort_values('total', ascending=False)
+        
+        print(f"\n{titulo}")
+        print(f"{'':24} | {'Qtd':>6} | {'p50 (s)':>8} | {'p95 (s)':>8} | {'Máx (s)':>8} | {'Total (s)':>10}")
+        print("-" * 80)
+        for nome, linha in tabela.iterrows():
+            print(f"{str(nome)[:24]:24} | {int(linha['qtd']):6} | {linha['p50']:8.3f} | {linha['p95']:8.3f} | "
+                  f"{linha['maximo']:8.3f} | {linha['total']:10.1f}")
+    
+    def ver_tempos_etapas(self):
+        """Mostra contagem/p50/p95/máximo da duração de cada etapa, por execução e por etapa"""
+        try:
+            conn = self.conectar_banco()
+            if not conn:
+                return
+            
+            self.criar_tabelas_se_nao_existirem(conn.cursor())
+            df = pd.read_sql_query('SELECT execucao, etapa, duracao, status FROM tempos_etapas', conn)
+            conn.close()
+            
+            print(f"\n⏱️ TEMPOS DAS ETAPAS")
+            print(f"{'='*60}")
+            
+            if df.empty:
+                print("ℹ️ Nenhum tempo registrado (TEMPOS_ETAPAS_ATIVO no config.py)")
+                return
+            
+            # Duração do grupo inteiro em cada execução
+            execucoes = sorted(df['execucao'].unique())
+            grupos = df[df['etapa'] == 'grupo']
+            if not grupos.empty:
+                self._imprimir_tempos(grupos, 'execucao', "📊 Grupo inteiro por execução:")
+            
+            print(f"\n📅 Execuções:")
+            for n, execucao in enumerate(execucoes, 1):
+                print(f"   {n:3}. {execucao}")
+            
+            escolha = input("\nNúmero da execução para detalhar (ENTER = todas): ").strip()
+            if escolha:
+                if not escolha.isdigit() or not 1 <= int(escolha) <= len(execucoes):
+                    print("❌ Execução inválida")
+                    return
+                df = df[df['execucao'] == execucoes[int(escolha) - 1]]
+                titulo = f"📋 Etapas da execução {execucoes[int(escolha) - 1]}:"
+            else:
+                titulo = "📋 Etapas (todas as execuções):"
+            
+            self._imprimir_tempos(df[df['etapa'] != 'grupo'], 'etapa', titulo)
+            
+            falhas = df[~df['status'].isin(['ok', 'sucesso'])]
+            if not falhas.empty:
+                print(f"\n⚠️ Spans sem sucesso por etapa/status:")
+                for (etapa, status), total in falhas.groupby(['etapa', 'status']).size().items():
+                    print(f"   {etapa:24} | {status:10} | {total:5}")
+            
+        except Exception as e:
+            print(f"❌ Erro ao ver tempos das etapas: {e}")
+    
+    def ver_tempos_categorias(self):
+        """Mostra, por execução, a parcela do tempo dos grupos em cada categoria e as pausas por função"""
+        try:
+            conn = self.conectar_banco()
+            if not conn:
+                return
+            
+            self.criar_tabelas_se_nao_existirem(conn.cursor())
+            df = pd.read_sql_query('SELECT * FROM tempos_categorias', conn)
+            conn.close()
+            
+            print(f"\n🧮 TEMPO POR CATEGORIA")
+            print(f"{'='*60}")
+            
+            if df.empty:
+                print("ℹ️ Nenhum tempo registrado (CONTABILIDADE_TEMPO_ATIVA no config.py)")
+                return
+            
+            colunas = list(CATEGORIAS) + ['outros']
+            print(f"{'Execução':22} | {'Grupos':>6} | {'s/grupo':>7} | {'Cmds':>5} | " +
+                  " | ".join(f"{coluna[:8]:>8}" for coluna in colunas))
+            print("-" * (52 + 11 * len(colunas)))
+            execucoes = sorted(df['execucao'].unique())
+            for execucao in execucoes:
+                linhas = df[df['execucao'] == execucao]
+                duracao = linhas['duracao'].sum()
+                parcelas = " | ".join(f"{linhas[coluna].sum() / duracao if duracao else 0:8.0%}" for coluna in colunas)
+                print(f"{execucao:22} | {len(linhas):6} | {linhas['duracao'].mean():7.2f} | "
+                      f"{linhas['comandos_webdriver'].mean():5.1f} | {parcelas}")
+            
+            # Pausas (time.sleep) por função na última execução
+            ultima = df[df['execucao'] == execucoes[-1]]
+            pausas = {}
+            for texto in ultima['pausas_funcoes'].dropna():
+                for funcao, segundos in json.loads(texto).items():
+                    pausas[funcao] = pausas.get(funcao, 0.0) + segundos
+            if pausas:
+                print(f"\n💤 Pausas por função na execução {execucoes[-1]}:")
+                for funcao, segundos in sorted(pausas.items(), key=lambda item: -item[1]):
+                    print(f"   {funcao:32} | {segundos:10.1f}s | {segundos / len(ultima):7.2f} s/grupo")
+            
+        except Exception as e:
+            print(f"❌ Erro ao ver tempo por categoria: {e}")
+    
     def executar(self):
         """Executa o gerenciador"""
         while True:
@@ -902,6 +1294,16 @@ class GerenciadorCheckpoint:
                     self.gerar_planilha_visualizacao()
                 elif opcao == "7":
                     self.alterar_checkpoint_atual()
+                elif opcao == "8":
+                    self.ver_leases()
+                elif opcao == "9":
+                    self.ver_recibos()
+                elif opcao == "10":
+                    self.ver_fila()
+                elif opcao == "11":
+                    self.ver_tempos_etapas()
+                elif opcao == "12":
+                    self.ver_tempos_categorias()
                 else:
                     print("❌ Opção inválida")
                 
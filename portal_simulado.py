@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Portal REINF Simulado (HTTP local)
+Aplicação web local, só com a biblioteca padrão, que reproduz o fluxo do
+formulário de pagamentos do R-4010 para testar tempos e seletores sem o eCAC:
+os 3 campos da primeira etapa, Continuar, os modais de dependente, plano de
+saúde e informações dos dependentes, "Concluir e enviar", o alerta de sucesso
+MS7001, "Incluir novo pagamento" e a recusa por evento ativo.
+
+O mesmo servidor responde ao protocolo hipotético do assinador (stub, ver assinador_stub.py):
+o envio cria uma solicitação de assinatura e, depois de assinada pela
+automação (ASSINATURA_BACKEND = 'protocolo'), a página mostra o resultado.
+Um CPF enviado com sucesso passa a ter evento ativo no período.
+
+Uso:
+    python portal_simulado.py                     # escuta em PORTAL_SIMULADO_PORTA
+    python portal_simulado.py --porta 8765 --latencia continuar=0.8 --erro evento_ativo=0.05
+
+Para usar com main.py: URL_BASE = 'http://127.0.0.1:8765/', ASSINATURA_BACKEND =
+'protocolo' e ASSINADOR_SERVICO_URL = 'http://127.0.0.1:8765'.
+"""
+
+import argparse
+import itertools
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from assinador_stub import EstadoStub, ManipuladorStub
+
+TEXTO_EVENTO_ATIVO = ("Inclusão não permitida. Existe um evento ativo para o CPF do beneficiário "
+                      "no mesmo período de apuração.")
+TEXTO_ERRO_PORTAL = "EM0001 - Não foi possível processar o evento. Tente novamente mais tarde."
+TEXTO_CANCELAMENTO = "Assinatura cancelada pelo usuário."
+
+PAGINA_INICIAL = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>EFD-REINF (simulado)</title></head>
+<body style="margin:0"><iframe src="/formulario" style="width:100%;height:100vh;border:0"></iframe></body></html>
+"""
+
+PAGINA_FORMULARIO = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>R-4010 (simulado)</title>
+<style>
+body { font-family: sans-serif; margin: 20px; }
+label { display: block; margin: 6px 0; }
+.oculto { display: none; }
+.modal { border: 1px solid #888; background: #f7f7f7; padding: 12px; margin: 12px 0; }
+.message { padding: 8px; margin: 8px 0; }
+.message.alert { background: #fdd; }
+.message.success { background: #dfd; }
+</style></head>
+<body>
+<h3>R-4010 - Pagamentos a beneficiário pessoa física</h3>
+<app-reinf-mensagens-alerta id="alertas"></app-reinf-mensagens-alerta>
+
+<div id="etapa1">
+  <label>Período de Apuração <input id="periodo_apuracao" data-testid="periodo_apuracao" placeholder="MM/AAAA"></label>
+  <label>CNPJ <input id="insc_estabelecimento" data-testid="insc_estabelecimento" placeholder="00.000.000/0000-00"></label>
+  <label>CPF <input id="cpf_beneficiario" data-testid="cpf_beneficiario" placeholder="000.000.000-00"></label>
+  <button type="button" data-testid="botao_continuar" onclick="continuar()">Continuar</button>
+</div>
+
+<div id="etapa2" class="oculto">
+  <h4>Dependentes</h4>
+  <ul id="lista_dependentes"></ul>
+  <button type="button" id="BotaoInclusaoDiv_ideDep" onclick="abrirModal('ide_dep')">Incluir dependente</button>
+  <h4>Planos de saúde</h4>
+  <ul id="lista_planos"></ul>
+  <button type="button" id="BotaoInclusaoDiv_ideOpSaude" onclick="abrirModal('ide_op_saude')">Incluir operadora</button>
+  <div id="bloco_infos" class="oculto">
+    <ul id="lista_infos"></ul>
+    <button type="button" id="BotaoInclusaoDiv_infoDependPl_0" onclick="abrirModal('info_depend_pl')">Incluir informações dos dependentes</button>
+  </div>
+  <div id="modal"></div>
+  <p><button type="button" data-testid="botao_concluir_enviar" onclick="enviar()">Concluir e enviar</button></p>
+</div>
+
+<div id="etapa3" class="oculto">
+  <button type="button" class="button" onclick="novoPagamento()">Incluir novo pagamento</button>
+</div>
+
+<script>
+var ATRASO_MODAL = __ATRASO_MODAL__;
+var RELACOES = [['1', 'Cônjuge'], ['2', 'Companheiro(a)'], ['3', 'Filho(a) ou enteado(a)'], ['4', 'Filho(a) ou enteado(a) universitário(a)'],
+  ['6', 'Irmão(ã), neto(a) ou bisneto(a)'], ['9', 'Pais, avós e bisavós'], ['10', 'Menor pobre'],
+  ['11', 'Pessoa absolutamente incapaz'], ['12', 'Ex-cônjuge'], ['99', 'Agregado/Outros']];
+var pagamento = null;
+
+function $(id) { return document.getElementById(id); }
+
+function api(caminho, dados, aoResponder) {
+  var xhr = new XMLHttpRequest();
+  xhr.open(dados === null ? 'GET' : 'POST', caminho);
+  xhr.setRequestHeader('Content-Type', 'application/json');
+  xhr.onload = function () { aoResponder(JSON.parse(xhr.responseText)); };
+  xhr.send(dados === null ? null : JSON.stringify(dados));
+}
+
+function mostrarAlerta(classe, texto) {
+  $('alertas').innerHTML = '<div class="message ' + classe + '"><span data-testid="mensagem_descricao_0"></span></div>';
+  $('alertas').querySelector('span').textContent = texto;
+}
+
+function mostrarEtapa(numero) {
+  for (var i = 1; i <= 3; i++) { $('etapa' + i).className = (i === numero) ? '' : 'oculto'; }
+}
+
+function listar(id, itens) {
+  $(id).innerHTML = '';
+  itens.forEach(function (item) {
+    var li = document.createElement('li');
+    li.textContent = item;
+    $(id).appendChild(li);
+  });
+}
+
+function atualizarListas() {
+  listar('lista_dependentes', pagamento.dependentes.map(function (d) { return d.cpf + ' (' + d.relacao + ')'; }));
+  listar('lista_planos', pagamento.planos.map(function (p) { return p.cnpj + ' - ' + p.valor; }));
+  listar('lista_infos', pagamento.infos.map(function (i) { return i.cpf + ' - ' + i.valor; }));
+  $('bloco_infos').className = pagamento.planos.length ? '' : 'oculto';
+}
+
+function continuar() {
+  $('alertas').innerHTML = '';
+  var dados = {periodo: $('periodo_apuracao').value, cnpj: $('insc_estabelecimento').value, cpf: $('cpf_beneficiario').value};
+  api('/api/continuar', dados, function (r) {
+    if (!r.ok) { mostrarAlerta('alert', r.mensagem); return; }
+    pagamento = {periodo: dados.periodo, cnpj: dados.cnpj, cpf: dados.cpf, dependentes: [], planos: [], infos: []};
+    atualizarListas();
+    mostrarEtapa(2);
+  });
+}
+
+function abrirModal(tipo) {
+  setTimeout(function () {
+    var html = '<div class="modal">';
+    if (tipo === 'ide_dep') {
+      html += '<label>CPF <input id="cpf_dependente"></label><label>Relação de dependência ' +
+        '<select id="relacao_dependencia" onchange="relacaoAlterada()"><option value="">Selecione</option>';
+      RELACOES.forEach(function (r) { html += '<option value="' + r[0] + '">' + r[1] + '</option>'; });
+      html += '</select></label><span id="campo_descricao"></span>';
+    } else if (tipo === 'ide_op_saude') {
+      html += '<label>CNPJ da operadora <input id="cnpj_operadora"></label>' +
+        '<label>Valor pago pelo titular <input id="valor_saude"></label>';
+    } else {
+      html += '<label>Dependente <select id="c_p_f_do_dependente"><option value="">Selecione</option>';
+      pagamento.dependentes.forEach(function (d) { html += '<option value="' + d.cpf + '">' + d.cpf + '</option>'; });
+      html += '</select></label><label>Valor pago pelo dependente <input id="valor_saude_plano"></label>';
+    }
+    html += '<span id="validacao_modal"></span>' +
+      '<button type="button" data-testid="botao_salvar_modal_' + tipo + '" onclick="salvarModal(\\'' + tipo + '\\')">Salvar</button></div>';
+    $('modal').innerHTML = html;
+  }, ATRASO_MODAL);
+}
+
+function relacaoAlterada() {
+  $('campo_descricao').innerHTML = $('relacao_dependencia').value === '99' ?
+    '<label>Descrição da dependência <input id="descricao_dependencia"></label>' : '';
+}
+
+function valor(id) { return $(id) ? $(id).value.trim() : ''; }
+
+function salvarModal(tipo) {
+  var dados;
+  if (tipo === 'ide_dep') {
+    dados = {cpf: valor('cpf_dependente'), relacao: valor('relacao_dependencia'), descricao: valor('descricao_dependencia')};
+  } else if (tipo === 'ide_op_saude') {
+    dados = {cnpj: valor('cnpj_operadora'), valor: valor('valor_saude')};
+  } else {
+    dados = {cpf: valor('c_p_f_do_dependente'), valor: valor('valor_saude_plano')};
+  }
+  api('/api/salvar', {tipo: tipo, dados: dados}, function (r) {
+    if (!r.ok) { $('validacao_modal').textContent = r.mensagem; return; }
+    if (tipo === 'ide_dep') { pagamento.dependentes.push(dados); }
+    else if (tipo === 'ide_op_saude') { pagamento.planos.push(dados); }
+    else { pagamento.infos.push(dados); }
+    $('modal').innerHTML = '';
+    atualizarListas();
+  });
+}
+
+function enviar() {
+  api('/api/enviar', pagamento, function (r) {
+    if (!r.ok) { mostrarAlerta('alert', r.mensagem); return; }
+    mostrarEtapa(0);
+    consultarEnvio(r.envio);
+  });
+}
+
+function consultarEnvio(envio) {
+  api('/api/envios/' + envio, null, function (r) {
+    if (r.status === 'aguardando') { setTimeout(function () { consultarEnvio(envio); }, 300); return; }
+    if (r.status === 'sucesso') {
+      mostrarAlerta('success', r.mensagem);
+      mostrarEtapa(3);
+      return;
+    }
+    // Recusado ou cancelado: o formulário volta para a primeira etapa com o alerta
+    mostrarAlerta('alert', r.mensagem);
+    limparPrimeiraEtapa();
+    mostrarEtapa(1);
+  });
+}
+
+function limparPrimeiraEtapa() {
+  ['periodo_apuracao', 'insc_estabelecimento', 'cpf_beneficiario'].forEach(function (id) { $(id).value = ''; });
+  pagamento = null;
+}
+
+function novoPagamento() {
+  api('/api/novo', {}, function () {
+    $('alertas').innerHTML = '';
+    limparPrimeiraEtapa();
+    mostrarEtapa(1);
+  });
+}
+</script>
+</body></html>
+"""
+
+
+def ler_pares(pares, padrao, opcao):
+    """Converte ['nome=valor', ...] da linha de comando em dicionário sobre o padrão"""
+    resultado = dict(padrao)
+    for par in pares or []:
+        nome, separador, valor = par.partition('=')
+        if not separador:
+            raise SystemExit(f"❌ {opcao} espera NOME=VALOR: {par}")
+        resultado[nome.strip()] = float(valor)
+    return resultado
+
+
+def _digitos(valor):
+    return re.sub(r'\D', '', str(valor or ''))
+
+
+class EstadoPortal(EstadoStub):
+    """
+    Estado do portal simulado: envios, eventos ativos por período e as
+    solicitações de assinatura do stub do assinador.
+
+    Attributes:
+        latencias (dict): Latência de cada ação no servidor (segundos)
+        erros (dict): Probabilidade de 'evento_ativo' e 'erro_portal'
+        eventos_ativos (set): (período, CPF) com evento aceito
+    """
+
+    def __init__(self, latencias=None, erros=None, semente=0):
+        super().__init__(sempre_pendente=False)
+        self.latencias = dict(latencias or {})
+        self.erros = dict(erros or {})
+        self.aleatorio = random.Random(semente)
+        self.envios = {}
+        self.eventos_ativos = set()
+        self.contador_envios = itertools.count(1)
+        self.contador_recibos = itertools.count(1)
+
+    def aguardar(self, acao):
+        segundos = self.latencias.get(acao, 0)
+        if segundos > 0:
+            time.sleep(segundos)
+
+    def sortear_erro(self, nome):
+        with self.trava:
+            return self.aleatorio.random() < self.erros.get(nome, 0)
+
+    def continuar(self, dados):
+        """Validação da primeira etapa"""
+        if not (dados.get('periodo') and dados.get('cnpj') and dados.get('cpf')):
+            return {'ok': False, 'mensagem': 'Campo obrigatório não preenchido.'}
+        if len(_digitos(dados['cpf'])) != 11:
+            return {'ok': False, 'mensagem': f"CPF inválido: {dados['cpf']}"}
+
+        chave = (dados['periodo'], _digitos(dados['cpf']))
+        if chave in self.eventos_ativos or self.sortear_erro('evento_ativo'):
+            return {'ok': False, 'mensagem': TEXTO_EVENTO_ATIVO}
+        return {'ok': True}
+
+    def salvar(self, tipo, dados):
+        """Validação de um modal"""
+        if tipo == 'ide_dep':
+            if len(_digitos(dados.get('cpf'))) != 11 or not dados.get('relacao'):
+                return {'ok': False, 'mensagem': 'Informe o CPF e a relação de dependência.'}
+            if dados['relacao'] == '99' and not dados.get('descricao'):
+                return {'ok': False, 'mensagem': 'Informe a descrição da dependência.'}
+        elif not (dados.get('cnpj', dados.get('cpf')) and dados.get('valor')):
+            return {'ok': False, 'mensagem': 'Preencha todos os campos.'}
+        return {'ok': True}
+
+    def enviar(self, pagamento):
+        """Registra o envio e cria a solicitação de assinatura"""
+        if not pagamento or not pagamento.get('cpf'):
+            return {'ok': False, 'mensagem': 'Nenhum pagamento em edição.'}
+
+        solicitacao = self.criar_solicitacao(origem='portal', tipo='xml')
+        with self.trava:
+            id_envio = str(next(self.contador_envios))
+            self.envios[id_envio] = {
+                'solicitacao': solicitacao['id'],
+                'periodo': pagamento.get('periodo'),
+                'cpf': _digitos(pagamento['cpf']),
+                'status': 'aguardando',
+                'assinado_em': None,
+            }
+        return {'ok': True, 'envio': id_envio}
+
+    def consultar_envio(self, id_envio):
+        """
+        Situação do envio: aguardando a assinatura e, depois de assinado, o
+        resultado após a latência de 'confirmacao'.
+        """
+        with self.trava:
+            envio = self.envios.get(id_envio)
+            if envio is None:
+                return {'status': 'erro', 'mensagem': 'Envio não encontrado.'}
+            if envio['status'] != 'aguardando':
+                return envio['resposta']
+
+            assinada = any(item['id'] == envio['solicitacao'] for item in self.assinadas)
+            if not assinada:
+                if envio['solicitacao'] in self.pendentes:
+                    return {'status': 'aguardando'}
+                envio['resposta'] = {'status': 'cancelado', 'mensagem': TEXTO_CANCELAMENTO}
+                envio['status'] = 'cancelado'
+                return envio['resposta']
+
+            if envio['assinado_em'] is None:
+                envio['assinado_em'] = time.time()
+            if time.time() - envio['assinado_em'] < self.latencias.get('confirmacao', 0):
+                return {'status': 'aguardando'}
+
+            if self.aleatorio.random() < self.erros.get('erro_portal', 0):
+                envio['resposta'] = {'status': 'erro', 'mensagem': TEXTO_ERRO_PORTAL}
+            else:
+                numero = next(self.contador_recibos)
+                recibo = f"1.{numero:04d}.{int(time.time()) % 100000:05d}-{numero % 10}"
+                envio['resposta'] = {
+                    'status': 'sucesso',
+                    'mensagem': (f"MS7001 - Evento recebido com sucesso. Número do recibo: {recibo}. "
+                                 f"Protocolo: {numero:010d}. Data/hora: {datetime.now():%d/%m/%Y %H:%M:%S}"),
+                }
+                self.eventos_ativos.add((envio['periodo'], envio['cpf']))
+            envio['status'] = envio['resposta']['status']
+            return envio['resposta']
+
+
+class ManipuladorPortal(ManipuladorStub):
+    """Atende as páginas e a API do portal; as demais rotas são as do stub do assinador"""
+
+    def _responder_html(self, html):
+        corpo = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        caminho = urlparse(self.path).path
+        if caminho == '/':
+            self.estado.aguardar('pagina')
+            self._responder_html(PAGINA_INICIAL)
+        elif caminho == '/formulario':
+            self.estado.aguardar('pagina')
+            atraso_modal = int(self.estado.latencias.get('modal', 0) * 1000)
+            self._responder_html(PAGINA_FORMULARIO.replace('__ATRASO_MODAL__', str(atraso_modal)))
+        elif caminho.startswith('/api/envios/'):
+            self._responder(200, self.estado.consultar_envio(caminho.rsplit('/', 1)[1]))
+        else:
+            super().do_GET()
+
+    def do_POST(self):
+        caminho = urlparse(self.path).path
+        if not caminho.startswith('/api/'):
+            super().do_POST()
+            return
+
+        dados = self._ler_json()
+        if caminho == '/api/continuar':
+            self.estado.aguardar('continuar')
+            self._responder(200, self.estado.continuar(dados))
+        elif caminho == '/api/salvar':
+            self.estado.aguardar('salvar_modal')
+            self._responder(200, self.estado.salvar(dados.get('tipo'), dados.get('dados') or {}))
+        elif caminho == '/api/enviar':
+            self.estado.aguardar('enviar')
+            self._responder(200, self.estado.enviar(dados))
+        elif caminho == '/api/novo':
+            self.estado.aguardar('novo_pagamento')
+            self._responder(200, {'ok': True})
+        else:
+            self._responder(404, {'mensagem': 'rota desconhecida'})
+
+
+def criar_portal(porta, latencias=None, erros=None, semente=0, host='127.0.0.1'):
+    """
+    Cria o servidor do portal simulado (use serve_forever() para iniciar).
+    Com porta 0 o sistema escolhe uma porta livre (ver server_address).
+    """
+    estado = EstadoPortal(latencias, erros, semente)
+    manipulador = type('Manipulador', (ManipuladorPortal,), {'estado': estado})
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+
+def iniciar_em_segundo_plano(servidor):
+    """Atende o servidor em uma thread daemon e retorna a URL base"""
+    threading.Thread(target=servidor.serve_forever, name='portal-simulado', daemon=True).start()
+    host, porta = servidor.server_address[:2]
+    return f"http://{host}:{porta}"
+
+
+def main():
+    """Função principal"""
+    from config import PORTAL_SIMULADO_ERROS, PORTAL_SIMULADO_LATENCIAS, PORTAL_SIMULADO_PORTA
+
+    parser = argparse.ArgumentParser(description="Portal REINF simulado para testes locais")
+    parser.add_argument('--porta', type=int, default=PORTAL_SIMULADO_PORTA, help="Porta (padrão: PORTAL_SIMULADO_PORTA)")
+    parser.add_argument('--latencia', action='append', metavar='NOME=S',
+                        help="Latência no servidor em segundos (pagina, continuar, modal, salvar_modal, "
+                             "enviar, confirmacao, novo_pagamento)")
+    parser.add_argument('--erro', action='append', metavar='NOME=P',
+                        help="Probabilidade de erro (evento_ativo, erro_portal)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente do sorteio de erros")
+    args = parser.parse_args()
+
+    latencias = ler_pares(args.latencia, PORTAL_SIMULADO_LATENCIAS, '--latencia')
+    erros = ler_pares(args.erro, PORTAL_SIMULADO_ERROS, '--erro')
+
+    servidor = criar_portal(args.porta, latencias, erros, args.semente)
+    print(f"🌐 Portal REINF simulado em http://127.0.0.1:{args.porta}/")
+    print(f"💡 No config.py: URL_BASE = 'http://127.0.0.1:{args.porta}/', ASSINATURA_BACKEND = 'protocolo', "
+          f"ASSINADOR_SERVICO_URL = 'http://127.0.0.1:{args.porta}'")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Portal simulado encerrado")
+
+
+if __name__ == "__main__":
+    main()
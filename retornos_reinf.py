@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importação de Retornos da REINF
+Lê arquivos XML de retorno (R-9005 evtRet por evento da série R-4000, como o
+R-4010; R-9001 evtTotal da série R-2000; retorno da consulta de lotes ou evento
++ recibo salvos por outro sistema), associa cada retorno ao titular e atualiza
+o banco de checkpoints em uma única transação: eventos aceitos viram 'sucesso'
+com recibo e eventos rejeitados viram 'erro'.
+
+O R-9005 não traz o CPF do beneficiário: o titular é encontrado pelo Id do
+evento (idEv, em eventos_xml) ou pelo recibo (nrRecArqBase, em recibos).
+
+Resolve em segundos os grupos 'erro_sem_confirmacao' e os lotes transmitidos
+por fora da automação, sem reabrir o formulário.
+
+Uso:
+    python retornos_reinf.py retornos/*.xml
+    python retornos_reinf.py retornos/*.xml --simular
+"""
+
+import argparse
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+
+from leitura_planilha import normalizar_cpf
+
+# Campos capturados de cada retorno (nome local da tag -> chave do registro)
+CAMPOS_RETORNO = {
+    'idEv': 'id_evento',
+    'cdRetorno': 'codigo',
+    'descRetorno': 'descricao',
+    'nrRecArqBase': 'recibo',
+    'nrRecibo': 'recibo',
+    'nrProtEntr': 'protocolo',
+    'dhProcess': 'data_hora',
+    'dhRecepcao': 'data_hora',
+    'perApur': 'periodo',
+    'cpfBenef': 'cpf',
+}
+
+# Elementos que encerram o retorno de um evento (R-9005, R-9001 e envelope do lote)
+FIM_RETORNO = ('evtRet', 'evtTotal', 'retornoEvento')
+
+
+def _nome_local(tag):
+    """Remove o namespace da tag ('{ns}evtRet' -> 'evtRet')"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def ler_retornos(arquivo):
+    """
+    Lê os retornos de eventos de um arquivo XML em streaming (iterparse).
+
+    Cada retorno termina em um elemento de FIM_RETORNO; arquivos sem esses
+    elementos (evento + recibo) geram um único retorno ao fim do documento.
+    Elementos já lidos são descartados, mantendo a memória constante.
+
+    Yields:
+        dict: id_evento, codigo, descricao, recibo, protocolo, data_hora,
+            periodo, cpf e mensagens (as chaves ausentes no XML não aparecem)
+    """
+    atual = {}
+    mensagens = []
+    pilha = []
+
+    for evento, elemento in ET.iterparse(arquivo, events=('start', 'end')):
+        if evento == 'start':
+            pilha.append(elemento)
+            # Envelope do retorno do lote: novo evento, com o Id do evento original
+            if _nome_local(elemento.tag) == 'evento':
+                atual = {'id_evento': elemento.get('Id')} if elemento.get('Id') else {}
+                mensagens = []
+            continue
+
+        pilha.pop()
+        nome = _nome_local(elemento.tag)
+        texto = (elemento.text or '').strip()
+
+        if nome in CAMPOS_RETORNO and texto:
+            atual.setdefault(CAMPOS_RETORNO[nome], texto)
+        elif nome in ('dscResp', 'descResp') and texto:
+            mensagens.append(texto)
+        elif nome == 'evtRetPF' and elemento.get('id'):
+            # Evento original salvo junto com o recibo (só vale se não houver idEv)
+            atual.setdefault('id_evento_xml', elemento.get('id'))
+
+        if nome in FIM_RETORNO or not pilha:
+            if 'recibo' in atual or 'codigo' in atual:
+                atual['mensagens'] = mensagens
+                atual.setdefault('id_evento', atual.pop('id_evento_xml', None))
+                yield atual
+            atual = {}
+            mensagens = []
+
+        if pilha:
+            elemento.clear()
+
+
+def formatar_periodo(per_apur):
+    """Converte o perApur do leiaute para o formato do config ('2025-01' -> '01/2025')"""
+    if per_apur and '-' in per_apur:
+        ano, mes = per_apur.split('-')[:2]
+        return f"{mes}/{ano}"
+    return per_apur
+
+
+def _titular_do_retorno(cursor, retorno, titulares):
+    """
+    Encontra o titular de um retorno: pelo Id do evento em eventos_xml, pelo
+    recibo já gravado em recibos ou pelo CPF do beneficiário na planilha
+    (este último só existe no evento original, não no R-9005).
+
+    Returns:
+        tuple: (CPF como gravado nos checkpoints, nome) ou None
+    """
+    consultas = (
+        ('id_evento', 'SELECT cpf_titular FROM eventos_xml WHERE id_evento = ?'),
+        ('recibo', 'SELECT cpf_titular FROM recibos WHERE numero_recibo = ?'),
+    )
+    for chave, consulta in consultas:
+        if not retorno.get(chave):
+            continue
+        try:
+            cursor.execute(consulta, (retorno[chave],))
+            linha = cursor.fetchone()
+        except sqlite3.OperationalError:
+            linha = None  # Tabela inexistente (ex: nenhum lote gerado por lotes_r4010.py)
+        if linha:
+            return titulares.get(normalizar_cpf(linha[0]), (linha[0], None))
+
+    if retorno.get('cpf'):
+        return titulares.get(normalizar_cpf(retorno['cpf']))
+
+    return None
+
+
+def importar_retornos(arquivos, titulares, banco_dados, periodo_padrao, simular=False):
+    """
+    Importa os retornos e atualiza checkpoints, recibos e eventos XML.
+
+    Titulares cujo último checkpoint já é 'sucesso' não recebem novo
+    checkpoint (o recibo é atualizado mesmo assim), e uma rejeição já
+    importada não é registrada de novo. Tudo é gravado em uma
+    única transação; com simular=True nada é gravado.
+
+    Args:
+        arquivos (list): Arquivos XML de retorno
+        titulares (dict): CPF normalizado -> (CPF como na planilha, nome)
+        banco_dados (str): Arquivo do banco SQLite
+        periodo_padrao (str): Período usado quando o retorno não traz perApur
+        simular (bool): Apenas contar, sem gravar
+
+    Returns:
+        dict: Totais de 'aceitos', 'rejeitados', 'ja_sucesso', 'em_processamento'
+            e 'sem_titular'
+    """
+    resumo = {'aceitos': 0, 'rejeitados': 0, 'ja_sucesso': 0, 'em_processamento': 0, 'sem_titular': 0}
+
+    conn = sqlite3.connect(banco_dados)
+    try:
+        cursor = conn.cursor()
+
+        for arquivo in arquivos:
+            for retorno in ler_retornos(arquivo):
+                titular = _titular_do_retorno(cursor, retorno, titulares)
+                if titular is None:
+                    resumo['sem_titular'] += 1
+                    print(f"⚠️ {arquivo}: retorno sem titular correspondente "
+                          f"(evento {retorno.get('id_evento') or '?'}, CPF {retorno.get('cpf') or '?'})")
+                    continue
+
+                # cdRetorno: 0 = sucesso, 1 = erro, 2 = em processamento
+                codigo = retorno.get('codigo', '0')
+                if codigo not in ('0', '1'):
+                    resumo['em_processamento'] += 1
+                    continue
+
+                cpf_titular, nome_titular = titular
+                periodo = formatar_periodo(retorno.get('periodo')) or periodo_padrao
+                aceito = codigo == '0' and bool(retorno.get('recibo'))
+                mensagem = ' | '.join(retorno['mensagens']) or retorno.get('descricao') or ''
+
+                cursor.execute('''
+                    SELECT status, etapa_atual FROM progresso_efd
+                    WHERE cpf_titular = ?
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT 1
+                ''', (cpf_titular,))
+                ultimo = cursor.fetchone()
+                ja_sucesso = bool(ultimo and ultimo[0] == 'sucesso')
+                # Reimportar o mesmo arquivo não repete a rejeição já registrada
+                ja_rejeitado = ultimo == ('erro', 'erro_retorno_reinf')
+
+                if aceito:
+                    resumo['ja_sucesso' if ja_sucesso else 'aceitos'] += 1
+                else:
+                    resumo['rejeitados'] += 1
+
+                if simular:
+                    continue
+
+                if aceito:
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO recibos
+                        (cpf_titular, periodo_apuracao, nome_titular, numero_recibo, protocolo, data_hora_portal, mensagem)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (cpf_titular, periodo, nome_titular, retorno['recibo'], retorno.get('protocolo'),
+                          retorno.get('data_hora'), mensagem or f"Retorno importado de {arquivo}"))
+
+                if not ja_sucesso and not (ja_rejeitado and not aceito):
+                    cursor.execute('''
+                        INSERT INTO progresso_efd
+                        (cpf_titular, nome_titular, etapa_atual, status, observacoes)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (cpf_titular, nome_titular,
+                          'recibo_importado' if aceito else 'erro_retorno_reinf',
+                          'sucesso' if aceito else 'erro',
+                          f"Recibo {retorno['recibo']} importado de {arquivo}" if aceito
+                          else f"Evento rejeitado ({arquivo}): {mensagem}"))
+
+                if retorno.get('id_evento'):
+                    try:
+                        cursor.execute('UPDATE eventos_xml SET status = ?, erros = ? WHERE id_evento = ?',
+                                       ('transmitido' if aceito else 'rejeitado',
+                                        None if aceito else mensagem, retorno['id_evento']))
+                    except sqlite3.OperationalError:
+                        pass  # Tabela inexistente: eventos não gerados por lotes_r4010.py
+
+        if not simular:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return resumo
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Importa retornos XML da REINF para o banco de checkpoints")
+    parser.add_argument('arquivos', nargs='+', help="Arquivos XML de retorno")
+    parser.add_argument('--simular', action='store_true', help="Apenas mostra o que seria importado")
+    args = parser.parse_args()
+
+    from config import ARQUIVO_EXCEL, PLANILHA, BANCO_DADOS, PERIODO_APURACAO
+    from eventos_ativos import titulares_da_planilha
+
+    print("\n" + "="*60)
+    print("📥 IMPORTAÇÃO DE RETORNOS DA REINF")
+    print("="*60)
+
+    titulares = titulares_da_planilha(ARQUIVO_EXCEL, PLANILHA)
+    print(f"👤 {len(titulares)} titulares na planilha")
+
+    resumo = importar_retornos(args.arquivos, titulares, BANCO_DADOS, PERIODO_APURACAO, args.simular)
+
+    print(f"\n{'='*60}")
+    print(f"✅ Aceitos: {resumo['aceitos']} (+{resumo['ja_sucesso']} já marcados como sucesso)")
+    print(f"❌ Rejeitados: {resumo['rejeitados']}")
+    print(f"⏳ Em processamento (ignorados): {resumo['em_processamento']}")
+    print(f"⚠️ Sem titular correspondente: {resumo['sem_titular']}")
+    if args.simular:
+        print("ℹ️ Simulação: nada foi gravado")
+    print(f"{'='*60}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo Simulação (sem navegador)
+Executa a AutomacaoEFD completa contra um driver em memória que imita o
+formulário de pagamentos da REINF: os 3 campos iniciais, Continuar, os modais
+de dependente/plano/informações, "Concluir e enviar", o alerta MS7001 e
+"Incluir novo pagamento". A assinatura é simulada.
+
+Serve para medir e testar sem Chrome, assinador ou eCAC o custo da
+orquestração (agrupamento, checkpoints, regras de pulo, formatação de
+valores): as latências do portal e a injeção de erros são configuráveis e os
+tempos de espera do config podem ser reduzidos ou zerados.
+
+Uso:
+    python simulacao.py                           # SIMULACAO_GRUPOS grupos sintéticos
+    python simulacao.py --grupos 100000 --silencioso
+    python simulacao.py --arquivo dados.xlsx --planilha "Plano de Saúde"
+    python simulacao.py --latencia comando=0.01 --latencia assinatura=3 --escala-espera 1
+    python simulacao.py --erro evento_ativo=0.05 --erro sem_confirmacao=0.02
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import leitura_planilha
+import main as automacao_efd
+from portal_simulado import ler_pares
+from tempos_etapas import cronometrar
+from config import (
+    BANCO_DADOS,
+    SIMULACAO_BANCO_DADOS,
+    SIMULACAO_ERROS,
+    SIMULACAO_ESCALA_ESPERAS,
+    SIMULACAO_GRUPOS,
+    SIMULACAO_LATENCIAS,
+    SIMULACAO_SEMENTE,
+)
+
+# Opções do select de relação de dependência do formulário
+RELACOES_DEPENDENCIA = ['1', '2', '3', '4', '6', '9', '10', '11', '12', '99']
+
+# Textos exibidos pelo portal simulado
+TEXTO_EVENTO_ATIVO = ("Inclusão não permitida. Existe um evento ativo para o CPF do beneficiário "
+                      "no mesmo período de apuração.")
+TEXTO_ERRO_PORTAL = "EM0001 - Não foi possível processar o evento. Tente novamente mais tarde."
+TEXTO_CANCELAMENTO = "Assinatura cancelada pelo usuário."
+
+# Dependências usadas nos grupos sintéticos (inclui grafias que caem no mapeamento parcial)
+DEPENDENCIAS_SINTETICAS = ['ESPOSA', 'Filho', 'FILHA ', 'Mãe', 'COMPANHEIRO(A)', 'Sogra', 'NETO', 'ex-esposa']
+
+# Predicados de XPath aceitos: contains(text()|@atributo, 'x') e @atributo='x'
+_TERMO_XPATH = re.compile(r"^contains\((text\(\)|@[\w-]+),\s*'([^']*)'\)$|^@([\w-]+)\s*=\s*'([^']*)'$")
+_XPATH = re.compile(r"^//(?:([\w-]+)//)?([\w*-]+)(?:\[(.+)\])?$")
+_CSS = re.compile(r"""^([\w-]+)?(?:\.([\w-]+))?(?:\[([\w-]+)\s*(\*?=)\s*["']?([^"'\]]*)["']?\])?$""")
+
+
+class ElementoSimulado:
+    """Elemento da página simulada (subconjunto da API do WebElement usada em main.py)"""
+
+    def __init__(self, formulario, tag, pai=None, texto='', ao_clicar=None, **atributos):
+        self.formulario = formulario
+        self.tag_name = tag
+        self.pai = pai
+        self.texto = texto
+        self.ao_clicar = ao_clicar
+        self.atributos = {chave.replace('_', '-'): valor for chave, valor in atributos.items()}
+        self.valor = ''
+        self.selecionado = False
+        self.anexado = True
+
+    def _verificar(self, comando):
+        self.formulario.driver.registrar_comando(comando)
+        if not self.anexado:
+            raise StaleElementReferenceException(f"Elemento <{self.tag_name}> não está mais na página")
+
+    def ancestrais(self):
+        pai = self.pai
+        while pai is not None:
+            yield pai
+            pai = pai.pai
+
+    @property
+    def text(self):
+        self._verificar('getElementText')
+        partes = [self.texto] + [filho.texto for filho in self.formulario.elementos if self in filho.ancestrais()]
+        return '\n'.join(parte for parte in partes if parte)
+
+    def is_displayed(self):
+        self._verificar('isElementDisplayed')
+        return True
+
+    def is_enabled(self):
+        self._verificar('isElementEnabled')
+        return True
+
+    def is_selected(self):
+        self._verificar('isElementSelected')
+        return self.selecionado
+
+    def get_dom_attribute(self, nome):
+        self._verificar('getElementAttribute')
+        return self.atributos.get(nome)
+
+    def get_attribute(self, nome):
+        if nome == 'value':
+            self._verificar('getElementProperty')
+            return self.valor
+        return self.get_dom_attribute(nome)
+
+    def clear(self):
+        self._verificar('clearElement')
+        self.valor = ''
+
+    def send_keys(self, *textos):
+        self._verificar('sendKeysToElement')
+        self.valor += ''.join(str(texto) for texto in textos)
+
+    def click(self):
+        self._verificar('clickElement')
+        if self.ao_clicar:
+            self.ao_clicar(self)
+
+    def find_element(self, by=By.ID, value=None):
+        return self.formulario.driver.find_element(by, value, raiz=self)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.formulario.driver.find_elements(by, value, raiz=self)
+
+
+class FormularioSimulado:
+    """
+    Estado de uma aba com o formulário de pagamentos do R-4010.
+
+    Cada mudança de tela recria os elementos (os anteriores ficam stale),
+    como no Angular do portal. Após um envio recusado, cancelado ou sem
+    confirmação, o formulário volta para a primeira etapa mantendo o alerta.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.elementos = []
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.etapa = 'inicial'
+        self.modal = None
+        self.alerta = None  # (classe, texto)
+        self.resultado = None
+        self.dependentes = []
+        self.planos = 0
+        self.renderizar()
+
+    def renderizar(self):
+        """Recria os elementos da tela a partir do estado atual"""
+        for elemento in self.elementos:
+            elemento.anexado = False
+        self.elementos = []
+        novo = self._novo_elemento
+
+        if self.alerta:
+            classe, texto = self.alerta
+            bloco = novo('app-reinf-mensagens-alerta')
+            mensagem = novo('div', pai=bloco, class_=f'message {classe}')
+            novo('span', pai=mensagem, texto=texto, data_testid='mensagem_descricao_0')
+
+        if self.etapa == 'inicial':
+            novo('input', id='periodo_apuracao', data_testid='periodo_apuracao', placeholder='MM/AAAA')
+            novo('input', id='insc_estabelecimento', data_testid='insc_estabelecimento')
+            novo('input', id='cpf_beneficiario', data_testid='cpf_beneficiario')
+            novo('button', texto='Continuar', ao_clicar=self._continuar, data_testid='botao_continuar')
+        elif self.etapa == 'pagamento':
+            novo('button', texto='Adicionar', ao_clicar=self._abrir_modal, id='BotaoInclusaoDiv_ideDep')
+            novo('button', texto='Adicionar', ao_clicar=self._abrir_modal, id='BotaoInclusaoDiv_ideOpSaude')
+            if self.planos:
+                novo('button', texto='Adicionar', ao_clicar=self._abrir_modal, id='BotaoInclusaoDiv_infoDependPl_0')
+            novo('button', texto='Concluir e enviar', ao_clicar=self._enviar, data_testid='botao_concluir_enviar')
+        elif self.etapa == 'resultado':
+            novo('button', texto='Incluir novo pagamento', ao_clicar=self._novo_pagamento, class_='button')
+
+        if self.modal == 'ide_dep':
+            novo('input', id='cpf_dependente')
+            self._novo_select('relacao_dependencia', RELACOES_DEPENDENCIA)
+            novo('button', texto='Salvar', ao_clicar=self._salvar_modal, data_testid='botao_salvar_modal_ide_dep')
+        elif self.modal == 'descricao_dependencia':
+            # Mesmo modal de dependente, com a descrição de "Agregado/Outros"
+            novo('input', id='cpf_dependente').valor = self._valores['cpf_dependente']
+            self._novo_select('relacao_dependencia', RELACOES_DEPENDENCIA, selecionado='99')
+            novo('input', id='descricao_dependencia')
+            novo('button', texto='Salvar', ao_clicar=self._salvar_modal, data_testid='botao_salvar_modal_ide_dep')
+        elif self.modal == 'ide_op_saude':
+            novo('input', id='cnpj_operadora')
+            novo('input', id='valor_saude')
+            novo('button', texto='Salvar', ao_clicar=self._salvar_modal, data_testid='botao_salvar_modal_ide_op_saude')
+        elif self.modal == 'info_depend_pl':
+            self._novo_select('c_p_f_do_dependente', self.dependentes)
+            novo('input', id='valor_saude_plano')
+            novo('button', texto='Salvar', ao_clicar=self._salvar_modal, data_testid='botao_salvar_modal_info_depend_pl')
+
+    def _novo_elemento(self, tag, pai=None, texto='', ao_clicar=None, class_=None, **atributos):
+        if class_ is not None:
+            atributos['class'] = class_
+        elemento = ElementoSimulado(self, tag, pai, texto, ao_clicar, **atributos)
+        self.elementos.append(elemento)
+        return elemento
+
+    def _novo_select(self, id_select, valores, selecionado=None):
+        select = self._novo_elemento('select', id=id_select)
+        for valor in valores:
+            opcao = self._novo_elemento('option', pai=select, texto=valor, ao_clicar=self._selecionar, value=valor)
+            opcao.selecionado = valor == selecionado
+            if opcao.selecionado:
+                select.valor = valor
+        return select
+
+    def valor_campo(self, id_elemento):
+        for elemento in self.elementos:
+            if elemento.atributos.get('id') == id_elemento:
+                return elemento.valor.strip()
+        return ''
+
+    # Ações dos botões
+
+    def _continuar(self, botao):
+        self.driver.aguardar_latencia('continuar')
+        campos = [self.valor_campo(campo) for campo in ('periodo_apuracao', 'insc_estabelecimento', 'cpf_beneficiario')]
+
+        if not all(campos):
+            self.alerta = ('alert', 'Campo obrigatório não preenchido.')
+        elif self.driver.sortear_erro('evento_ativo'):
+            self.alerta = ('alert', TEXTO_EVENTO_ATIVO)
+        else:
+            self.alerta = None
+            self.etapa = 'pagamento'
+        self.renderizar()
+
+    def _abrir_modal(self, botao):
+        self.driver.aguardar_latencia('modal')
+        if self.driver.sortear_erro('modal_nao_abre'):
+            return  # O modal não aparece e a espera pelo primeiro campo expira
+
+        self.modal = {
+            'BotaoInclusaoDiv_ideDep': 'ide_dep',
+            'BotaoInclusaoDiv_ideOpSaude': 'ide_op_saude',
+            'BotaoInclusaoDiv_infoDependPl_0': 'info_depend_pl',
+        }[botao.atributos['id']]
+        self.renderizar()
+
+    def _selecionar(self, opcao):
+        select = opcao.pai
+        for elemento in self.elementos:
+            if elemento.pai is select:
+                elemento.selecionado = elemento is opcao
+        select.valor = opcao.atributos['value']
+
+        # "Agregado/Outros" exibe o campo de descrição
+        if select.atributos['id'] == 'relacao_dependencia' and select.valor == '99' and self.modal == 'ide_dep':
+            self._valores = {'cpf_dependente': self.valor_campo('cpf_dependente')}
+            self.modal = 'descricao_dependencia'
+            self.renderizar()
+
+    def _salvar_modal(self, botao):
+        self.driver.aguardar_latencia('salvar_modal')
+
+        if self.modal in ('ide_dep', 'descricao_dependencia'):
+            cpf = self.valor_campo('cpf_dependente')
+            if not cpf or not self.valor_campo('relacao_dependencia'):
+                return  # Validação do modal: continua aberto
+            self.dependentes.append(cpf)
+        elif self.modal == 'ide_op_saude':
+            if not (self.valor_campo('cnpj_operadora') and self.valor_campo('valor_saude')):
+                return
+            self.planos += 1
+        elif self.modal == 'info_depend_pl':
+            if not (self.valor_campo('c_p_f_do_dependente') and self.valor_campo('valor_saude_plano')):
+                return
+
+        self.modal = None
+        self.renderizar()
+
+    def _enviar(self, botao):
+        self.driver.aguardar_latencia('envio')
+        self.etapa = 'assinatura'
+        self.renderizar()
+
+    def assinar(self):
+        """Assinatura da solicitação pendente; o resultado aparece como alerta"""
+        if self.etapa != 'assinatura':
+            return False
+
+        self.driver.aguardar_latencia('assinatura')
+
+        if self.driver.sortear_erro('assinatura_cancelada'):
+            self.resultado = {'tipo': 'cancelado', 'texto': TEXTO_CANCELAMENTO}
+        elif self.driver.sortear_erro('erro_portal'):
+            self.resultado = {'tipo': 'erro', 'texto': TEXTO_ERRO_PORTAL}
+        elif self.driver.sortear_erro('sem_confirmacao'):
+            self.resultado = None
+        else:
+            self.driver.recibos += 1
+            recibo = f"{self.driver.recibos:05d}-{self.driver.semente:04d}-{len(self.dependentes)}"
+            agora = time.strftime('%d/%m/%Y %H:%M:%S')
+            self.resultado = {
+                'tipo': 'sucesso',
+                'texto': f"MS7001 - Evento recebido com sucesso. Número do recibo: {recibo}",
+                'recibo': recibo,
+                'protocolo': None,
+                'data_hora': agora,
+            }
+
+        if self.resultado and self.resultado['tipo'] == 'sucesso':
+            self.alerta = ('success', self.resultado['texto'])
+            self.etapa = 'resultado'
+        else:
+            if self.resultado:
+                self.alerta = ('alert', self.resultado['texto'])
+            self.etapa = 'inicial'
+            self.dependentes = []
+            self.planos = 0
+        self.renderizar()
+        return True
+
+    def _novo_pagamento(self, botao):
+        self.driver.aguardar_latencia('proximo_cpf')
+        self.reiniciar()
+
+
+class _TrocaContexto:
+    """Equivalente a driver.switch_to para o driver simulado"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def frame(self, referencia):
+        self.driver.registrar_comando('switchToFrame')
+        self.driver.no_quadro = True
+
+    def default_content(self):
+        self.driver.registrar_comando('switchToFrame')
+        self.driver.no_quadro = False
+
+    def window(self, handle):
+        self.driver.registrar_comando('switchToWindow')
+        if handle not in self.driver.abas:
+            raise NoSuchElementException(f"Aba {handle} não existe")
+        self.driver.aba_atual = handle
+        self.driver.no_quadro = False
+
+    def new_window(self, tipo='tab'):
+        self.driver.registrar_comando('newWindow')
+        handle = f"aba-{len(self.driver.abas) + 1}"
+        self.driver.abas[handle] = FormularioSimulado(self.driver)
+        self.window(handle)
+
+
+class _ExecutorSimulado:
+    """Equivalente ao command executor do Selenium: todo comando do driver simulado passa por execute"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def execute(self, comando, params=None):
+        self.driver.comandos += 1
+        self.driver.aguardar_latencia('comando')
+
+
+class DriverSimulado:
+    """
+    WebDriver em memória com o formulário da REINF (ver FormularioSimulado).
+
+    Cada comando é contado e pode ter uma latência fixa (latencias['comando']);
+    as ações do portal têm latências próprias (continuar, modal, salvar_modal,
+    envio, assinatura, proximo_cpf). Os erros de 'erros' são sorteados com a
+    probabilidade informada a cada oportunidade.
+
+    Attributes:
+        comandos (int): Comandos WebDriver recebidos
+        tempo_latencia (float): Tempo total gasto nas latências simuladas (s)
+    """
+
+    def __init__(self, latencias=None, erros=None, semente=0):
+        self.latencias = dict(latencias or {})
+        self.erros = dict(erros or {})
+        self.semente = semente
+        self.aleatorio = random.Random(semente)
+        self.comandos = 0
+        self.tempo_latencia = 0.0
+        self.erros_injetados = {}
+        self.recibos = 0
+        self.no_quadro = False
+        self.abas = {}
+        self.aba_atual = 'aba-1'
+        self.abas[self.aba_atual] = FormularioSimulado(self)
+        self.switch_to = _TrocaContexto(self)
+        self.command_executor = _ExecutorSimulado(self)
+
+    @property
+    def formulario(self):
+        return self.abas[self.aba_atual]
+
+    def aguardar_latencia(self, nome):
+        segundos = self.latencias.get(nome, 0)
+        if segundos > 0:
+            inicio = time.perf_counter()
+            time.sleep(segundos)
+            self.tempo_latencia += time.perf_counter() - inicio
+
+    def registrar_comando(self, nome):
+        self.command_executor.execute(nome)
+
+    def sortear_erro(self, nome):
+        if self.aleatorio.random() < self.erros.get(nome, 0):
+            self.erros_injetados[nome] = self.erros_injetados.get(nome, 0) + 1
+            return True
+        return False
+
+    # Busca de elementos
+
+    def _corresponde(self, elemento, by, seletor):
+        if by == By.ID:
+            return elemento.atributos.get('id') == seletor
+        if by == By.TAG_NAME:
+            return elemento.tag_name == seletor
+        if by == By.CSS_SELECTOR:
+            return self._corresponde_css(elemento, seletor)
+        if by == By.XPATH:
+            return self._corresponde_xpath(elemento, seletor)
+        raise InvalidSelectorException(f"Localizador não suportado pela simulação: {by}")
+
+    def _corresponde_css(self, elemento, seletor):
+        partes = _CSS.match(seletor.strip())
+        if not partes or not any(partes.groups()):
+            raise InvalidSelectorException(f"Seletor CSS não suportado pela simulação: {seletor}")
+        tag, classe, atributo, operador, valor = partes.groups()
+
+        if tag and elemento.tag_name != tag:
+            return False
+        if classe and classe not in elemento.atributos.get('class', '').split():
+            return False
+        if atributo:
+            atual = elemento.atributos.get(atributo)
+            if atual is None:
+                return False
+            return valor in atual if operador == '*=' else atual == valor
+        return True
+
+    def _corresponde_xpath(self, elemento, seletor):
+        partes = _XPATH.match(seletor.strip())
+        if not partes:
+            raise InvalidSelectorException(f"XPath não suportado pela simulação: {seletor}")
+        ancestral, tag, predicado = partes.groups()
+
+        if tag != '*' and elemento.tag_name != tag:
+            return False
+        if ancestral and not any(pai.tag_name == ancestral for pai in elemento.ancestrais()):
+            return False
+        if not predicado:
+            return True
+
+        # 'a and b or c': conectores fora das aspas, 'and' com precedência
+        termos = re.split(r"\s+(and|or)\s+(?=(?:[^']*'[^']*')*[^']*$)", predicado)
+        alternativas = [[termos[0]]]
+        for conector, termo in zip(termos[1::2], termos[2::2]):
+            if conector == 'or':
+                alternativas.append([termo])
+            else:
+                alternativas[-1].append(termo)
+        return any(all(self._avaliar_termo(elemento, termo, seletor) for termo in grupo) for grupo in alternativas)
+
+    def _avaliar_termo(self, elemento, termo, seletor):
+        partes = _TERMO_XPATH.match(termo.strip())
+        if not partes:
+            raise InvalidSelectorException(f"XPath não suportado pela simulação: {seletor}")
+        alvo, trecho, atributo, valor = partes.groups()
+
+        if alvo == 'text()':
+            return trecho in elemento.texto
+        if alvo:
+            return trecho in elemento.atributos.get(alvo[1:], '')
+        return elemento.atributos.get(atributo) == valor
+
+    def find_elements(self, by=By.ID, value=None, raiz=None):
+        self.registrar_comando('findElements')
+        if raiz is None and not self.no_quadro:
+            # Fora do iframe só existe o próprio iframe do formulário
+            return [ElementoSimulado(self.formulario, 'iframe')] if by == By.TAG_NAME and value == 'iframe' else []
+
+        return [
+            elemento for elemento in self.formulario.elementos
+            if (raiz is None or raiz in elemento.ancestrais()) and self._corresponde(elemento, by, value)
+        ]
+
+    def find_element(self, by=By.ID, value=None, raiz=None):
+        encontrados = self.find_elements(by, value, raiz)
+        if not encontrados:
+            raise NoSuchElementException(f"Elemento não encontrado: {by}={value}")
+        return encontrados[0]
+
+    # Demais comandos usados pela automação
+
+    def execute_script(self, script, *argumentos):
+        self.registrar_comando('executeScript')
+        # Sonda do resultado do envio (SCRIPT_RESULTADO_ENVIO)
+        if 'textosCancelamento' in script and self.formulario.resultado:
+            return dict(self.formulario.resultado)
+        return None
+
+    def assinar(self):
+        """Assina a declaração enviada na aba atual (substitui o assinador)"""
+        return self.formulario.assinar()
+
+    def get(self, url):
+        self.registrar_comando('get')
+        self.formulario.reiniciar()
+
+    @property
+    def current_url(self):
+        return 'https://cav.receita.fazenda.gov.br/simulacao'
+
+    @property
+    def current_window_handle(self):
+        return self.aba_atual
+
+    @property
+    def window_handles(self):
+        return list(self.abas)
+
+    def minimize_window(self):
+        self.registrar_comando('minimizeWindow')
+
+    def maximize_window(self):
+        self.registrar_comando('maximizeWindow')
+
+    def get_log(self, tipo):
+        return []
+
+    def quit(self):
+        self.abas.clear()
+
+
+class _RelogioEscalado:
+    """
+    Substitui o módulo time em main.py: time.sleep é multiplicado pela escala
+    e time.time avança também pela parte não dormida, para que esperas
+    calculadas pelo relógio (backoff da fila) continuem coerentes. As demais
+    funções são as do módulo original.
+    """
+
+    def __init__(self, escala):
+        self.escala = escala
+        self.tempo_configurado = 0.0  # Soma dos time.sleep pedidos pela automação
+        self.tempo_dormido = 0.0  # Parte efetivamente dormida (escalada)
+
+    def sleep(self, segundos):
+        self.tempo_configurado += max(segundos, 0)
+        segundos *= self.escala
+        if segundos > 0:
+            inicio = time.perf_counter()
+            time.sleep(segundos)
+            self.tempo_dormido += time.perf_counter() - inicio
+
+    def time(self):
+        return time.time() + self.tempo_configurado - self.tempo_dormido
+
+    def __getattr__(self, nome):
+        return getattr(time, nome)
+
+
+def espera_escalada(escala):
+    """WebDriverWait com timeout e intervalo de verificação multiplicados pela escala"""
+
+    class EsperaEscalada(WebDriverWait):
+        def __init__(self, driver, timeout, poll_frequency=0.5, ignored_exceptions=None):
+            super().__init__(driver, timeout * escala, max(poll_frequency * escala, 0.001), ignored_exceptions)
+
+    return EsperaEscalada
+
+
+class AutomacaoSimulada(automacao_efd.AutomacaoEFD):
+    """
+    AutomacaoEFD com o DriverSimulado no lugar do Chrome e assinatura simulada.
+
+    Mede, por grupo, o tempo total e quanto dele não é latência simulada nem
+    espera do config (overhead da própria automação em Python).
+    """
+
+    def __init__(self, latencias=None, erros=None, semente=SIMULACAO_SEMENTE, relogio=None):
+        self.latencias_simuladas = latencias
+        self.erros_simulados = erros
+        self.semente_simulacao = semente
+        self.relogio = relogio
+        self.tempos_grupos = []  # (tempo total, overhead) de cada grupo registrado, em segundos
+        self._marca_grupo = None
+        super().__init__()
+        self.verificar_dados_manual = False
+
+    def configurar_chrome(self):
+        self.driver = DriverSimulado(self.latencias_simuladas, self.erros_simulados, self.semente_simulacao)
+        print("🧪 Driver simulado em memória (sem Chrome)")
+
+    def _aplicar_stealth(self):
+        pass
+
+    def aplicar_politica_recursos(self):
+        pass
+
+    def aguardar_login(self):
+        pass
+
+    def trazer_janela_para_frente(self):
+        pass
+
+    def _capturar_referencia_assinador(self):
+        self._referencia_assinador = None
+
+    @cronometrar('assinatura')
+    def realizar_assinatura_automatica(self, metodo_assinatura=1):
+        print("🔐 Assinatura simulada...")
+        return self.driver.assinar()
+
+    def _marca(self):
+        dormido = self.relogio.tempo_dormido if self.relogio else 0.0
+        return time.perf_counter(), self.driver.tempo_latencia + dormido
+
+    def _registrar_resultado_grupo(self, grupos, i, resultado, salvar_indice=True, erro=None):
+        resultado = super()._registrar_resultado_grupo(grupos, i, resultado, salvar_indice, erro)
+
+        # Tempo desde o grupo anterior, inclusive grupos já processados no caminho
+        agora, esperas = self._marca()
+        if self._marca_grupo is not None:
+            total = agora - self._marca_grupo[0]
+            self.tempos_grupos.append((total, total - (esperas - self._marca_grupo[1])))
+        self._marca_grupo = (agora, esperas)
+        return resultado
+
+    def processar_todos_os_grupos(self, grupos=None, indices=None):
+        self._marca_grupo = self._marca()
+        return super().processar_todos_os_grupos(grupos, indices)
+
+
+def gerar_grupos_sinteticos(quantidade, semente=SIMULACAO_SEMENTE):
+    """
+    Gera grupos no formato de leitura_planilha.ler_grupos (titular + 0 a 4
+    dependentes), passando pelo mesmo agrupamento da planilha real.
+
+    Cerca de 3% dos titulares e 5% dos dependentes têm valor zerado, e parte
+    dos valores vem como texto com vírgula decimal ('1234,56').
+    """
+    aleatorio = random.Random(semente)
+    linhas = []
+    sequencia = 0
+
+    def pessoa(nome, dependencia, chance_zerado):
+        nonlocal sequencia
+        sequencia += 1
+        cpf = f"{sequencia:011d}"
+        valor = 0 if aleatorio.random() < chance_zerado else round(aleatorio.uniform(50, 2500), 2)
+        if aleatorio.random() < 0.3:
+            valor = f"{valor:.2f}".replace('.', ',')
+        linhas.append({
+            'NOME': nome,
+            'DEPENDENCIA': dependencia,
+            'CPF': f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
+            'TOTAL': valor,
+        })
+
+    for i in range(quantidade):
+        pessoa(f"TITULAR {i + 1}", 'TITULAR', 0.03)
+        for j in range(aleatorio.choices([0, 1, 2, 3, 4], weights=[35, 30, 20, 10, 5])[0]):
+            pessoa(f"DEPENDENTE {i + 1}.{j + 1}", aleatorio.choice(DEPENDENCIAS_SINTETICAS), 0.05)
+
+    return leitura_planilha.agrupar_por_titular(pd.DataFrame(linhas))
+
+
+def _percentil(valores, fracao):
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * fracao), len(ordenados) - 1)]
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Executa a automação contra um portal simulado em memória")
+    parser.add_argument('--grupos', type=int, default=SIMULACAO_GRUPOS,
+                        help="Quantidade de grupos sintéticos (padrão: SIMULACAO_GRUPOS)")
+    parser.add_argument('--arquivo', help="Usa os grupos de uma planilha real em vez de grupos sintéticos")
+    parser.add_argument('--planilha', help="Aba da planilha (com --arquivo; padrão: PLANILHA)")
+    parser.add_argument('--latencia', action='append', metavar='NOME=S',
+                        help="Latência simulada em segundos (comando, continuar, modal, salvar_modal, "
+                             "envio, assinatura, proximo_cpf)")
+    parser.add_argument('--erro', action='append', metavar='NOME=P',
+                        help="Probabilidade de erro (evento_ativo, modal_nao_abre, assinatura_cancelada, "
+                             "erro_portal, sem_confirmacao)")
+    parser.add_argument('--escala-espera', type=float, default=SIMULACAO_ESCALA_ESPERAS,
+                        help="Multiplica os time.sleep e timeouts de main.py (0 = sem esperas, 1 = tempos reais)")
+    parser.add_argument('--semente', type=int, default=SIMULACAO_SEMENTE, help="Semente dos grupos e dos erros")
+    parser.add_argument('--banco', default=SIMULACAO_BANCO_DADOS, help="Banco de checkpoints da simulação")
+    parser.add_argument('--manter-banco', action='store_true',
+                        help="Não apaga o banco antes (testa a retomada e os grupos já processados)")
+    parser.add_argument('--pipeline', action='store_true', help="Simula o modo pipeline (duas abas)")
+    parser.add_argument('--linear', action='store_true', help="Percorre os grupos sem a fila de trabalho")
+    parser.add_argument('--silencioso', action='store_true', help="Oculta o log da automação (mostra só o relatório)")
+    args = parser.parse_args()
+
+    banco = os.path.abspath(args.banco)
+    if BANCO_DADOS and banco == os.path.abspath(BANCO_DADOS):
+        print("❌ O banco da simulação não pode ser o BANCO_DADOS de produção")
+        return 1
+
+    latencias = ler_pares(args.latencia, SIMULACAO_LATENCIAS, '--latencia')
+    erros = ler_pares(args.erro, SIMULACAO_ERROS, '--erro')
+
+    print("\n" + "="*60)
+    print("🧪 SIMULAÇÃO SEM NAVEGADOR")
+    print("="*60)
+
+    if args.arquivo:
+        grupos = leitura_planilha.ler_grupos(args.arquivo, args.planilha or automacao_efd.PLANILHA)
+    else:
+        grupos = gerar_grupos_sinteticos(args.grupos, args.semente)
+    print(f"📊 {len(grupos)} grupos")
+    print(f"⏱️ Escala das esperas: {args.escala_espera:g} | Banco: {banco}")
+
+    if os.path.exists(banco) and not args.manter_banco:
+        os.remove(banco)
+
+    # A automação lê banco, relógio e esperas dos globais de main.py
+    relogio = _RelogioEscalado(args.escala_espera)
+    automacao_efd.BANCO_DADOS = banco
+    automacao_efd.time = relogio
+    automacao_efd.WebDriverWait = espera_escalada(args.escala_espera)
+
+    saida = open(os.devnull, 'w', encoding='utf-8') if args.silencioso else sys.stdout
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(saida):
+            automacao = AutomacaoSimulada(latencias, erros, args.semente, relogio)
+            automacao.usar_fila = automacao.usar_fila and not args.linear
+            if args.pipeline:
+                automacao.abrir_aba_pipeline()
+            resumo = automacao.processar_todos_os_grupos(grupos)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    duracao = time.perf_counter() - inicio
+
+    driver = automacao.driver
+    tempos = automacao.tempos_grupos
+    resumo = resumo or {}
+
+    print(f"\n{'='*60}")
+    print("📊 RESULTADO DA SIMULAÇÃO")
+    print(f"{'='*60}")
+    print(f"✅ Sucessos: {resumo.get('sucessos', 0)} | ⏭️ Pulados: {resumo.get('pulados', 0)} | "
+          f"❌ Erros: {resumo.get('erros', 0)}")
+    if driver.erros_injetados:
+        print("💉 Erros injetados: " + ', '.join(f"{nome}={total}" for nome, total in sorted(driver.erros_injetados.items())))
+    print(f"⏱️ Duração: {duracao:.1f}s (latência simulada {driver.tempo_latencia:.1f}s, "
+          f"esperas do config {relogio.tempo_dormido:.1f}s de {relogio.tempo_configurado:.1f}s configurados)")
+    print(f"🔧 Comandos WebDriver: {driver.comandos} ({driver.comandos / max(len(grupos), 1):.1f} por grupo)")
+    if tempos:
+        overhead = [tempo[1] * 1000 for tempo in tempos]
+        print(f"🐍 Overhead por grupo (ms): média {sum(overhead) / len(overhead):.2f} | "
+              f"p50 {_percentil(overhead, 0.5):.2f} | p95 {_percentil(overhead, 0.95):.2f} | max {max(overhead):.2f}")
+        print(f"🚀 Ritmo: {len(tempos) / duracao * 3600:,.0f} grupos/hora com estas latências e esperas")
+    print(f"{'='*60}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tempos das Etapas do Grupo
+Spans leves (gerenciador de contexto e decorador) em volta de cada etapa de
+processar_grupo_individual, gravados em lotes na tabela tempos_etapas do
+banco de checkpoints. manage.py mostra contagem/p50/p95/máximo por etapa.
+
+Uso:
+    with self.tempos.etapa('pausa_verificacao'):
+        ...
+
+    @cronometrar('envio')
+    def enviar_declaracao(self):
+        ...
+"""
+
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# Identificador desta execução (compartilhado pelos workers do modo pool)
+ID_EXECUCAO = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+
+SQL_CRIAR_TABELA = '''
+    CREATE TABLE IF NOT EXISTS tempos_etapas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        execucao TEXT NOT NULL,
+        cpf_titular TEXT,
+        etapa TEXT NOT NULL,
+        inicio REAL NOT NULL,
+        duracao REAL NOT NULL,
+        status TEXT NOT NULL
+    )
+'''
+
+
+class RegistradorTempos:
+    """
+    Acumula os spans em memória e grava em lote (uma transação a cada
+    tamanho_lote spans, e ao chamar gravar()).
+
+    Attributes:
+        banco (str): Banco de checkpoints
+        obter_cpf (callable): Retorna o CPF do titular atual (lido ao fim do span)
+        tamanho_lote (int): Quantidade de spans por gravação
+        totais (dict): Segundos acumulados por etapa nesta instância (ver andamento.py)
+    """
+
+    def __init__(self, banco, obter_cpf=None, tamanho_lote=50, ativo=True):
+        self.banco = banco
+        self.obter_cpf = obter_cpf or (lambda: None)
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.ativo = ativo
+        self.pendentes = []
+        self.totais = defaultdict(float)
+        self.trava = threading.Lock()
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Mede o bloco como a etapa 'nome'. O span recebe status 'erro' se o
+        bloco lançar exceção; o chamador pode alterar span['status'].
+        """
+        span = {'status': 'ok'}
+        if not self.ativo:
+            yield span
+            return
+
+        inicio_relogio = time.time()
+        inicio = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span['status'] = 'erro'
+            raise
+        finally:
+            self.registrar(nome, inicio_relogio, time.perf_counter() - inicio, span['status'])
+
+    def registrar(self, nome, inicio, duracao, status='ok'):
+        with self.trava:
+            self.pendentes.append((ID_EXECUCAO, self.obter_cpf(), nome, inicio, duracao, status))
+            self.totais[nome] += duracao
+            cheio = len(self.pendentes) >= self.tamanho_lote
+        if cheio:
+            self.gravar()
+
+    def gravar(self):
+        """Grava os spans pendentes em uma única transação"""
+        with self.trava:
+            lote, self.pendentes = self.pendentes, []
+        if not lote:
+            return
+
+        try:
+            conn = sqlite3.connect(self.banco)
+            conn.execute(SQL_CRIAR_TABELA)
+            conn.executemany('''
+                INSERT INTO tempos_etapas (execucao, cpf_titular, etapa, inicio, duracao, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', lote)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar tempos das etapas: {e}")
+
+
+def cronometrar(nome):
+    """
+    Decorador de métodos da automação: mede a chamada como a etapa 'nome'
+    usando self.tempos. Retorno False marca o span como 'falha'.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(self, *args, **kwargs):
+            registrador = getattr(self, 'tempos', None)
+            if registrador is None:
+                return funcao(self, *args, **kwargs)
+
+            with registrador.etapa(nome) as span:
+                resultado = funcao(self, *args, **kwargs)
+                if resultado is False:
+                    span['status'] = 'falha'
+                return resultado
+        return envolvida
+    return decorador
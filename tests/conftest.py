@@ -0,0 +1,15 @@
+import importlib.util
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os módulos do projeto ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, RAIZ)
+
+# Sem config.py (ex: clone limpo/CI), os testes usam os valores do config-template.py
+if importlib.util.find_spec('config') is None:
+    especificacao = importlib.util.spec_from_file_location('config', os.path.join(RAIZ, 'config-template.py'))
+    config = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(config)
+    sys.modules['config'] = config
@@ -0,0 +1,69 @@
+"""Assinatura XML-DSig dos eventos conferida por verificadores independentes do assinatura_xml.py"""
+
+import base64
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('cryptography')
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.serialization import Encoding
+
+import assinatura_xml
+
+NS_REINF = 'http://www.reinf.esocial.gov.br/schemas/evt4010PagtoBeneficiarioPF/v2_01_02'
+
+
+@pytest.fixture(scope='module')
+def evento_assinado(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('certificado') / 'teste.pfx'
+    assinatura_xml.gerar_certificado_teste(str(caminho))
+    assinatura_xml._inicializar_processo(str(caminho), 'teste')
+    _, certificado = assinatura_xml.carregar_certificado(str(caminho), 'teste')
+    return assinatura_xml.assinar_evento(assinatura_xml._eventos_benchmark(1)[0]), certificado
+
+
+def _c14n_stdlib(trecho, namespace):
+    """Forma canônica pelo ElementTree da biblioteca padrão (sem lxml/libxml2)"""
+    elemento = re.sub(r'^<(\w+)', rf'<\1 xmlns="{namespace}"', trecho, count=1)
+    return ET.canonicalize(elemento).encode('utf-8')
+
+
+def test_assinatura_confere_com_c14n_independente(evento_assinado):
+    xml, certificado = evento_assinado
+    assert 'xmlns=""' not in xml
+
+    # Digest do evento (namespace padrão herdado de <Reinf>)
+    evento = re.search(r'<evtRetPF .*</evtRetPF>', xml).group(0)
+    digest = base64.b64encode(hashlib.sha256(_c14n_stdlib(evento, NS_REINF)).digest()).decode('ascii')
+    assert re.search(r'<DigestValue>([^<]+)</DigestValue>', xml).group(1) == digest
+
+    # SignatureValue sobre o SignedInfo canônico (namespace padrão herdado de <Signature>)
+    signed_info = re.search(r'<SignedInfo>.*</SignedInfo>', xml).group(0)
+    valor = base64.b64decode(re.search(r'<SignatureValue>([^<]+)</SignatureValue>', xml).group(1))
+    certificado.public_key().verify(
+        valor, _c14n_stdlib(signed_info, assinatura_xml.NS_DSIG), padding.PKCS1v15(), hashes.SHA256()
+    )
+
+
+def test_assinatura_aceita_pelo_signxml(evento_assinado):
+    signxml = pytest.importorskip('signxml')
+    xml, certificado = evento_assinado
+
+    verificador = signxml.XMLVerifier()
+    # O c14n de subárvore do lxml emite xmlns="" em filhos de <SignedInfo> quando <Reinf>
+    # declara outro namespace padrão (signxml issue 193); o signxml remove para conferir
+    verificador.excise_empty_xmlns_declarations = True
+    resultado = verificador.verify(xml.encode('utf-8'), x509_cert=certificado.public_bytes(Encoding.PEM).decode())
+    assert resultado.signed_xml.get('id') == re.search(r'URI="#([^"]+)"', xml).group(1)
+
+
+def test_verificar_evento_rejeita_evento_alterado(evento_assinado):
+    xml, _ = evento_assinado
+    assert assinatura_xml.verificar_evento(xml)
+    assert not assinatura_xml.verificar_evento(xml.replace('123,45', '999,99'))
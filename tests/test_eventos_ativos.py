@@ -0,0 +1,60 @@
+"""Leitura da consulta de eventos R-4010 ativos a partir de páginas salvas do portal"""
+
+import os
+
+import eventos_ativos
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _ler(nome):
+    with open(os.path.join(FIXTURES, nome), encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+
+def test_extrair_cpfs_ignora_inativos_e_outros_eventos():
+    assert eventos_ativos.extrair_cpfs_eventos_ativos(_ler('consulta_eventos_p1.html')) == {
+        '11144477735', '22255588846',
+    }
+    assert eventos_ativos.extrair_cpfs_eventos_ativos(_ler('consulta_eventos_p2.html')) == {
+        '55588811122', '11144477735',
+    }
+
+
+def test_ler_paginas_consulta_percorre_ate_a_ultima_pagina():
+    paginas = [_ler('consulta_eventos_p1.html'), _ler('consulta_eventos_p2.html')]
+    atual = [0]
+
+    def avancar(html):
+        assert html == paginas[atual[0]]
+        if atual[0] + 1 >= len(paginas):
+            return False
+        atual[0] += 1
+        return True
+
+    cpfs, lidas = eventos_ativos.ler_paginas_consulta(lambda: paginas[atual[0]], avancar, max_paginas=10)
+
+    assert lidas == 2
+    assert cpfs == {'11144477735', '22255588846', '55588811122'}
+
+
+def test_ler_paginas_consulta_respeita_limite_e_mantem_paginas_lidas_em_erro():
+    paginas = iter([_ler('consulta_eventos_p1.html')])
+
+    cpfs, lidas = eventos_ativos.ler_paginas_consulta(lambda: next(paginas), lambda html: True, max_paginas=1)
+    assert (cpfs, lidas) == ({'11144477735', '22255588846'}, 1)
+
+    paginas = iter([_ler('consulta_eventos_p1.html')])
+    cpfs, lidas = eventos_ativos.ler_paginas_consulta(lambda: next(paginas), lambda html: True, max_paginas=5)
+    assert (cpfs, lidas) == ({'11144477735', '22255588846'}, 1)
+
+
+def test_linha_de_comando_le_as_paginas_salvas(capsys, monkeypatch):
+    monkeypatch.setattr('sys.argv', ['eventos_ativos.py',
+                                     os.path.join(FIXTURES, 'consulta_eventos_p1.html'),
+                                     os.path.join(FIXTURES, 'consulta_eventos_p2.html')])
+
+    assert eventos_ativos.main() == 0
+    saida = capsys.readouterr().out
+    assert 'Total: 3 CPFs' in saida
+    assert '33366699957' not in saida
@@ -0,0 +1,37 @@
+"""Conversão de valores da planilha: formato brasileiro e células vazias (NaN)"""
+
+import pandas as pd
+
+import leitura_planilha
+
+
+def test_converter_valor_trata_nan_como_vazio():
+    assert leitura_planilha.converter_valor(float('nan')) is None
+    assert leitura_planilha.converter_valor('150,50') == 150.5
+    assert leitura_planilha.valor_eh_zero_ou_nulo(float('nan'))
+
+
+def test_primeiro_valor_usa_total_quando_valor_plano_vazio():
+    titular = pd.Series({'CPF': '00000000000', 'VALOR_PLANO': float('nan'), 'TOTAL': 150.5})
+    assert leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL') == 150.5
+
+    titular = pd.Series({'CPF': '00000000000', 'VALOR_PLANO': 0, 'TOTAL': float('nan')})
+    assert leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL') is None
+
+
+def test_converter_valor_formato_brasileiro_com_milhar():
+    assert leitura_planilha.converter_valor('1.234,56') == 1234.56
+    assert leitura_planilha.converter_valor('R$ 1.234,56') == 1234.56
+    assert leitura_planilha.converter_valor('1.234.567') == 1234567.0
+    assert leitura_planilha.converter_valor('  12.50 ') == 12.5
+    assert not leitura_planilha.valor_eh_zero_ou_nulo('R$ 1.234,56')
+
+    titular = pd.Series({'CPF': '00000000000', 'VALOR_PLANO': 'R$ 1.234,56', 'TOTAL': float('nan')})
+    assert leitura_planilha.primeiro_valor(titular, 'VALOR_PLANO', 'TOTAL') == 1234.56
+
+
+def test_valores_invalidos_ignora_celulas_vazias():
+    linha = pd.Series({'VALOR_PLANO': 'isento', 'TOTAL': float('nan'), 'VALOR_DEPENDENTE': '', 'OUTRO': '1,00'})
+    assert leitura_planilha.valores_invalidos(linha, 'VALOR_PLANO', 'TOTAL', 'VALOR_DEPENDENTE', 'OUTRO') == [
+        ('VALOR_PLANO', 'isento'),
+    ]
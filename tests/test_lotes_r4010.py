@@ -0,0 +1,56 @@
+"""Geração offline dos eventos R-4010: valores da planilha no XML e células inválidas"""
+
+import sqlite3
+
+import pandas as pd
+
+import lotes_r4010
+
+
+def _grupo(cpf, valor_plano, valor_dependente):
+    titular = pd.Series({'CPF': cpf, 'NOME': 'TITULAR', 'DEPENDENCIA': 'TITULAR',
+                         'VALOR_PLANO': valor_plano, 'TOTAL': float('nan')})
+    dependente = pd.Series({'CPF': '222.555.888-46', 'NOME': 'DEPENDENTE', 'DEPENDENCIA': 'FILHO',
+                            'VALOR_DEPENDENTE': valor_dependente, 'TOTAL': float('nan')})
+    return [titular, dependente]
+
+
+def test_formatar_valor_reinf_aceita_formato_brasileiro():
+    assert lotes_r4010.formatar_valor_reinf('1.234,56') == '1234,56'
+    assert lotes_r4010.formatar_valor_reinf('R$ 1.234,56') == '1234,56'
+    assert lotes_r4010.formatar_valor_reinf(1234.5) == '1234,50'
+
+
+def test_gerar_lotes_inclui_milhar_e_registra_valor_invalido(tmp_path):
+    banco = str(tmp_path / 'checkpoints.db')
+    conn = sqlite3.connect(banco)
+    conn.execute('''
+        CREATE TABLE progresso_efd (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cpf_titular TEXT NOT NULL,
+            status TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.close()
+
+    grupos = [
+        _grupo('111.444.777-35', 'R$ 1.234,56', '1.000,00'),
+        _grupo('333.666.999-57', '150,00', 'isento'),
+    ]
+    resumo = lotes_r4010.gerar_lotes(grupos, '01/2025', str(tmp_path / 'lotes'), 50, banco)
+
+    assert resumo == {'eventos': 1, 'invalidos': 1, 'ignorados': 0, 'lotes': 1}
+
+    conn = sqlite3.connect(banco)
+    eventos = dict(conn.execute('SELECT cpf_titular, status FROM eventos_xml').fetchall())
+    erros = conn.execute("SELECT erros FROM eventos_xml WHERE status = 'invalido'").fetchone()[0]
+    arquivo = conn.execute('SELECT arquivo FROM lotes_xml').fetchone()[0]
+    conn.close()
+
+    assert eventos == {'111.444.777-35': 'gerado', '333.666.999-57': 'invalido'}
+    assert "VALOR_DEPENDENTE = 'isento'" in erros
+    with open(arquivo, encoding='utf-8') as lote:
+        xml = lote.read()
+    assert '<vlrSaude>1234,56</vlrSaude>' in xml
+    assert '<vlrSaude>1000,00</vlrSaude>' in xml
@@ -0,0 +1,83 @@
+"""Valores da planilha no caminho do formulário (AutomacaoEFD.preparar_grupo e etapas)"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('selenium')
+pytest.importorskip('selenium_stealth')
+
+import main
+
+
+class _Etapa:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *erro):
+        return False
+
+
+class _Tempos:
+    def etapa(self, nome):
+        return _Etapa()
+
+
+@pytest.fixture
+def automacao(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'BANCO_DADOS', str(tmp_path / 'checkpoints.db'))
+    automacao = object.__new__(main.AutomacaoEFD)
+    automacao.inicializar_banco_dados()
+    automacao.cpf_titular_atual = '111.444.777-35'
+    automacao.tempos = _Tempos()
+    automacao.checkpoints = []
+    automacao.dependentes = []
+    automacao.planos = []
+    automacao.info_dependentes = []
+
+    automacao.salvar_checkpoint = lambda cpf, nome, etapa, status, observacoes=None: \
+        automacao.checkpoints.append((etapa, status))
+    automacao.preencher_dados_iniciais = lambda cpf, nome: True
+    automacao.continuar_para_proxima_etapa = lambda: True
+    automacao._pausa_verificacao = lambda: None
+    automacao.verificar_dependente_processado = lambda *args: False
+    automacao.verificar_plano_processado = lambda *args: False
+    automacao.verificar_info_dependente_processado = lambda *args: False
+    automacao.adicionar_dependente = lambda cpf, relacao, agregado=None: automacao.dependentes.append(cpf) or True
+    automacao.adicionar_plano_saude = lambda cnpj, valor: automacao.planos.append(valor) or True
+    automacao.adicionar_informacao_dependente = lambda cpf, valor: automacao.info_dependentes.append((cpf, valor)) or True
+    return automacao
+
+
+def _titular(**valores):
+    return pd.Series({'CPF': '111.444.777-35', 'NOME': 'MARIA DA SILVA', 'DEPENDENCIA': 'TITULAR',
+                      'CNPJ_OPERADORA': '12345678000199', **valores})
+
+
+def _dependente(**valores):
+    return pd.Series({'CPF': '222.555.888-46', 'NOME': 'JOÃO DA SILVA', 'DEPENDENCIA': 'FILHO', **valores})
+
+
+def test_valor_plano_vazio_usa_total(automacao):
+    titular = _titular(VALOR_PLANO=float('nan'), TOTAL='150,00')
+    dependente = _dependente(VALOR_DEPENDENTE=float('nan'), TOTAL='R$ 1.234,56')
+
+    assert automacao.preparar_grupo(titular, [dependente]) == "pronto"
+    assert automacao.checkpoints == []
+    assert automacao.dependentes == ['222.555.888-46']
+    assert automacao.planos == ['150,00']
+    assert automacao.info_dependentes == [('222.555.888-46', '1234,56')]
+
+
+def test_valor_plano_e_total_vazios_pulam_o_grupo(automacao):
+    titular = _titular(VALOR_PLANO=float('nan'), TOTAL=float('nan'))
+
+    assert automacao.preparar_grupo(titular, []) == "pulado"
+    assert automacao.checkpoints == [("grupo_pulado", "pulado")]
+
+
+def test_valor_nao_numerico_vira_erro(automacao):
+    titular = _titular(VALOR_PLANO='isento', TOTAL='150,00')
+
+    assert automacao.preparar_grupo(titular, []) == "erro"
+    assert automacao.checkpoints == [("erro_valor_invalido", "erro")]
+    assert automacao.planos == []
@@ -0,0 +1,109 @@
+"""Importação dos retornos R-9005 (evtRet) do R-4010 a partir de arquivos salvos"""
+
+import os
+import sqlite3
+
+import pytest
+
+import retornos_reinf
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+LOTE = os.path.join(FIXTURES, 'retorno_lote_r9005.xml')
+AVULSO = os.path.join(FIXTURES, 'retorno_r9005.xml')
+
+TITULARES = {
+    '11144477735': ('111.444.777-35', 'MARIA DA SILVA'),
+    '22255588846': ('222.555.888-46', 'JOÃO PEREIRA'),
+    '55588811122': ('555.888.111-22', 'CARLOS LIMA'),
+}
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = str(tmp_path / 'checkpoints.db')
+    conn = sqlite3.connect(caminho)
+    conn.executescript('''
+        CREATE TABLE progresso_efd (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cpf_titular TEXT NOT NULL,
+            nome_titular TEXT,
+            etapa_atual TEXT NOT NULL,
+            status TEXT NOT NULL,
+            dados_json TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            observacoes TEXT
+        );
+        CREATE TABLE recibos (
+            cpf_titular TEXT NOT NULL,
+            periodo_apuracao TEXT NOT NULL,
+            nome_titular TEXT,
+            numero_recibo TEXT,
+            protocolo TEXT,
+            data_hora_portal TEXT,
+            mensagem TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (cpf_titular, periodo_apuracao)
+        );
+        CREATE TABLE eventos_xml (
+            id_evento TEXT PRIMARY KEY,
+            cpf_titular TEXT NOT NULL,
+            periodo_apuracao TEXT NOT NULL,
+            arquivo_lote TEXT,
+            status TEXT NOT NULL,
+            erros TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+    conn.executemany("INSERT INTO eventos_xml (id_evento, cpf_titular, periodo_apuracao, status) "
+                     "VALUES (?, ?, '01/2025', 'gerado')",
+                     [('ID1123456780001992025021009150000001', '111.444.777-35'),
+                      ('ID1123456780001992025021009150000002', '222.555.888-46')])
+    conn.execute("INSERT INTO recibos (cpf_titular, periodo_apuracao, numero_recibo) "
+                 "VALUES ('555.888.111-22', '01/2025', '12345-67-8901-2502-99999')")
+    conn.commit()
+    conn.close()
+    return caminho
+
+
+def test_ler_retornos_separa_cada_evt_ret_do_lote():
+    retornos = list(retornos_reinf.ler_retornos(LOTE))
+
+    assert [r['id_evento'] for r in retornos] == ['ID1123456780001992025021009150000001',
+                                                  'ID1123456780001992025021009150000002']
+    assert retornos[0]['codigo'] == '0'
+    assert retornos[0]['recibo'] == '12345-67-8901-2502-12345'
+    assert retornos[0]['periodo'] == '2025-01'
+    assert retornos[1]['codigo'] == '1'
+    assert 'recibo' not in retornos[1]
+    assert retornos[1]['mensagens'] == ['Operadora de plano de saúde não cadastrada.']
+
+
+def test_importar_retornos_associa_por_id_do_evento_e_pelo_recibo(banco):
+    resumo = retornos_reinf.importar_retornos([LOTE, AVULSO], TITULARES, banco, '01/2025')
+
+    assert resumo == {'aceitos': 2, 'rejeitados': 1, 'ja_sucesso': 0, 'em_processamento': 0, 'sem_titular': 0}
+
+    conn = sqlite3.connect(banco)
+    progresso = dict(conn.execute('SELECT cpf_titular, etapa_atual FROM progresso_efd').fetchall())
+    assert progresso == {
+        '111.444.777-35': 'recibo_importado',
+        '222.555.888-46': 'erro_retorno_reinf',
+        '555.888.111-22': 'recibo_importado',
+    }
+    eventos = dict(conn.execute('SELECT id_evento, status FROM eventos_xml').fetchall())
+    assert eventos == {'ID1123456780001992025021009150000001': 'transmitido',
+                       'ID1123456780001992025021009150000002': 'rejeitado'}
+    assert conn.execute("SELECT numero_recibo FROM recibos WHERE cpf_titular = '111.444.777-35'").fetchone() == \
+        ('12345-67-8901-2502-12345',)
+    conn.close()
+
+
+def test_ler_retornos_separa_evt_ret_consecutivos_sem_envelope(tmp_path):
+    with open(AVULSO, encoding='utf-8') as arquivo:
+        evt_ret = arquivo.read().split('?>', 1)[1]
+    caminho = tmp_path / 'retornos.xml'
+    caminho.write_text(f"<retornos>{evt_ret}{evt_ret.replace('99999', '88888')}</retornos>", encoding='utf-8')
+
+    retornos = list(retornos_reinf.ler_retornos(str(caminho)))
+
+    assert [r['recibo'] for r in retornos] == ['12345-67-8901-2502-99999', '12345-67-8901-2502-88888']